@@ -0,0 +1,124 @@
+import gzip
+import re
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from .renderers import FastJSONRenderer
+
+try:
+    import brotli
+except ImportError:  # без brotli сжимаем только gzip
+    brotli = None
+
+DEFAULT_RESPONSE_COMPRESSION = {
+    'MIN_SIZE': 1024,       # меньшие ответы не сжимаются: выигрыш меньше накладных расходов
+    'GZIP_LEVEL': 6,
+    'BROTLI': True,
+    'BROTLI_QUALITY': 5,    # динамическое сжатие; 11 — только для заранее сжатых ответов
+    'PRECOMPRESSED_BROTLI_QUALITY': 11,
+    # Префиксы путей, ответы которых не сжимаются (защита от BREACH): там в теле токены
+    # (JWT, ссылки активации и сброса пароля, CSRF-токен в формах админки)
+    'EXCLUDE_PATHS': ('/api/v1/auth/', '/admin/'),
+}
+
+COMPRESSIBLE_CONTENT_TYPES = ('application/json', 'text/', 'application/javascript')
+
+_brotli_re = re.compile(r'\bbr\b')
+_gzip_re = re.compile(r'\bgzip\b')
+
+def get_compression_config():
+    return {**DEFAULT_RESPONSE_COMPRESSION, **getattr(settings, 'RESPONSE_COMPRESSION', {})}
+
+def choose_encoding(request, available=('br', 'gzip')):
+    accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if 'br' in available and brotli is not None and _brotli_re.search(accept):
+        return 'br'
+    if 'gzip' in available and _gzip_re.search(accept):
+        return 'gzip'
+    return None
+
+def compression_exempt(view_func):
+    """Помечает представление, ответы которого CompressionMiddleware не сжимает (как csrf_exempt)."""
+    view_func.compression_exempt = True
+    return view_func
+
+def compress(body, encoding, precompressed=False):
+    config = get_compression_config()
+    if encoding == 'br':
+        quality = config['PRECOMPRESSED_BROTLI_QUALITY'] if precompressed else config['BROTLI_QUALITY']
+        return brotli.compress(body, quality=quality)
+    return gzip.compress(body, compresslevel=config['GZIP_LEVEL'], mtime=0)
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжатие brotli/gzip ответов больше MIN_SIZE (аналог GZipMiddleware с порогом и brotli).
+    Ответы, у которых Content-Encoding уже выставлен (см. encode_payload), не трогает.
+
+    Сжатие ответа, где рядом лежат секрет и введённые пользователем данные, открывает
+    атаку BREACH: по длине сжатого тела секрет подбирается посимвольно. Поэтому ответы
+    с путями из EXCLUDE_PATHS и представлений с @compression_exempt идут без сжатия.
+    """
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, 'compression_exempt', False):
+            request._compression_exempt = True
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if getattr(request, '_compression_exempt', False):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_CONTENT_TYPES):
+            return response
+        config = get_compression_config()
+        if request.path.startswith(tuple(config['EXCLUDE_PATHS'])):
+            return response
+        if len(response.content) < config['MIN_SIZE']:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        available = ('br', 'gzip') if config['BROTLI'] else ('gzip',)
+        encoding = choose_encoding(request, available)
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # Тело изменилось — сильный ETag больше не верен (как в GZipMiddleware)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+# --- Заранее закодированные ответы для кэширующих представлений ---
+
+def encode_payload(data):
+    """
+    Рендерит данные в JSON один раз и сразу готовит сжатые варианты.
+    Результат (dict кодировка -> байты) кладётся в кэш и отдаётся через payload_response
+    без повторного рендеринга и сжатия.
+    """
+    body = FastJSONRenderer().render(data)
+    variants = {'identity': body}
+    config = get_compression_config()
+    if len(body) >= config['MIN_SIZE']:
+        variants['gzip'] = compress(body, 'gzip', precompressed=True)
+        if config['BROTLI'] and brotli is not None:
+            variants['br'] = compress(body, 'br', precompressed=True)
+    return variants
+
+def payload_response(request, variants, status=200):
+    encoding = choose_encoding(request, tuple(k for k in variants if k != 'identity'))
+    response = HttpResponse(variants[encoding or 'identity'], content_type='application/json', status=status)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+def wants_json(request):
+    """Заранее закодированный ответ подходит только при JSON-рендерере (не для Browsable API)."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    return renderer is not None and renderer.format == 'json'
@@ -0,0 +1,47 @@
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+def estimate_table_rows(model, using='default'):
+    """
+    Примерное число строк таблицы из статистики СУБД (без COUNT(*) по всей таблице).
+    None, если статистики нет (таблица ещё не анализировалась).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            elif connection.vendor == 'mysql':
+                cursor.execute("SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s", [table])
+            elif connection.vendor == 'sqlite':
+                # sqlite_stat1 появляется после ANALYZE; первое число в stat — количество строк
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if not row or row[0] is None:
+        return None
+    value = int(str(row[0]).split()[0])
+    return value if value >= 0 else None  # PostgreSQL отдаёт -1 для неанализированных таблиц
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для списков админки по большим таблицам. Для выборки без фильтров
+    берёт оценку из статистики СУБД вместо COUNT(*); маленькие таблицы и
+    отфильтрованные выборки считаются точно. Используется вместе с
+    show_full_result_count = False, иначе админка всё равно посчитает всё.
+    """
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where and not query.distinct and not query.combinator:
+            estimate = estimate_table_rows(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
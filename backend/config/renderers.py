@@ -0,0 +1,22 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него работает стандартный рендерер DRF
+    orjson = None
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson (в разы быстрее json.dumps на больших ответах).
+    Типы, которые orjson не знает (Decimal, lazy-строки, QuerySet и т.п.),
+    отдаются энкодеру DRF; запросы с отступами (indent) рендерит базовый класс.
+    """
+    _drf_encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=self._drf_encoder.default, option=orjson.OPT_NON_STR_KEYS)
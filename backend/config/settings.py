@@ -26,6 +26,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'config.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,10 +76,111 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'users.User'
 
 AUTHENTICATION_BACKENDS = [
+    # Наследуется от ModelBackend и покрывает вход по email, поэтому ModelBackend не дублируем
     'users.backends.UsernameOrEmailBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bilimgo-default',
+    },
+    # Вердикты проверки кода (courses.answers.check_code): LRU по MAX_ENTRIES + TTL
+    'code-verdicts': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bilimgo-code-verdicts',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    # Вёдра и счётчики ограничителей частоты (config.throttling): отдельно от общего кэша,
+    # чтобы чужие записи не вытесняли вёдра — вытесненное ведро снова полное
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bilimgo-throttle',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    # Счётчики неудачных входов (users.ratelimit): два ключа (логин, IP) на попытку, живут WINDOW.
+    # 200000 — 100 000 разных логинов за окно, с запасом на подбор по случайным именам
+    'login-attempts': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bilimgo-login-attempts',
+        'OPTIONS': {'MAX_ENTRIES': 200000},
+    },
+}
+
+# Поиск пользователей (users.search)
+USER_SEARCH = {
+    'MIN_QUERY_LENGTH': 3,
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 50,
+}
+
+# Полнотекстовый поиск по урокам (courses.search)
+CONTENT_SEARCH = {
+    'MIN_QUERY_LENGTH': 2,
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 50,
+    'PG_CONFIG': 'russian',
+}
+
+# Кэш ключей ответов на задания в памяти процесса (courses.answers)
+TASK_ANSWER_CACHE = {
+    'MAX_SIZE': 5000,
+    'VERSION_CHECK_INTERVAL': 5,
+    'TIMEOUT': 10 * 60,
+    'MAX_BATCH': 100,
+    'MAX_CODE_BATCH': 20,  # = BURST области answer-check в API_THROTTLES: кодовый ответ стоит токен
+    'CODE_WORKERS': 4,
+}
+
+# Кэш вердиктов для одинаковых решений кодовых заданий (courses.answers.check_code)
+CODE_VERDICT_CACHE = {
+    'CACHE': 'code-verdicts',
+    'TIMEOUT': 60 * 60 * 24,
+}
+
+# Сжатие ответов (config.compression.CompressionMiddleware)
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI': True,
+    'BROTLI_QUALITY': 5,
+    'PRECOMPRESSED_BROTLI_QUALITY': 11,
+    'EXCLUDE_PATHS': ('/api/v1/auth/', '/admin/'),  # ответы с токенами не сжимаются (BREACH)
+}
+
+# Ограничение неудачных попыток входа (users.ratelimit.LoginAttemptLimiter)
+LOGIN_RATE_LIMIT = {
+    'CACHE': 'login-attempts',
+    'MAX_ATTEMPTS': 10,
+    'WINDOW': 300,
+    'TRUSTED_PROXIES': 0,  # за nginx/балансировщиком — их число, иначе X-Forwarded-For игнорируется
+}
+
+# Сводка дашборда (users.dashboard): время жизни кэша на пользователя, секунд
+DASHBOARD = {
+    'CACHE_TIMEOUT': 30,
+}
+
+# Недельные/месячные таблицы лидеров (users.leaderboards)
+LEADERBOARDS = {
+    'TOP_SIZE': 100,
+    'CACHE_TIMEOUT': 60,
+    'KEEP_PERIODS': 12,
+}
+
+# Ограничение частоты запросов к эндпоинтам (config.throttling): token bucket на пользователя
+API_THROTTLES = {
+    'CACHE': 'throttle',
+    'STAFF_EXEMPT': True,
+    'SCOPES': {
+        'answer-check': {'RATE': 60, 'PERIOD': 60, 'BURST': 20},
+        'hint': {'RATE': 20, 'PERIOD': 60, 'BURST': 5},
+        'challenge-create': {'RATE': 10, 'PERIOD': 60 * 60, 'BURST': 5},
+        'friend-request': {'RATE': 20, 'PERIOD': 60 * 60, 'BURST': 10},
+    },
+}
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
@@ -92,7 +194,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'config.renderers.FastJSONRenderer',
     ],
 }
 
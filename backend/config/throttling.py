@@ -0,0 +1,131 @@
+"""
+Ограничение частоты запросов к дорогим и спам-опасным эндпоинтам: token bucket на области (scope).
+
+Ведро на пару (область, пользователь; для анонимов — IP) вмещает BURST запросов и пополняется
+со скоростью RATE запросов за PERIOD секунд. Состояние ведра (токены, время) лежит в локальном
+кэше (алиас CACHES из настройки CACHE); чтение-изменение-запись выполняется под блокировкой процесса,
+поэтому лимит действует на процесс — для приблизительной защиты от флуда этого достаточно.
+Кэш должен быть отдельным и с запасом по MAX_ENTRIES: вытесненное ведро возвращается полным,
+и в общем кэше клиент мог бы сбросить свой лимит, просто создавая другим записям вытеснение.
+
+Настройки — settings.API_THROTTLES поверх DEFAULT_API_THROTTLES, области (SCOPES) сливаются
+по отдельности; ключ USERS области задаёт переопределения для отдельных пользователей
+({id: {"RATE": ..., "BURST": ...}}, RATE=None — без ограничений).
+
+Запрос списывает столько токенов, сколько вернёт get_cost(): по умолчанию 1, представление может
+задать цену методом get_throttle_cost(request) — так пакетная проверка платит за каждое решение
+с исполнением кода. Цена ограничена ёмкостью ведра: иначе такой запрос не прошёл бы никогда;
+сам размер пакета ограничивает представление (TASK_ANSWER_CACHE['MAX_CODE_BATCH']).
+
+Отказ — 429 с заголовком Retry-After (DRF берёт его из wait()). Счётчики разрешённых
+и отклонённых запросов по областям — throttle_stats() / ThrottleStatsView.
+"""
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+from rest_framework.views import APIView
+
+DEFAULT_API_THROTTLES = {
+    'CACHE': 'throttle',
+    'STAFF_EXEMPT': True,
+    'SCOPES': {
+        'answer-check': {'RATE': 60, 'PERIOD': 60, 'BURST': 20},  # проверка ответов (может исполнять код)
+        'hint': {'RATE': 20, 'PERIOD': 60, 'BURST': 5},
+        'challenge-create': {'RATE': 10, 'PERIOD': 60 * 60, 'BURST': 5},
+        'friend-request': {'RATE': 20, 'PERIOD': 60 * 60, 'BURST': 10},
+    },
+}
+
+_lock = threading.Lock()
+
+def get_throttle_config():
+    overrides = getattr(settings, 'API_THROTTLES', {})
+    config = {**DEFAULT_API_THROTTLES, **overrides}
+    scopes = overrides.get('SCOPES', {})
+    config['SCOPES'] = {scope: {**DEFAULT_API_THROTTLES['SCOPES'].get(scope, {}), **scopes.get(scope, {})}
+                        for scope in {*DEFAULT_API_THROTTLES['SCOPES'], *scopes}}
+    return config
+
+def _throttle_cache():
+    return caches[get_throttle_config()['CACHE']]
+
+def _counter_key(scope, name): return f'throttle-stats:{scope}:{name}'
+
+def _bump_counter(scope, name):
+    throttle_cache, key = _throttle_cache(), _counter_key(scope, name)
+    try:
+        throttle_cache.incr(key)
+    except ValueError:
+        if not throttle_cache.add(key, 1, None):
+            throttle_cache.incr(key)
+
+class TokenBucketThrottle(BaseThrottle):
+    """Базовый класс: в наследнике задаётся scope (ключ DEFAULT_API_THROTTLES / settings.API_THROTTLES)."""
+    scope = None
+
+    def get_limits(self, request):
+        """(ёмкость ведра, токенов в секунду) или None — без ограничений."""
+        user, config = request.user, get_throttle_config()
+        if config['STAFF_EXEMPT'] and user.is_authenticated and user.is_staff:
+            return None
+        config = config['SCOPES'].get(self.scope, {})
+        if user.is_authenticated:
+            config = {**config, **config.get('USERS', {}).get(user.pk, {})}
+        if config.get('RATE') is None:
+            return None
+        return config.get('BURST') or config['RATE'], config['RATE'] / config.get('PERIOD', 60)
+
+    def get_cache_key(self, request):
+        ident = request.user.pk if request.user.is_authenticated else self.get_ident(request)
+        return f'throttle:{self.scope}:{ident}'
+
+    def get_cost(self, request, view):
+        """Сколько токенов стоит запрос: view.get_throttle_cost(request), если представление его задаёт, иначе 1."""
+        get_throttle_cost = getattr(view, 'get_throttle_cost', None)
+        return max(1, get_throttle_cost(request)) if get_throttle_cost else 1
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        limits = self.get_limits(request)
+        if limits is None:
+            return True
+        capacity, refill = limits
+        cost = min(self.get_cost(request, view), capacity)
+        key, now = self.get_cache_key(request), time.time()
+        throttle_cache = _throttle_cache()
+        with _lock:
+            tokens, updated = throttle_cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            else:
+                self.wait_seconds = (cost - tokens) / refill
+            # Ведро без запросов дольше времени полного пополнения снова полное — хранить его незачем
+            throttle_cache.set(key, (tokens, now), int(capacity / refill) + 1)
+        _bump_counter(self.scope, 'allowed' if allowed else 'throttled')
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+class AnswerCheckThrottle(TokenBucketThrottle): scope = 'answer-check'
+class HintThrottle(TokenBucketThrottle): scope = 'hint'
+class ChallengeCreateThrottle(TokenBucketThrottle): scope = 'challenge-create'
+class FriendRequestThrottle(TokenBucketThrottle): scope = 'friend-request'
+
+def throttle_stats():
+    scopes = sorted(get_throttle_config()['SCOPES'])
+    keys = {(scope, name): _counter_key(scope, name) for scope in scopes for name in ('allowed', 'throttled')}
+    counters = _throttle_cache().get_many(list(keys.values()))
+    return {scope: {name: counters.get(keys[scope, name], 0) for name in ('allowed', 'throttled')} for scope in scopes}
+
+class ThrottleStatsView(APIView):
+    """Счётчики ограничителей частоты по областям (для мониторинга)."""
+    permission_classes = [permissions.IsAdminUser]
+    def get(self, request, *args, **kwargs):
+        return Response(throttle_stats())
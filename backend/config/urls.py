@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from config.throttling import ThrottleStatsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -13,6 +14,7 @@ urlpatterns = [
     
     path('api/v1/', include('courses.urls')),
     path('api/v1/testing/', include('testing.urls')), # <-- Новый URL
+    path('api/v1/throttle_stats/', ThrottleStatsView.as_view(), name='throttle-stats'),
 
 ]
 
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import F, Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from users.streaks import user_local_date, safe_zone
+from users.leaderboards import record_xp
+from .models import ActivityEvent, DailyActivity
+
+def activity_date(user, when=None):
+    """Календарная дата события для дневной сводки — в часовом поясе пользователя."""
+    return user_local_date(user, when)
+
+def _bump_daily(user_id, day, lessons, xp):
+    updated = DailyActivity.objects.filter(user_id=user_id, date=day)\
+        .update(lessons_completed=F('lessons_completed') + lessons, xp_earned=F('xp_earned') + xp)
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            DailyActivity.objects.create(user_id=user_id, date=day, lessons_completed=lessons, xp_earned=xp)
+    except IntegrityError:
+        # Параллельный запрос успел создать строку за этот день
+        DailyActivity.objects.filter(user_id=user_id, date=day)\
+            .update(lessons_completed=F('lessons_completed') + lessons, xp_earned=F('xp_earned') + xp)
+
+def record_lesson_activity(user, lesson, kind, xp=0):
+    """Пишет событие в журнал и инкрементально обновляет дневную сводку и очки недели/месяца (users.leaderboards)."""
+    now = timezone.now()
+    with transaction.atomic():
+        event = ActivityEvent.objects.create(user=user, lesson=lesson, kind=kind, xp=xp, created_at=now)
+        _bump_daily(user.id, activity_date(user, now), 1, xp)
+        record_xp(user.id, xp, now)
+    return event
+
+def record_hint_penalty(user_id, xp):
+    """
+    Штраф за подсказку: событие с отрицательным XP и списание из очков текущих недели и месяца,
+    чтобы периодические таблицы лидеров не расходились с общим XP. Дневная сводка считает только уроки.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ActivityEvent.objects.create(user_id=user_id, kind=ActivityEvent.Kind.HINT_PENALTY, xp=-xp, created_at=now)
+        record_xp(user_id, -xp, now)
+
+def get_heatmap(user, days=365):
+    """[[YYYY-MM-DD, уроков], ...] за последние days дней — индексное чтение не более days строк."""
+    since = activity_date(user) - timedelta(days=days)
+    rows = DailyActivity.objects.filter(user=user, date__gte=since, lessons_completed__gt=0)\
+        .order_by('date').values_list('date', 'lessons_completed')
+    return [[day.strftime('%Y-%m-%d'), count] for day, count in rows]
+
+def rebuild_daily_activity(user_ids=None):
+    """Пересчитывает сводки из журнала событий (для починки или после переноса данных)."""
+    events = ActivityEvent.objects.exclude(kind=ActivityEvent.Kind.HINT_PENALTY)
+    rollups = DailyActivity.objects.all()
+    if user_ids is not None:
+        events = events.filter(user_id__in=user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+    with transaction.atomic():
+        rollups.delete()
+        # Дни считаются в часовом поясе пользователя, поэтому группируем по поясам
+        for tz_name in events.values_list('user__timezone', flat=True).distinct().order_by():
+            rows = events.filter(user__timezone=tz_name)\
+                .annotate(day=TruncDate('created_at', tzinfo=safe_zone(tz_name))).values('user_id', 'day')\
+                .annotate(lessons=Count('id'), xp=Sum('xp')).order_by()
+            DailyActivity.objects.bulk_create([
+                DailyActivity(user_id=row['user_id'], date=row['day'], lessons_completed=row['lessons'], xp_earned=row['xp'] or 0)
+                for row in rows.iterator()
+            ], batch_size=1000)
@@ -1,13 +1,16 @@
 from django.contrib import admin
+from django.http import StreamingHttpResponse
 from django.forms import Textarea
 from django.db import models
-from .models import Course, Skill, Lesson, Task, Hint, UserProgress, Badge, UserBadge, Challenge
+from config.paginators import EstimatedCountPaginator
+from .content_io import export_content
+from .models import Course, Skill, Lesson, Task, Hint, HintUsage, UserProgress, Badge, UserBadge, Challenge, ActivityEvent, DailyActivity
 
 class LessonInline(admin.StackedInline):
     model = Lesson; extra = 1
     formfield_overrides = { models.JSONField: {'widget': Textarea(attrs={'rows': 8, 'cols': 60})}, }
 
-class SkillInline(admin.StackedInline): model = Skill; extra = 1
+class SkillInline(admin.StackedInline): model = Skill; extra = 1; autocomplete_fields = ('parent',)
 class TaskInline(admin.StackedInline):
     model = Task; extra = 1
     formfield_overrides = {
@@ -19,18 +22,29 @@ class TaskInline(admin.StackedInline):
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
     list_display = ('title', 'is_published'); list_filter = ('is_published',); search_fields = ('title', 'description'); inlines = [SkillInline]
+    actions = ['export_jsonl']
+
+    @admin.action(description="Экспортировать контент в JSON Lines")
+    def export_jsonl(self, request, queryset):
+        # Для импорта: manage.py import_course_content <файл>
+        response = StreamingHttpResponse(export_content(list(queryset.values_list('id', flat=True))), content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="courses.jsonl"'
+        return response
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
     list_display = ('title', 'course', 'parent', 'order'); list_filter = ('course',); search_fields = ('title',); inlines = [LessonInline]
+    list_select_related = ('course', 'parent__course'); autocomplete_fields = ('course', 'parent')
 
 @admin.register(Lesson)
 class LessonAdmin(admin.ModelAdmin):
     list_display = ('title', 'skill', 'xp_reward', 'order'); list_filter = ('skill__course',); search_fields = ('title',); inlines = [TaskInline]
+    list_select_related = ('skill__course',); autocomplete_fields = ('skill',)
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ('question', 'lesson', 'task_type'); list_filter = ('lesson__skill__course', 'task_type'); search_fields = ('question',)
+    list_select_related = ('lesson',); autocomplete_fields = ('lesson',)
     fieldsets = (
         (None, { 'fields': ('lesson', 'task_type', 'question') }),
         ('Содержимое задания', { 'fields': ('code_template', 'options', 'correct_answer', 'time_limit') }),
@@ -42,16 +56,45 @@ class TaskAdmin(admin.ModelAdmin):
     }
 
 @admin.register(Hint)
-class HintAdmin(admin.ModelAdmin): list_display = ('text', 'task', 'xp_penalty')
+class HintAdmin(admin.ModelAdmin):
+    list_display = ('text', 'task', 'xp_penalty'); list_select_related = ('task__lesson',); autocomplete_fields = ('task',)
+
+# Таблицы, растущие с числом пользователей: фильтр по пользователю заменён поиском (list_filter
+# выводил бы каждого пользователя), точный COUNT(*) — оценкой (EstimatedCountPaginator).
 @admin.register(UserProgress)
-class UserProgressAdmin(admin.ModelAdmin): list_display = ('user', 'lesson', 'completed_at'); list_filter = ('user', 'lesson__skill__course')
+class UserProgressAdmin(admin.ModelAdmin):
+    list_display = ('user', 'lesson', 'completed_at'); list_filter = ('lesson__skill__course',)
+    search_fields = ('user__username', 'user__email'); list_select_related = ('user', 'lesson'); autocomplete_fields = ('user', 'lesson')
+    paginator = EstimatedCountPaginator; show_full_result_count = False
+@admin.register(HintUsage)
+class HintUsageAdmin(admin.ModelAdmin):
+    list_display = ('user', 'task', 'hint', 'xp_penalty', 'used_at')
+    search_fields = ('user__username', 'user__email'); list_select_related = ('user', 'task__lesson', 'hint'); raw_id_fields = ('user', 'task', 'hint')
+    paginator = EstimatedCountPaginator; show_full_result_count = False
 @admin.register(Badge)
 class BadgeAdmin(admin.ModelAdmin): list_display = ('title', 'code', 'description'); search_fields = ('title', 'code')
 @admin.register(UserBadge)
-class UserBadgeAdmin(admin.ModelAdmin): list_display = ('user', 'badge', 'awarded_at'); list_filter = ('badge', 'user')
+class UserBadgeAdmin(admin.ModelAdmin):
+    list_display = ('user', 'badge', 'awarded_at'); list_filter = ('badge',)
+    search_fields = ('user__username', 'user__email'); list_select_related = ('user', 'badge'); autocomplete_fields = ('user', 'badge')
+    paginator = EstimatedCountPaginator; show_full_result_count = False
 
 @admin.register(Challenge)
 class ChallengeAdmin(admin.ModelAdmin):
     list_display = ('sender', 'receiver', 'lesson', 'status', 'winner', 'created_at')
     list_filter = ('status', 'lesson__skill__course')
-    search_fields = ('sender__username', 'receiver__username', 'lesson__title')
\ No newline at end of file
+    search_fields = ('sender__username', 'receiver__username', 'lesson__title')
+    list_select_related = ('sender', 'receiver', 'lesson', 'winner'); autocomplete_fields = ('sender', 'receiver', 'lesson', 'winner')
+    paginator = EstimatedCountPaginator; show_full_result_count = False
+
+@admin.register(ActivityEvent)
+class ActivityEventAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'lesson', 'xp', 'created_at'); list_filter = ('kind',); date_hierarchy = 'created_at'
+    search_fields = ('user__username', 'user__email'); list_select_related = ('user', 'lesson'); raw_id_fields = ('user', 'lesson')
+    paginator = EstimatedCountPaginator; show_full_result_count = False
+
+@admin.register(DailyActivity)
+class DailyActivityAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date', 'lessons_completed', 'xp_earned'); date_hierarchy = 'date'
+    search_fields = ('user__username', 'user__email'); list_select_related = ('user',); raw_id_fields = ('user',)
+    paginator = EstimatedCountPaginator; show_full_result_count = False
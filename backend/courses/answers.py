@@ -0,0 +1,303 @@
+"""
+Проверка ответов на задания уроков.
+
+Ключи ответов (нормализованный правильный ответ, тип задания, способ сравнения) держатся
+в LRU-кэше внутри процесса, поэтому обычная проверка не обращается к базе. Сигналы Task
+и импорт контента удаляют ключи в своём процессе; остальные процессы не чаще
+VERSION_CHECK_INTERVAL секунд сверяют версию заданий, взятую из базы (число, максимальный id
+и максимальный updated_at), и при её изменении сбрасывают свои копии. Правки в обход
+auto_now (update() из консоли) версию не меняют — для них каждый ключ живёт не дольше TIMEOUT.
+
+Кодовые задания и задания-конструкторы сначала сравниваются с эталоном структурно
+(courses.ast_check): совпавший по AST ответ засчитывается без исполнения, исполнение
+(или для конструктора — сравнение текста) остаётся запасным путём. Код исполняется только
+в песочнице courses.grader — и с набором тестов, и без него.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from .models import Task
+from .grader import run_test_cases, execute_scope
+from .ast_check import canonical_form
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASK_ANSWER_CACHE = {
+    'MAX_SIZE': 5000,
+    'VERSION_CHECK_INTERVAL': 5,
+    'TIMEOUT': 10 * 60,     # предельный возраст ключа в процессе
+    'MAX_BATCH': 100,       # заданий в одном запросе пакетной проверки
+    'MAX_CODE_BATCH': 20,   # из них кодовых: не больше BURST области answer-check (config.throttling)
+    'CODE_WORKERS': 4,      # параллельных проверок кода в пакете
+}
+DEFAULT_CODE_VERDICT_CACHE = {
+    'CACHE': 'default',
+    'TIMEOUT': 60 * 60 * 24,
+}
+VERDICT_STATS_KEYS = {'hits': 'code-verdicts:hits', 'misses': 'code-verdicts:misses',
+                      'structural': 'code-verdicts:structural'}
+# Для этих типов правильный ответ не раскрывается после неверной попытки
+HIDDEN_ANSWER_TYPES = ('code', 'constructor')
+
+def get_answer_cache_config():
+    return {**DEFAULT_TASK_ANSWER_CACHE, **getattr(settings, 'TASK_ANSWER_CACHE', {})}
+
+def get_verdict_cache_config():
+    return {**DEFAULT_CODE_VERDICT_CACHE, **getattr(settings, 'CODE_VERDICT_CACHE', {})}
+
+def normalize_text(text: str):
+    return str(text).strip().lower()
+
+def _unescape(code):
+    return str(code).encode().decode('unicode_escape')
+
+def execute_and_compare_code(user_code: str, correct_code_example: str, correct_scope=None):
+    """
+    Задание без набора тестов: решение верно, если оставляет те же переменные, что и эталон.
+    Оба исполняются в песочнице courses.grader (отдельный процесс с таймаутом), не в процессе сервера;
+    correct_scope — уже вычисленные переменные эталона.
+    """
+    try:
+        user_code = _unescape(user_code)
+        if correct_scope is None:
+            correct_scope, _ = execute_scope(_unescape(correct_code_example))
+    except UnicodeDecodeError as e:
+        logger.debug('Ошибка при разборе кода: %s', e)
+        return False
+    if correct_scope is None:
+        return False
+    user_scope, error = execute_scope(user_code)
+    if error is not None:
+        logger.debug('Ошибка при выполнении кода: %s', error)
+    return user_scope == correct_scope
+
+# --- Вердикты кодовых заданий ---
+# Одинаковые решения (повторные отправки, типовые решения разных учеников) не исполняются
+# заново: вердикт кэшируется по (задание, хэш содержимого задания, хэш нормализованного кода).
+# Кэш — отдельный алиас CACHES с LRU-вытеснением и TTL; счётчики попаданий — verdict_cache_stats().
+
+def normalize_code(code):
+    """Нормализация без изменения смысла: переводы строк, хвостовые пробелы, пустые строки в конце."""
+    lines = str(code).replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).strip('\n')
+
+def _digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def _bump_counter(verdict_cache, name):
+    key = VERDICT_STATS_KEYS[name]
+    try:
+        verdict_cache.incr(key)
+    except ValueError:
+        if not verdict_cache.add(key, 1, None):
+            verdict_cache.incr(key)
+
+def _run_code_check(key, user_code, verdict_cache):
+    """
+    Совпавшие с эталоном по AST решения засчитываются без исполнения, неразбираемые — отклоняются.
+    Иначе задания с набором тестов проверяются харнессом (courses.grader) и дают отчёт; остальные — сравнением с эталоном.
+    """
+    if key.canonical is not None:
+        # Харнесс исполняет код как есть, сравнение с эталоном — после unicode_escape
+        canonical = canonical_form(user_code, unescape=not key.test_cases)
+        if canonical == key.canonical:
+            _bump_counter(verdict_cache, 'structural')
+            return True
+        if canonical is None:
+            return {'passed': False, 'cases': [], 'error': 'SyntaxError: код не разбирается.'} if key.test_cases else False
+    if key.test_cases:
+        return run_test_cases(user_code, key.test_cases)
+    correct_scope = _reference_scope(key, verdict_cache)
+    if correct_scope is None:
+        return False
+    return execute_and_compare_code(user_code, key.correct_answer, correct_scope)
+
+def _reference_scope(key, verdict_cache):
+    """
+    Переменные эталона задания без тестов: исполняется один раз на версию задания, дальше — из кэша
+    вердиктов. Ошибка не кэшируется — это мог быть таймаут под нагрузкой.
+    """
+    cache_key = f'code-reference:{key.task_id}:{key.content_hash[:16]}'
+    scope = verdict_cache.get(cache_key)
+    if scope is None:
+        try:
+            scope, error = execute_scope(_unescape(key.correct_answer))
+        except UnicodeDecodeError:
+            scope, error = None, 'эталон не декодируется'
+        if error is not None:
+            logger.warning('Эталон задания %s не исполняется: %s', key.task_id, error)
+            return None
+        verdict_cache.set(cache_key, scope, get_verdict_cache_config()['TIMEOUT'])
+    return scope
+
+def check_code(key, user_code):
+    """(верно ли, отчёт по тестам или None)."""
+    config = get_verdict_cache_config()
+    verdict_cache = caches[config['CACHE']]
+    cache_key = f'code-verdict:{key.task_id}:{key.content_hash[:16]}:{_digest(normalize_code(user_code))}'
+    verdict = verdict_cache.get(cache_key)
+    if verdict is not None:
+        _bump_counter(verdict_cache, 'hits')
+    else:
+        _bump_counter(verdict_cache, 'misses')
+        verdict = _run_code_check(key, user_code, verdict_cache)
+        verdict_cache.set(cache_key, verdict, config['TIMEOUT'])
+    if isinstance(verdict, dict):
+        return verdict['passed'], verdict
+    return verdict, None
+
+def verdict_cache_stats():
+    verdict_cache = caches[get_verdict_cache_config()['CACHE']]
+    counters = verdict_cache.get_many(list(VERDICT_STATS_KEYS.values()))
+    hits, misses, structural = (counters.get(VERDICT_STATS_KEYS[name], 0) for name in ('hits', 'misses', 'structural'))
+    return {'hits': hits, 'misses': misses, 'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+            'structural': structural}  # промахи, решённые сравнением AST без исполнения
+
+class AnswerKey(NamedTuple):
+    task_id: int
+    lesson_id: int
+    task_type: str
+    correct_answer: str
+    accepted: frozenset  # нормализованные допустимые ответы
+    content_hash: str    # меняется вместе с содержимым задания — старые вердикты перестают совпадать
+    test_cases: dict = None
+    canonical: str = None  # AST-форма эталона (courses.ast_check) для code/constructor
+
+    def grade(self, user_answer):
+        """(верно ли, отчёт по тестам или None)."""
+        if self.task_type == 'code':
+            return check_code(self, user_answer)
+        if normalize_text(user_answer) in self.accepted:
+            return True, None
+        if self.task_type == 'constructor' and self.canonical is not None:
+            return canonical_form(user_answer) == self.canonical, None
+        return False, None
+
+    def check(self, user_answer):
+        return self.grade(user_answer)[0]
+
+    @property
+    def revealed_answer(self):
+        return None if self.task_type in HIDDEN_ANSWER_TYPES else self.correct_answer
+
+def build_answer_key(task_id, lesson_id, task_type, correct_answer, test_cases=None):
+    content = f'{task_type}\0{correct_answer}\0{json.dumps(test_cases, sort_keys=True)}'
+    canonical = None
+    if task_type == 'code':
+        canonical = canonical_form(correct_answer, unescape=not test_cases)
+    elif task_type == 'constructor':
+        canonical = canonical_form(correct_answer)
+    return AnswerKey(task_id, lesson_id, task_type, correct_answer, frozenset([normalize_text(correct_answer)]),
+                     _digest(content), test_cases or None, canonical)
+
+def tasks_version():
+    """Версия заданий из базы: меняется при создании, удалении и сохранении любого задания."""
+    return tuple(Task.objects.aggregate(Count('id'), Max('id'), Max('updated_at')).values())
+
+class AnswerKeyCache:
+    """Потокобезопасный LRU: task_id -> (AnswerKey, время загрузки)."""
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = 0.0
+
+    def _sync_version(self):
+        interval = get_answer_cache_config()['VERSION_CHECK_INTERVAL']
+        now = time.monotonic()
+        if now - self._version_checked_at < interval:
+            return
+        version = tasks_version()
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._version_checked_at = now
+
+    def get_many(self, task_ids):
+        """{task_id: AnswerKey}; отсутствующие в кэше подгружаются одним запросом, несуществующие пропускаются."""
+        self._sync_version()
+        found, missing = {}, []
+        expired_before = time.monotonic() - get_answer_cache_config()['TIMEOUT']
+        with self._lock:
+            for task_id in task_ids:
+                entry = self._entries.get(task_id)
+                if entry is None or entry[1] < expired_before:
+                    missing.append(task_id)
+                else:
+                    self._entries.move_to_end(task_id)
+                    found[task_id] = entry[0]
+        if missing:
+            rows = Task.objects.filter(id__in=missing).values_list('id', 'lesson_id', 'task_type', 'correct_answer', 'test_cases')
+            loaded = {row[0]: build_answer_key(*row) for row in rows}
+            max_size, loaded_at = get_answer_cache_config()['MAX_SIZE'], time.monotonic()
+            with self._lock:
+                self._entries.update((task_id, (key, loaded_at)) for task_id, key in loaded.items())
+                for task_id in missing:
+                    if task_id not in loaded:
+                        self._entries.pop(task_id, None)  # задание удалено
+                while len(self._entries) > max_size:
+                    self._entries.popitem(last=False)
+            found.update(loaded)
+        return found
+
+    def get(self, task_id):
+        return self.get_many([task_id]).get(task_id)
+
+    def discard(self, task_id):
+        with self._lock:
+            self._entries.pop(task_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+answer_keys = AnswerKeyCache()
+
+def invalidate_answer_keys(*task_ids):
+    """
+    Сбрасывает ключи заданий (без аргументов — все) в этом процессе. Остальные процессы
+    увидят изменение по версии из базы (tasks_version).
+    """
+    if task_ids:
+        for task_id in task_ids:
+            answer_keys.discard(task_id)
+    else:
+        answer_keys.clear()
+
+def check_answers(answers):
+    """
+    Пакетная проверка: answers — [(task_id, ответ)], результат — [(task_id, AnswerKey или None, верно ли, отчёт)]
+    в том же порядке. Ключи берутся одним обращением к кэшу (промахи — одним запросом);
+    текстовые задания проверяются сразу, кодовые — параллельно в пуле потоков. Каждое исполнение
+    кода — процесс песочницы courses.grader с таймаутом, так что зациклившееся решение не занимает
+    поток дольше CODE_GRADER['TIMEOUT'].
+    """
+    keys = answer_keys.get_many([task_id for task_id, _ in answers])
+    verdicts = [(False, None)] * len(answers)
+    code_jobs = []
+    for index, (task_id, answer) in enumerate(answers):
+        key = keys.get(task_id)
+        if key is None:
+            continue
+        if key.task_type == 'code':
+            code_jobs.append((index, key, answer))
+        else:
+            verdicts[index] = key.grade(answer)
+    if len(code_jobs) == 1:
+        index, key, answer = code_jobs[0]
+        verdicts[index] = key.grade(answer)
+    elif code_jobs:
+        workers = min(get_answer_cache_config()['CODE_WORKERS'], len(code_jobs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for (index, _, _), verdict in zip(code_jobs, pool.map(lambda job: job[1].grade(job[2]), code_jobs)):
+                verdicts[index] = verdict
+    return [(task_id, keys.get(task_id), *verdict) for (task_id, _), verdict in zip(answers, verdicts)]
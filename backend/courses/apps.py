@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'courses'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import ensure_search_index
+
+        def restore_search_index(sender, using, **kwargs):
+            # SQLite теряет триггеры FTS при пересоздании таблицы документов в миграциях
+            from django.db import connections
+            ensure_search_index(connections[using])
+
+        post_migrate.connect(restore_search_index, sender=self, dispatch_uid='courses_restore_search_index')
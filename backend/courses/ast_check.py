@@ -0,0 +1,149 @@
+"""
+Структурная (AST) проверка ответов на кодовые задания и задания-конструкторы.
+
+Ответ и эталон разбираются в AST и сравниваются после канонизации: форматирование,
+пробелы, скобки, запись литералов (1_000 и 1000, '' и "") и докстринги не различаются;
+локальные переменные функций, lambda и включений переименовываются по порядку появления
+с разрешением областей видимости (_LocalRenamer). Параметры функций и имена уровня модуля
+не трогаются — по ним сравнивают исполнение (области видимости exec) и харнесс (именованные
+аргументы случаев). С global/nonlocal и := во включениях переименование не выполняется.
+
+Совпадение структуры означает верный ответ без исполнения. Несовпадение ничего не решает —
+тогда работает обычная проверка (исполнение или сравнение текста).
+"""
+import ast
+
+def _docstring_free(body):
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        return body[1:] or [ast.Pass()]
+    return body
+
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_SCOPES = _FUNCTIONS + _COMPREHENSIONS + (ast.ClassDef,)
+
+def _strip_docstrings(tree):
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef)):
+            node.body = _docstring_free(node.body)
+
+def _split_scope(node):
+    """(части узла, исполняемые в объемлющей области; тело новой области)."""
+    if isinstance(node, _COMPREHENSIONS):
+        first, *rest = node.generators
+        elements = [node.key, node.value] if isinstance(node, ast.DictComp) else [node.elt]
+        return [first.iter], [first.target, *first.ifs, *rest, *elements]
+    if isinstance(node, ast.ClassDef):
+        return node.decorator_list + node.bases + node.keywords, node.body
+    arguments = node.args
+    outer = arguments.defaults + [default for default in arguments.kw_defaults if default is not None]
+    if isinstance(node, ast.Lambda):
+        return outer, [node.body]
+    annotations = [arg.annotation for arg in _parameters(arguments) if arg.annotation is not None]
+    return node.decorator_list + outer + annotations + ([node.returns] if node.returns else []), node.body
+
+def _parameters(arguments):
+    return arguments.posonlyargs + arguments.args + arguments.kwonlyargs \
+        + [arg for arg in (arguments.vararg, arguments.kwarg) if arg is not None]
+
+class _Scope:
+    def __init__(self, node, parent):
+        self.node, self.parent = node, parent
+        self.kept = set()    # связанные имена, которые остаются как есть (параметры, импорты, def/class, except as, match)
+        self.stored = []     # имена присваиваний в порядке появления
+        self.names = []      # узлы Name, исполняемые в этой области
+        self.mapping = {}
+
+class _LocalRenamer:
+    """
+    Переименование локальных переменных с учётом областей видимости Python: функции, lambda,
+    включения (первый итератор — в объемлющей области) и тела классов (не видны вложенным функциям).
+    Имя в каждой области разрешается так же, как его разрешает интерпретатор, поэтому
+    переменная, затенённая параметром lambda или вложенной функции, не путается с внешней.
+    """
+    def __init__(self, tree):
+        self.root = _Scope(tree, None)
+        self.scopes = [self.root]
+        self.unsafe = False
+
+    def visit(self, node, scope):
+        if isinstance(node, (ast.Global, ast.Nonlocal)):
+            self.unsafe = True  # имя связывается в другой области — переименование могло бы изменить смысл
+        elif isinstance(node, ast.NamedExpr) and isinstance(scope.node, _COMPREHENSIONS):
+            self.unsafe = True  # := во включении присваивает в объемлющую функцию
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            scope.kept.add(node.name)
+        if isinstance(node, _SCOPES):
+            outer, inner = _split_scope(node)
+            for child in outer:
+                self.visit(child, scope)
+            inner_scope = _Scope(node, scope)
+            self.scopes.append(inner_scope)
+            if isinstance(node, _FUNCTIONS):
+                # Параметры — часть интерфейса (именованные аргументы, **kwargs), их не переименовываем
+                inner_scope.kept.update(arg.arg for arg in _parameters(node.args))
+            for child in inner:
+                self.visit(child, inner_scope)
+            return
+        if isinstance(node, ast.Name):
+            scope.names.append(node)
+            if isinstance(node.ctx, (ast.Store, ast.Del)):
+                scope.stored.append(node.id)
+        elif isinstance(node, ast.alias):
+            scope.kept.add((node.asname or node.name).split('.')[0])
+        elif isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)) and node.name:
+            scope.kept.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            scope.kept.add(node.rest)
+        for child in ast.iter_child_nodes(node):
+            self.visit(child, scope)
+
+    def resolve(self, name, scope):
+        """Область, в которой связано имя из scope (None — глобальное или встроенное)."""
+        target = scope
+        while target is not self.root:
+            # Тело класса видно только коду самого тела, не вложенным функциям и включениям
+            if (target is scope or not isinstance(target.node, ast.ClassDef)) \
+                    and (name in target.kept or name in target.stored):
+                return target
+            target = target.parent
+        return None
+
+    def rename(self):
+        for node in self.root.node.body:
+            self.visit(node, self.root)
+        if self.unsafe:
+            return
+        counter = 0
+        for scope in self.scopes:
+            if not isinstance(scope.node, _FUNCTIONS + _COMPREHENSIONS):
+                continue  # имена модуля и класса видны снаружи (exec, атрибуты) — не трогаем
+            for name in scope.stored:
+                if name not in scope.kept and name not in scope.mapping:
+                    scope.mapping[name] = f'·{counter}'  # не идентификатор — не совпадёт с именами из кода
+                    counter += 1
+        renames = []
+        for scope in self.scopes:
+            for node in scope.names:
+                target = self.resolve(node.id, scope)
+                if target is not None and node.id in target.mapping:
+                    renames.append((node, target.mapping[node.id]))
+        for node, name in renames:
+            node.id = name
+
+def canonical_form(code, unescape=False):
+    """
+    Канонический дамп AST или None, если код не разбирается.
+    unescape=True повторяет предобработку исполнения (decode('unicode_escape')).
+    """
+    try:
+        source = str(code)
+        if unescape:
+            source = source.encode().decode('unicode_escape')
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError, UnicodeError):
+        return None
+    _strip_docstrings(tree)
+    _LocalRenamer(tree).rename()
+    return ast.dump(tree, include_attributes=False)
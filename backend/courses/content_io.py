@@ -0,0 +1,286 @@
+"""
+Импорт и экспорт контента курсов в формате JSON Lines.
+
+Каждая строка — одна запись дерева Course -> Skill -> Lesson -> Task -> Hint:
+
+    {"type": "course", "ref": "course:1", "id": 1, "title": "...", "description": "...", ...}
+    {"type": "skill", "ref": "skill:4", "course": "course:1", "parent": null, "title": "...", "order": 0}
+    {"type": "lesson", "ref": "lesson:9", "skill": "skill:4", "title": "...", "theory_content": [...], ...}
+    {"type": "task", "ref": "task:20", "lesson": "lesson:9", "task_type": "text_input", ...}
+    {"type": "hint", "task": "task:20", "text": "...", "xp_penalty": 1, "order": 0}
+
+ref — произвольная строка, уникальная в пределах файла; ссылки на родителя задаются ref-ом
+из того же файла (родитель должен встретиться раньше) или числовым id уже существующей записи.
+
+По умолчанию каждая запись создаёт новый объект, id из файла игнорируется: первичные ключи
+другой базы указывают здесь на посторонние курсы и уроки. С replace=True (import_course_content
+--replace — только для выгрузки из этой же базы) запись с id существующего объекта обновляет
+его, без id (или с неизвестным id) — создаёт новый.
+"""
+import gzip
+import json
+from collections import Counter
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from .models import Course, Skill, Lesson, Task, Hint
+from .search import reindex_lessons
+from .answers import invalidate_answer_keys
+from .hints import invalidate_task_hints
+from .skill_tree import rebuild_skill_tree
+from .services import touch_courses
+
+# type -> (модель, простые поля, ссылки {поле: type}, обязательные ключи)
+RECORD_SPECS = {
+    'course': (Course, ['title', 'description', 'image_url', 'is_published'], {}, ['title', 'description']),
+    'skill': (Skill, ['title', 'order'], {'course': 'course', 'parent': 'skill'}, ['course', 'title']),
+    'lesson': (Lesson, ['title', 'theory_content', 'xp_reward', 'order'], {'skill': 'skill'}, ['skill', 'title']),
+    'task': (Task, ['task_type', 'question', 'options', 'correct_answer', 'code_template', 'time_limit', 'test_cases'], {'lesson': 'lesson'},
+             ['lesson', 'task_type', 'question', 'correct_answer']),
+    'hint': (Hint, ['text', 'xp_penalty', 'order'], {'task': 'task'}, ['task', 'text']),
+}
+NULLABLE_REFS = {('skill', 'parent')}
+# Ссылка на место записи в дереве: при её смене задеты и прежний курс/урок
+LOCATION_REFS = {'skill': 'course_id', 'lesson': 'skill_id', 'task': 'lesson_id', 'hint': 'task_id'}
+MAX_REPORTED_ERRORS = 100
+
+class ContentImportError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"Импорт отменён, ошибок: {len(errors)}")
+
+def open_content_file(path, mode='rt'):
+    """Файлы *.gz читаются и пишутся сжатыми."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+# --- Экспорт ---
+
+def _ref(record_type, pk):
+    return f'{record_type}:{pk}' if pk is not None else None
+
+def _ordered_skills(skills):
+    """Родительские навыки раньше дочерних, чтобы импорт мог разрешить ссылку parent."""
+    by_parent = {}
+    for skill in skills:
+        by_parent.setdefault(skill.parent_id, []).append(skill)
+    ids = {skill.id for skill in skills}
+    stack = [s for parent_id, children in by_parent.items() if parent_id not in ids for s in children][::-1]
+    while stack:
+        skill = stack.pop()
+        yield skill
+        stack.extend(reversed(by_parent.get(skill.id, [])))
+
+def export_content(course_ids=None, chunk_size=1000):
+    """Генератор строк JSON Lines. Уроки, задания и подсказки читаются через iterator() и не копятся в памяти."""
+    courses = Course.objects.order_by('id')
+    if course_ids:
+        courses = courses.filter(id__in=course_ids)
+    dump = lambda record: json.dumps(record, ensure_ascii=False) + '\n'
+    for course in courses.iterator(chunk_size=chunk_size):
+        yield dump({'type': 'course', 'ref': _ref('course', course.id), 'id': course.id, 'title': course.title,
+                    'description': course.description, 'image_url': course.image_url, 'is_published': course.is_published})
+        for skill in _ordered_skills(list(Skill.objects.filter(course=course).order_by('order', 'id'))):
+            yield dump({'type': 'skill', 'ref': _ref('skill', skill.id), 'id': skill.id, 'course': _ref('course', course.id),
+                        'parent': _ref('skill', skill.parent_id), 'title': skill.title, 'order': skill.order})
+        for lesson in Lesson.objects.filter(skill__course=course).order_by('skill_id', 'order', 'id').iterator(chunk_size=chunk_size):
+            yield dump({'type': 'lesson', 'ref': _ref('lesson', lesson.id), 'id': lesson.id, 'skill': _ref('skill', lesson.skill_id),
+                        'title': lesson.title, 'theory_content': lesson.theory_content, 'xp_reward': lesson.xp_reward, 'order': lesson.order})
+        for task in Task.objects.filter(lesson__skill__course=course).order_by('lesson_id', 'id').iterator(chunk_size=chunk_size):
+            yield dump({'type': 'task', 'ref': _ref('task', task.id), 'id': task.id, 'lesson': _ref('lesson', task.lesson_id),
+                        'task_type': task.task_type, 'question': task.question, 'options': task.options,
+                        'correct_answer': task.correct_answer, 'code_template': task.code_template, 'time_limit': task.time_limit,
+                        'test_cases': task.test_cases})
+        for hint in Hint.objects.filter(task__lesson__skill__course=course).order_by('task_id', 'order', 'id').iterator(chunk_size=chunk_size):
+            yield dump({'type': 'hint', 'ref': _ref('hint', hint.id), 'id': hint.id, 'task': _ref('task', hint.task_id),
+                        'text': hint.text, 'xp_penalty': hint.xp_penalty, 'order': hint.order})
+
+# --- Импорт ---
+
+class ContentImporter:
+    """
+    Потоковый upsert дерева контента. Записи копятся в буферах по типам и сбрасываются
+    через bulk_create/bulk_update пачками batch_size; буфер сбрасывается досрочно, когда
+    на ещё не сохранённую запись ссылается потомок (нужен её id).
+    """
+    def __init__(self, batch_size=1000, replace=False):
+        self.batch_size = batch_size
+        self.replace = replace
+        self.ids = {}                                   # (type, ref) -> id в базе
+        self.pending = {t: {} for t in RECORD_SPECS}    # type -> {ref: instance}
+        self.known_db_ids = {t: {} for t in RECORD_SPECS}
+        self.errors = []
+        self.stats = Counter()
+        self.touched_lessons = set()
+        self.touched_courses = set()
+        self.touched_hint_tasks = set()
+
+    def error(self, line_no, message):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"строка {line_no}: {message}")
+        else:
+            self.stats['suppressed_errors'] += 1
+
+    def _db_id_exists(self, record_type, pk):
+        cache_ = self.known_db_ids[record_type]
+        if pk not in cache_:
+            cache_[pk] = RECORD_SPECS[record_type][0].objects.filter(pk=pk).exists()
+        return cache_[pk]
+
+    def _resolve(self, line_no, record_type, value):
+        if isinstance(value, bool):
+            value = None
+        if isinstance(value, int):
+            if self._db_id_exists(record_type, value):
+                return value
+            self.error(line_no, f"{record_type} с id={value} не найден")
+            return None
+        if isinstance(value, str):
+            if value in self.pending[record_type]:
+                self.flush(record_type)
+            if (record_type, value) in self.ids:
+                return self.ids[(record_type, value)]
+        self.error(line_no, f"неизвестная ссылка на {record_type}: {value!r}")
+        return None
+
+    def feed(self, line_no, record):
+        if not isinstance(record, dict) or record.get('type') not in RECORD_SPECS:
+            self.error(line_no, "ожидается объект с type из " + ', '.join(RECORD_SPECS))
+            return
+        record_type = record['type']
+        model, fields, refs, required = RECORD_SPECS[record_type]
+        missing = [key for key in required if record.get(key) in (None, '')]
+        if missing:
+            self.error(line_no, f"{record_type}: не заполнены поля {', '.join(missing)}")
+            return
+        ref = record.get('ref') or f'__line:{line_no}'
+        if (record_type, ref) in self.ids or ref in self.pending[record_type]:
+            self.error(line_no, f"повторяющийся ref {ref!r}")
+            return
+
+        values = {field: record[field] for field in fields if field in record}
+        for field, target_type in refs.items():
+            value = record.get(field)
+            if value is None and (record_type, field) in NULLABLE_REFS:
+                values[f'{field}_id'] = None
+                continue
+            resolved = self._resolve(line_no, target_type, value)
+            if resolved is None:
+                return
+            values[f'{field}_id'] = resolved
+
+        pk = record.get('id') if self.replace else None
+        instance = model(pk=pk if isinstance(pk, int) and not isinstance(pk, bool) else None, **values)
+        try:
+            # Отсутствующие в записи поля берут значения по умолчанию модели
+            instance.clean_fields(exclude=list(refs) + [field for field in fields if field not in record])
+        except ValidationError as exc:
+            self.error(line_no, f"{record_type}: {exc.message_dict}")
+            return
+        self.pending[record_type][ref] = instance
+        if len(self.pending[record_type]) >= self.batch_size:
+            self.flush(record_type)
+
+    def flush(self, record_type):
+        pending = self.pending[record_type]
+        if not pending:
+            return
+        model, fields, refs, _ = RECORD_SPECS[record_type]
+        self.pending[record_type] = {}
+        candidate_ids = [inst.pk for inst in pending.values() if inst.pk is not None]
+        existing = set(model.objects.filter(pk__in=candidate_ids).values_list('pk', flat=True)) if candidate_ids else set()
+        to_create, to_update = [], []
+        for instance in pending.values():
+            if instance.pk in existing:
+                to_update.append(instance)
+            else:
+                instance.pk = None
+                to_create.append(instance)
+        model.objects.bulk_create(to_create, batch_size=self.batch_size)
+        location = LOCATION_REFS.get(record_type)
+        previous = {}
+        if to_update and location:
+            previous = dict(model.objects.filter(pk__in=[instance.pk for instance in to_update]).values_list('pk', location))
+        if to_update:
+            update_fields = fields + [f'{field}_id' for field in refs]
+            if record_type == 'task':
+                # bulk_update не применяет auto_now, а по updated_at процессы замечают изменение заданий
+                now = timezone.now()
+                for instance in to_update:
+                    instance.updated_at = now
+                update_fields.append('updated_at')
+            model.objects.bulk_update(to_update, update_fields, batch_size=self.batch_size)
+        for ref, instance in pending.items():
+            self.ids[(record_type, ref)] = instance.pk
+            self.known_db_ids[record_type][instance.pk] = True
+        if to_create:
+            self.stats[f'{record_type}_created'] += len(to_create)
+        if to_update:
+            self.stats[f'{record_type}_updated'] += len(to_update)
+
+        # id переехавшей записи -> прежний родитель
+        moved = {instance.pk: previous[instance.pk] for instance in to_update
+                 if instance.pk in previous and previous[instance.pk] != getattr(instance, location)}
+        if record_type == 'course':
+            self.touched_courses.update(instance.pk for instance in pending.values())
+        elif record_type == 'skill':
+            self.touched_courses.update(instance.course_id for instance in pending.values())
+            self.touched_courses.update(moved.values())
+            # У уроков переехавшего навыка меняется курс в поисковом индексе
+            self.touched_lessons.update(Lesson.objects.filter(skill_id__in=moved).values_list('id', flat=True))
+        elif record_type == 'lesson':
+            self.touched_lessons.update(instance.pk for instance in pending.values())
+            self.touched_courses.update(Skill.objects.filter(id__in=moved.values()).values_list('course_id', flat=True))
+        elif record_type == 'task':
+            self.touched_lessons.update(instance.lesson_id for instance in pending.values())
+            self.touched_lessons.update(moved.values())
+        elif record_type == 'hint':
+            task_ids = [instance.task_id for instance in pending.values()] + list(moved.values())
+            self.touched_hint_tasks.update(task_ids)
+            self.touched_lessons.update(Task.objects.filter(id__in=task_ids).values_list('lesson_id', flat=True))
+
+    def finish(self):
+        for record_type in RECORD_SPECS:
+            self.flush(record_type)
+
+def import_content(lines, batch_size=1000, dry_run=False, replace=False):
+    """
+    Импортирует строки JSON Lines одной транзакцией. При любой ошибке (или dry_run) всё
+    откатывается; ошибки по строкам — в ContentImportError.errors. Возвращает статистику.
+    replace — обновлять записи с совпадающим id (см. описание модуля).
+    bulk-операции не вызывают сигналы, поэтому поисковый индекс и кэши обновляются здесь же.
+    """
+    importer = ContentImporter(batch_size=batch_size, replace=replace)
+    with transaction.atomic():
+        for line_no, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                importer.error(line_no, f"некорректный JSON: {exc}")
+                continue
+            importer.feed(line_no, record)
+        if not importer.errors:
+            importer.finish()
+        if importer.errors:
+            raise ContentImportError(importer.errors)
+        if dry_run:
+            transaction.set_rollback(True)
+            return importer.stats
+
+        if importer.stats['skill_created'] or importer.stats['skill_updated']:
+            rebuild_skill_tree(importer.touched_courses)  # bulk_create/bulk_update не вызывают сигналы Skill
+        lesson_ids = sorted(importer.touched_lessons)
+        for start in range(0, len(lesson_ids), batch_size):
+            reindex_lessons(lesson_ids[start:start + batch_size])
+        course_ids = set(Lesson.objects.filter(id__in=lesson_ids).values_list('skill__course_id', flat=True))
+        course_ids |= importer.touched_courses
+        touch_courses(*course_ids)  # bulk_update не применяет auto_now, версию курсов сдвигаем явно
+    if importer.stats['task_created'] or importer.stats['task_updated']:
+        invalidate_answer_keys()
+    if importer.touched_hint_tasks:
+        invalidate_task_hints(*importer.touched_hint_tasks)
+    return importer.stats
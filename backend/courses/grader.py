@@ -0,0 +1,257 @@
+"""
+Проверка кодовых заданий: по набору тестов (Task.test_cases, QuestionBank.test_cases)
+или, для заданий без тестов, сравнением переменных, которые оставляют решение и эталон (execute_scope).
+
+Формат набора:
+    {"function": "solve", "cases": [{"args": [1, 2], "expected": 3}, {"kwargs": {"n": 0}, "expected": 0}]}
+
+Решение и все случаи выполняются одним запуском процесса-исполнителя в песочнице: без сети,
+с пустым корнем только для чтения, от непривилегированного uid (см. JAIL_* в DEFAULT_CODE_GRADER),
+с пустым окружением, общим таймаутом и лимитами CPU/памяти/записи файлов/процессов — их
+исполнитель ставит себе сам перед запуском решения (preexec_fn небезопасен в потоках).
+Урезанные builtins — не защита (из решения достижим любой объект интерпретатора), защищает песочница.
+
+Функция решения вызывается с аргументами каждого случая; ожидаемые значения исполнителю
+не передаются — результаты (JSON) сравнивает родительский процесс, поэтому подделанный решением
+отчёт не даёт зачёта. Проверка останавливается на первом несовпадении, кортежи становятся
+списками. Для каждого случая возвращается время выполнения; текст ошибок урезается до строки.
+
+В режиме переменных исполнитель возвращает переменные верхнего уровня кода в JSON (множества —
+отсортированными списками); значения, которых JSON не выражает (функции, классы), делают результат
+несравнимым — как и прежнее сравнение объектов, которое для них всегда давало «не равно».
+"""
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CODE_GRADER = {
+    'TIMEOUT': 5,           # секунд на весь прогон
+    'MEMORY_MB': 256,
+    'MAX_CASES': 50,
+    'MAX_OUTPUT': 1024 * 1024,  # байт отчёта исполнителя
+    # Изоляция по умолчанию: unshare (сеть, монтирования, PID, IPC, UTS), пустой корень tmpfs
+    # только для чтения, chroot, no_new_privs и uid JAIL_UID (если сервер запущен от root).
+    # JAIL_COMMAND — префикс внешней песочницы вместо неё, например
+    # ['nsjail', '--config', '/etc/nsjail/grader.cfg', '--'] (seccomp-фильтр задаётся в её конфиге).
+    'JAIL_COMMAND': None,
+    'JAIL_UID': 65534,          # nobody
+    'ALLOW_UNJAILED': False,    # без unshare — запускать без изоляции (только для разработки)
+}
+
+SAFE_BUILTINS = (
+    'abs', 'all', 'any', 'bool', 'dict', 'divmod', 'enumerate', 'filter', 'float', 'int', 'isinstance',
+    'len', 'list', 'map', 'max', 'min', 'pow', 'print', 'range', 'reversed', 'round', 'set', 'sorted',
+    'str', 'sum', 'tuple', 'zip', 'True', 'False', 'None',
+    'Exception', 'ValueError', 'TypeError', 'IndexError', 'KeyError', 'ZeroDivisionError',
+)
+
+WORKER_SOURCE = r'''
+import builtins, ctypes, io, json, os, sys, time
+try:
+    import resource  # до chroot: после него модули расширений уже не загрузить
+except ImportError:  # не POSIX: остаются только таймаут и отдельный процесс
+    resource = None
+data = json.loads(sys.stdin.read())
+jail = data["jail"]
+if jail:
+    # Пустой корень только для чтения (tmpfs в своём пространстве имён монтирования) и чужой uid
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.mount(b"none", jail["root"].encode(), b"tmpfs", 1, b"size=4k,mode=555") != 0:  # MS_RDONLY
+        sys.exit("mount: errno %d" % ctypes.get_errno())
+    os.chroot(jail["root"])
+    os.chdir("/")
+    if libc.prctl(38, 1, 0, 0, 0) != 0:  # PR_SET_NO_NEW_PRIVS
+        sys.exit("prctl: errno %d" % ctypes.get_errno())
+    if jail["uid"] is not None:
+        os.setgroups([])
+        os.setgid(jail["uid"])
+        os.setuid(jail["uid"])
+if resource is not None:
+    # Лимиты ставит сам исполнитель до запуска решения: preexec_fn небезопасен в многопоточном сервере
+    limits = data["limits"]
+    resource.setrlimit(resource.RLIMIT_CPU, (limits["cpu"], limits["cpu"]))
+    resource.setrlimit(resource.RLIMIT_AS, (limits["memory"], limits["memory"]))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+out = sys.stdout
+sys.stdout = io.StringIO()  # print() решения не должен портить отчёт
+safe = {name: getattr(builtins, name) for name in data["builtins"] if hasattr(builtins, name)}
+scope = {"__builtins__": safe}
+report = {"cases": []}
+
+def describe(exc):
+    return "%s: %s" % (type(exc).__name__, str(exc)[:200])
+
+def encode(value):
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": sorted(json.dumps(item, default=encode, sort_keys=True) for item in value)}
+    raise TypeError("значение типа %s несравнимо" % type(value).__name__)
+
+if data["function"] is None:
+    # Режим переменных: отдельный словарь локальных имён, как у exec(code, globals, locals)
+    variables = {}
+    try:
+        exec(compile(data["code"], "<solution>", "exec"), scope, variables)
+        report["scope"] = json.dumps(variables, default=encode, sort_keys=True)
+    except BaseException as exc:
+        report["error"] = describe(exc)
+    out.write(json.dumps(report))
+    sys.exit(0)
+
+try:
+    exec(compile(data["code"], "<solution>", "exec"), scope)
+    func = scope.get(data["function"])
+    if not callable(func):
+        raise NameError("функция %s не найдена" % data["function"])
+except BaseException as exc:
+    report["error"] = describe(exc)
+else:
+    # Ожидаемых значений исполнитель не видит: сравнивает родительский процесс
+    for case in data["cases"]:
+        started = time.perf_counter()
+        entry = {}
+        try:
+            entry["result"] = json.dumps(func(*case.get("args", []), **case.get("kwargs", {})))
+        except BaseException as exc:
+            entry["error"] = describe(exc)
+        entry["time_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        report["cases"].append(entry)
+out.write(json.dumps(report))
+'''
+
+def get_grader_config():
+    return {**DEFAULT_CODE_GRADER, **getattr(settings, 'CODE_GRADER', {})}
+
+def validate_test_cases(value):
+    """Валидатор поля test_cases."""
+    if value in (None, ''):
+        return
+    if not isinstance(value, dict) or not str(value.get('function', '')).isidentifier():
+        raise ValidationError('Ожидается объект {"function": "<имя функции>", "cases": [...]}.')
+    cases = value.get('cases')
+    if not isinstance(cases, list) or not cases:
+        raise ValidationError('"cases" — непустой список.')
+    if len(cases) > get_grader_config()['MAX_CASES']:
+        raise ValidationError(f"Не больше {get_grader_config()['MAX_CASES']} случаев.")
+    for index, case in enumerate(cases):
+        if not isinstance(case, dict) or 'expected' not in case:
+            raise ValidationError(f'Случай {index}: нужен объект с ключом "expected".')
+        if not isinstance(case.get('args', []), list) or not isinstance(case.get('kwargs', {}), dict):
+            raise ValidationError(f'Случай {index}: "args" — список, "kwargs" — объект.')
+
+def _jail_command(config):
+    """
+    Префикс команды изоляции и параметры изоляции для самого исполнителя.
+    None — изолировать нечем (нет unshare), и запуск без изоляции не разрешён.
+    """
+    if config['JAIL_COMMAND']:
+        return list(config['JAIL_COMMAND']), None  # внешняя песочница (nsjail) изолирует сама
+    unshare = shutil.which('unshare')
+    if unshare is None:
+        return ([], None) if config['ALLOW_UNJAILED'] else None
+    command = [unshare, '--net', '--mount', '--pid', '--ipc', '--uts', '--fork', '--kill-child']
+    if os.geteuid() == 0:
+        return command, {'uid': config['JAIL_UID']}
+    # Без root: пространство имён пользователя, uid снаружи и так непривилегированный
+    return [unshare, '--user', '--map-root-user'] + command[1:], {'uid': None}
+
+def _public_error(text):
+    # Пользователю — только первая строка сообщения, без хвостов произвольной длины
+    return str(text).strip().splitlines()[0][:200] if str(text).strip() else 'Ошибка выполнения.'
+
+def _compare(report, cases):
+    verdict = {'passed': False, 'cases': []}
+    if 'error' in report:
+        verdict['error'] = _public_error(report['error'])
+        return verdict
+    for index, case in enumerate(cases):
+        if index >= len(report['cases']):
+            verdict['error'] = 'Решение завершилось аварийно.'
+            return verdict
+        entry = report['cases'][index]
+        result = {'index': index, 'passed': False, 'time_ms': entry.get('time_ms')}
+        if 'error' in entry:
+            result['error'] = _public_error(entry['error'])
+        else:
+            # JSON-преобразование: кортежи становятся списками
+            result['passed'] = json.loads(entry['result']) == case['expected']
+        verdict['cases'].append(result)
+        if not result['passed']:
+            return verdict
+    verdict['passed'] = True
+    return verdict
+
+def _run_worker(code, function=None, cases=()):
+    """Запускает исполнитель в песочнице. Возвращает (отчёт исполнителя или None, ошибка для пользователя или None)."""
+    config = get_grader_config()
+    jail = _jail_command(config)
+    if jail is None:
+        logger.error('Проверка кода отключена: нет unshare, а CODE_GRADER["ALLOW_UNJAILED"] не включён')
+        return None, 'Проверка кода временно недоступна.'
+    prefix, jail_options = jail
+    with tempfile.TemporaryDirectory(prefix='grader-') as root:
+        payload = json.dumps({
+            'code': str(code), 'function': function, 'builtins': SAFE_BUILTINS,
+            'cases': [{'args': case.get('args', []), 'kwargs': case.get('kwargs', {})} for case in cases],
+            'jail': {**jail_options, 'root': root} if jail_options else None,
+            'limits': {'cpu': config['TIMEOUT'] + 1, 'memory': config['MEMORY_MB'] * 1024 * 1024},
+        })
+        try:
+            completed = subprocess.run(
+                prefix + [sys.executable, '-I', '-S', '-c', WORKER_SOURCE], input=payload, capture_output=True,
+                text=True, timeout=config['TIMEOUT'], env={}, cwd=root,
+            )
+        except subprocess.TimeoutExpired:
+            return None, 'Превышено время выполнения.'
+    try:
+        if len(completed.stdout) > config['MAX_OUTPUT']:
+            raise ValueError('слишком большой отчёт')
+        report = json.loads(completed.stdout)
+        if not isinstance(report, dict):
+            raise TypeError('отчёт не объект')
+        return report, None
+    except (ValueError, TypeError):
+        # Процесс убит по лимиту памяти/CPU или упал до отчёта
+        if completed.stderr and completed.returncode not in (0, -9):
+            logger.warning('Исполнитель проверки кода: код %s, %s', completed.returncode, completed.stderr[-500:])
+        return None, 'Решение завершилось аварийно.'
+
+def run_test_cases(code, spec):
+    """
+    Прогоняет решение по набору тестов. Возвращает отчёт:
+    {"passed": bool, "cases": [{"index", "passed", "time_ms", "error"?}], "error"?: str}
+    """
+    report, error = _run_worker(code, spec['function'], spec['cases'])
+    if error is not None:
+        return {'passed': False, 'cases': [], 'error': error}
+    try:
+        return _compare(report, spec['cases'])
+    except (ValueError, KeyError, TypeError, AttributeError, IndexError):
+        # Отчёт подделан решением
+        return {'passed': False, 'cases': [], 'error': 'Решение завершилось аварийно.'}
+
+def execute_scope(code):
+    """
+    Исполняет код в песочнице и возвращает его переменные верхнего уровня:
+    (словарь или None, ошибка для пользователя или None).
+    """
+    report, error = _run_worker(code)
+    if error is not None:
+        return None, error
+    try:
+        if 'error' in report:
+            return None, _public_error(report['error'])
+        scope = json.loads(report['scope'])
+        if not isinstance(scope, dict):
+            raise TypeError('переменные не объект')
+        return scope, None
+    except (ValueError, KeyError, TypeError):
+        return None, 'Решение завершилось аварийно.'
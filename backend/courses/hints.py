@@ -0,0 +1,62 @@
+"""
+Лестница подсказок заданий.
+
+Подсказки выдаются по порядку (Hint.order): каждый запрос открывает следующую ещё не открытую
+подсказку и списывает её штраф — один раз, при создании HintUsage; уже открытые подсказки
+возвращаются бесплатно. Список подсказок задания кэшируется (сбрасывается сигналами Hint
+и импортом контента), XP списывается одним UPDATE без сохранения всего пользователя, а штраф
+пишется в журнал активности и вычитается из очков недели и месяца (courses.activity).
+
+Текст подсказки отдаётся только отсюда (RequestHintView): в теле урока у подсказок нет текста
+(courses.serializers.HintSerializer), иначе лестницу можно было бы обойти, не платя штраф.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from .models import Task, Hint, HintUsage
+from .activity import record_hint_penalty
+
+TASK_HINTS_CACHE_TIMEOUT = 60 * 60
+
+def task_hints_cache_key(task_id): return f'task-hints:{task_id}'
+
+def get_task_hints(task_id):
+    """Подсказки задания по порядку: [{"id", "text", "xp_penalty", "order"}]; None, если задания нет."""
+    key = task_hints_cache_key(task_id)
+    hints = cache.get(key)
+    if hints is None:
+        hints = list(Hint.objects.filter(task_id=task_id).order_by('order', 'id').values('id', 'text', 'xp_penalty', 'order'))
+        if not hints and not Task.objects.filter(id=task_id).exists():
+            return None
+        cache.set(key, hints, TASK_HINTS_CACHE_TIMEOUT)
+    return hints
+
+def invalidate_task_hints(*task_ids):
+    cache.delete_many([task_hints_cache_key(task_id) for task_id in task_ids])
+
+def reveal_next_hint(user, task_id):
+    """
+    Открывает следующую подсказку. Возвращает (подсказки задания или None, открытые подсказки,
+    новая подсказка или None, списано XP). Новая подсказка None — все уже открыты (или их нет).
+    """
+    hints = get_task_hints(task_id)
+    if not hints:
+        return hints, [], None, 0
+    used = set(HintUsage.objects.filter(user=user, task_id=task_id).values_list('hint_id', flat=True))
+    revealed = [hint for hint in hints if hint['id'] in used]
+    hint = next((hint for hint in hints if hint['id'] not in used), None)
+    if hint is None:
+        return hints, revealed, None, 0
+    try:
+        with transaction.atomic():
+            HintUsage.objects.create(user=user, task_id=task_id, hint_id=hint['id'], xp_penalty=hint['xp_penalty'])
+            if hint['xp_penalty']:
+                get_user_model().objects.filter(pk=user.pk)\
+                    .update(xp=Greatest(F('xp') - hint['xp_penalty'], Value(0)))
+                record_hint_penalty(user.pk, hint['xp_penalty'])
+        penalty = hint['xp_penalty']
+    except IntegrityError:
+        penalty = 0  # параллельный запрос уже открыл и оплатил эту подсказку
+    return hints, revealed + [hint], hint, penalty
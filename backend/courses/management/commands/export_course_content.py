@@ -0,0 +1,20 @@
+import sys
+from django.core.management.base import BaseCommand
+from courses.content_io import export_content, open_content_file
+
+
+class Command(BaseCommand):
+    help = "Экспортирует контент курсов (навыки, уроки, задания, подсказки) в JSON Lines (*.gz — со сжатием)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='course_ids', help="id курса (можно несколько раз)")
+        parser.add_argument('-o', '--output', help="Файл для записи; по умолчанию stdout")
+
+    def handle(self, *args, **options):
+        out = open_content_file(options['output'], 'wt') if options['output'] else sys.stdout
+        try:
+            for line in export_content(options['course_ids']):
+                out.write(line)
+        finally:
+            if out is not sys.stdout:
+                out.close()
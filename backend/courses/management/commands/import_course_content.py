@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses.content_io import import_content, open_content_file, ContentImportError
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует контент курсов из JSON Lines (формат — courses/content_io.py). "
+        "Всё выполняется одной транзакцией: при любой ошибке изменения не сохраняются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Файл *.jsonl или *.jsonl.gz")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Проверить файл и откатить изменения")
+        parser.add_argument('--replace', action='store_true',
+                            help="Обновлять записи с совпадающим id вместо создания новых. Только для выгрузки из этой же базы")
+
+    def handle(self, *args, **options):
+        try:
+            with open_content_file(options['path']) as lines:
+                stats = import_content(lines, batch_size=options['batch_size'], dry_run=options['dry_run'],
+                                       replace=options['replace'])
+        except ContentImportError as exc:
+            for error in exc.errors:
+                self.stderr.write(error)
+            raise CommandError(str(exc))
+        summary = ', '.join(f"{key}: {value}" for key, value in sorted(stats.items())) or "нет записей"
+        prefix = "Проверка пройдена" if options['dry_run'] else "Импорт завершён"
+        self.stdout.write(self.style.SUCCESS(f"{prefix} ({summary})"))
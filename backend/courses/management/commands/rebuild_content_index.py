@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from courses.search import ensure_search_index, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Полностью пересобирает поисковый индекс контента уроков (например, после loaddata)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        ensure_search_index()
+        with transaction.atomic():
+            count = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано уроков: {count}"))
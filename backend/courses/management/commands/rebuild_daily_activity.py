@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from courses.activity import rebuild_daily_activity
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает дневные сводки активности (DailyActivity) из журнала ActivityEvent."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help="Только для указанных id пользователей")
+
+    def handle(self, *args, **options):
+        rebuild_daily_activity(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS("Дневные сводки пересчитаны."))
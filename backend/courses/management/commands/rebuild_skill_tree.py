@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from courses.skill_tree import rebuild_skill_tree
+
+
+class Command(BaseCommand):
+    help = "Пересобирает таблицу замыкания и пути дерева навыков (после loaddata или ручных правок в базе)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='course_ids', help="Только для указанных id курсов")
+
+    def handle(self, *args, **options):
+        rebuild_skill_tree(options['course_ids'])
+        self.stdout.write(self.style.SUCCESS("Дерево навыков пересобрано."))
@@ -0,0 +1,130 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:44
+
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+# SQL и извлечение текста зафиксированы здесь, а не берутся из courses.search:
+# правки рабочего модуля не должны менять то, что создаёт эта миграция на чистой базе.
+DOCUMENT_TABLE = 'courses_lessonsearchdocument'
+FTS_TABLE = 'courses_lessonsearchdocument_fts'
+
+SQLITE_CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, content, content='{DOCUMENT_TABLE}', content_rowid='lesson_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.lesson_id, new.title, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.lesson_id, old.title, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, content ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.lesson_id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.lesson_id, new.title, new.content);
+    END""",
+]
+
+SQLITE_DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_CREATE_SQL = [
+    f"""ALTER TABLE {DOCUMENT_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(content, '')), 'B')
+        ) STORED""",
+    f"CREATE INDEX IF NOT EXISTS {DOCUMENT_TABLE}_search_idx ON {DOCUMENT_TABLE} USING gin (search_vector)",
+]
+
+POSTGRES_DROP_SQL = [
+    f"DROP INDEX IF EXISTS {DOCUMENT_TABLE}_search_idx",
+    f"ALTER TABLE {DOCUMENT_TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def extract_theory_text(theory_content):
+    if isinstance(theory_content, str):
+        try:
+            theory_content = json.loads(theory_content)
+        except ValueError:
+            return strip_tags(theory_content)
+    if not isinstance(theory_content, list):
+        return ''
+    parts = []
+    for block in theory_content:
+        if not isinstance(block, dict):
+            continue
+        for key in ('content', 'caption'):
+            value = block.get(key)
+            if isinstance(value, str) and value.strip():
+                parts.append(strip_tags(value))
+    return '\n'.join(parts)
+
+
+def build_document_text(theory_content, questions):
+    parts = [extract_theory_text(theory_content)]
+    parts.extend(strip_tags(q) for q in questions if q)
+    return '\n'.join(p for p in parts if p)
+
+
+def run_vendor_sql(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql, params=None)
+
+
+def create_search_index(apps, schema_editor):
+    # Индекс создаётся до заполнения: триггеры FTS5 сами внесут документы
+    run_vendor_sql(schema_editor, {'sqlite': SQLITE_CREATE_SQL, 'postgresql': POSTGRES_CREATE_SQL})
+
+    Lesson = apps.get_model('courses', 'Lesson')
+    Task = apps.get_model('courses', 'Task')
+    LessonSearchDocument = apps.get_model('courses', 'LessonSearchDocument')
+    questions = {}
+    for lesson_id, question in Task.objects.values_list('lesson_id', 'question'):
+        questions.setdefault(lesson_id, []).append(question)
+    LessonSearchDocument.objects.bulk_create([
+        LessonSearchDocument(
+            lesson_id=lesson.id,
+            course_id=lesson.skill.course_id,
+            title=lesson.title,
+            content=build_document_text(lesson.theory_content, questions.get(lesson.id, [])),
+        )
+        for lesson in Lesson.objects.select_related('skill').iterator()
+    ], batch_size=500)
+
+
+def drop_search_index(apps, schema_editor):
+    run_vendor_sql(schema_editor, {'sqlite': SQLITE_DROP_SQL, 'postgresql': POSTGRES_DROP_SQL})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_challenge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonSearchDocument',
+            fields=[
+                ('lesson', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='courses.lesson', verbose_name='Урок')),
+                ('title', models.CharField(max_length=200, verbose_name='Заголовок')),
+                ('content', models.TextField(blank=True, verbose_name='Текст')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course', verbose_name='Курс')),
+            ],
+            options={
+                'verbose_name': 'Поисковый документ урока',
+                'verbose_name_plural': 'Поисковые документы уроков',
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_activity(apps, schema_editor):
+    # Прошлые прохождения попадают в журнал по первой дате; ранее перезаписанные повторы восстановить нельзя
+    UserProgress = apps.get_model('courses', 'UserProgress')
+    ActivityEvent = apps.get_model('courses', 'ActivityEvent')
+    DailyActivity = apps.get_model('courses', 'DailyActivity')
+    events, daily = [], {}
+    for progress in UserProgress.objects.select_related('lesson').iterator():
+        xp = progress.lesson.xp_reward
+        events.append(ActivityEvent(user_id=progress.user_id, lesson_id=progress.lesson_id, kind='LESSON_COMPLETED', xp=xp, created_at=progress.completed_at))
+        key = (progress.user_id, progress.completed_at.date())
+        lessons, xp_total = daily.get(key, (0, 0))
+        daily[key] = (lessons + 1, xp_total + xp)
+    ActivityEvent.objects.bulk_create(events, batch_size=1000)
+    DailyActivity.objects.bulk_create([
+        DailyActivity(user_id=user_id, date=day, lessons_completed=lessons, xp_earned=xp)
+        for (user_id, day), (lessons, xp) in daily.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_lessonsearchdocument'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('LESSON_COMPLETED', 'Урок пройден'), ('LESSON_REPEATED', 'Урок повторён')], max_length=20, verbose_name='Тип события')),
+                ('xp', models.PositiveIntegerField(default=0, verbose_name='Начислено XP')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время')),
+                ('lesson', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='courses.lesson', verbose_name='Урок')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_events', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Событие активности',
+                'verbose_name_plural': 'События активности',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='activity_user_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('lessons_completed', models.PositiveIntegerField(default=0, verbose_name='Уроков пройдено')),
+                ('xp_earned', models.PositiveIntegerField(default=0, verbose_name='Получено XP')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Активность за день',
+                'verbose_name_plural': 'Активность по дням',
+                'ordering': ['date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
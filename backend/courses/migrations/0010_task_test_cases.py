@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:03
+
+import courses.grader
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_activity_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='test_cases',
+            field=models.JSONField(blank=True, help_text='Для кодовых заданий: {"function": "solve", "cases": [{"args": [1, 2], "expected": 3}]}. Если пусто — сравнение с эталонным кодом.', null=True, validators=[courses.grader.validate_test_cases], verbose_name='Тесты для проверки кода (JSON)'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_task_test_cases'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HintUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('xp_penalty', models.PositiveIntegerField(default=0, verbose_name='Списано XP')),
+                ('used_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата использования')),
+                ('hint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usages', to='courses.hint', verbose_name='Подсказка')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.task', verbose_name='Задание')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hint_usages', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Использование подсказки',
+                'verbose_name_plural': 'Использования подсказок',
+                'indexes': [models.Index(fields=['user', 'task'], name='hint_usage_user_task_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'hint'), name='hint_usage_user_hint_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_skill_tree(apps, schema_editor):
+    from courses.skill_tree import compute_skill_tree
+    Skill = apps.get_model('courses', 'Skill')
+    SkillClosure = apps.get_model('courses', 'SkillClosure')
+    rows = {pk: (parent_id, order) for pk, parent_id, order in Skill.objects.values_list('id', 'parent_id', 'order')}
+    paths, links = compute_skill_tree(rows)
+    SkillClosure.objects.bulk_create([SkillClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+                                      for ancestor_id, descendant_id, depth in links], batch_size=1000)
+    Skill.objects.bulk_update([Skill(pk=pk, tree_path=path) for pk, path in paths.items()], ['tree_path'], batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_hint_usage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField(verbose_name='Глубина')),
+            ],
+            options={
+                'verbose_name': 'Связь навыков',
+                'verbose_name_plural': 'Связи навыков',
+            },
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='tree_path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=1000, verbose_name='Путь в дереве'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['course', 'tree_path'], name='skill_course_tree_path_idx'),
+        ),
+        migrations.AddField(
+            model_name='skillclosure',
+            name='ancestor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='courses.skill', verbose_name='Предок'),
+        ),
+        migrations.AddField(
+            model_name='skillclosure',
+            name='descendant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='courses.skill', verbose_name='Потомок'),
+        ),
+        migrations.AddIndex(
+            model_name='skillclosure',
+            index=models.Index(fields=['descendant', 'depth'], name='skill_closure_desc_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='skillclosure',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='skill_closure_uniq'),
+        ),
+        migrations.RunPython(backfill_skill_tree, migrations.RunPython.noop),
+    ]
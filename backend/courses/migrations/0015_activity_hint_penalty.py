@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0014_course_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activityevent',
+            name='kind',
+            field=models.CharField(choices=[('LESSON_COMPLETED', 'Урок пройден'), ('LESSON_REPEATED', 'Урок повторён'), ('HINT_PENALTY', 'Штраф за подсказку')], max_length=20, verbose_name='Тип события'),
+        ),
+        migrations.AlterField(
+            model_name='activityevent',
+            name='xp',
+            field=models.IntegerField(default=0, verbose_name='Изменение XP'),
+        ),
+    ]
@@ -1,11 +1,17 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+from django.core.exceptions import ValidationError
+from .grader import validate_test_cases
 
 class Course(models.Model):
     title = models.CharField(max_length=200, verbose_name="Название курса")
     description = models.TextField(verbose_name="Описание")
     image_url = models.URLField(max_length=255, blank=True, null=True, verbose_name="URL обложки")
     is_published = models.BooleanField(default=False, verbose_name="Опубликован")
+    # Версия содержимого курса: сдвигается и при изменении его навыков, уроков, заданий и подсказок
+    # (courses.signals, content_io) и входит в ключи кэша оглавления и тел уроков (courses.services)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Изменено")
     class Meta:
         verbose_name = "Курс"; verbose_name_plural = "Курсы"; ordering = ['title']
     def __str__(self): return self.title
@@ -15,9 +21,29 @@ class Skill(models.Model):
     title = models.CharField(max_length=200, verbose_name="Название навыка")
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='children', verbose_name="Родительский навык")
     order = models.PositiveIntegerField(default=0, verbose_name="Порядок")
+    # Материализованный путь из сегментов (order, id) от корня: ORDER BY tree_path — обход дерева в глубину.
+    # Вместе с SkillClosure поддерживается courses.skill_tree при сохранении навыка.
+    tree_path = models.CharField(max_length=1000, blank=True, default='', editable=False, verbose_name="Путь в дереве")
     class Meta:
         verbose_name = "Навык"; verbose_name_plural = "Навыки"; ordering = ['order']
+        indexes = [models.Index(fields=['course', 'tree_path'], name='skill_course_tree_path_idx')]
     def __str__(self): return f"{self.course.title} -> {self.title}"
+    @property
+    def depth(self): return self.tree_path.count('/')
+    def clean(self):
+        if self.pk and self.parent_id and SkillClosure.objects.filter(ancestor_id=self.pk, descendant_id=self.parent_id).exists():
+            raise ValidationError({'parent': "Навык нельзя вложить в самого себя или в свой подраздел."})
+
+class SkillClosure(models.Model):
+    """Таблица замыкания дерева навыков: пара (предок, потомок) на каждый путь, включая (навык, навык) с depth=0."""
+    ancestor = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='descendant_links', verbose_name="Предок")
+    descendant = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='ancestor_links', verbose_name="Потомок")
+    depth = models.PositiveIntegerField(verbose_name="Глубина")
+    class Meta:
+        verbose_name = "Связь навыков"; verbose_name_plural = "Связи навыков"
+        constraints = [models.UniqueConstraint(fields=['ancestor', 'descendant'], name='skill_closure_uniq')]
+        indexes = [models.Index(fields=['descendant', 'depth'], name='skill_closure_desc_idx')]
+    def __str__(self): return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
 
 class Lesson(models.Model):
     skill = models.ForeignKey(Skill, related_name='lessons', on_delete=models.CASCADE, verbose_name="Навык")
@@ -51,6 +77,15 @@ class Task(models.Model):
         verbose_name="Лимит времени (в секундах)",
         help_text="Используется для заданий 'Печать на скорость'."
     )
+    test_cases = models.JSONField(
+        null=True,
+        blank=True,
+        validators=[validate_test_cases],
+        verbose_name="Тесты для проверки кода (JSON)",
+        help_text='Для кодовых заданий: {"function": "solve", "cases": [{"args": [1, 2], "expected": 3}]}. Если пусто — сравнение с эталонным кодом.'
+    )
+    # По максимуму этого поля процессы замечают изменения заданий (courses.answers.AnswerKeyCache)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Изменено")
     class Meta:
         verbose_name = "Задание"; verbose_name_plural = "Задания"
     def __str__(self): return f"Задание к уроку: {self.lesson.title}"
@@ -64,6 +99,19 @@ class Hint(models.Model):
         verbose_name = "Подсказка"; verbose_name_plural = "Подсказки"; ordering = ['order']
     def __str__(self): return f"Подсказка {self.order} к заданию"
 
+class HintUsage(models.Model):
+    """Открытая пользователем подсказка. Штраф списывается один раз — при создании записи."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='hint_usages', verbose_name="Пользователь")
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='+', verbose_name="Задание")
+    hint = models.ForeignKey(Hint, on_delete=models.CASCADE, related_name='usages', verbose_name="Подсказка")
+    xp_penalty = models.PositiveIntegerField(default=0, verbose_name="Списано XP")
+    used_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата использования")
+    class Meta:
+        verbose_name = "Использование подсказки"; verbose_name_plural = "Использования подсказок"
+        constraints = [models.UniqueConstraint(fields=['user', 'hint'], name='hint_usage_user_hint_uniq')]
+        indexes = [models.Index(fields=['user', 'task'], name='hint_usage_user_task_idx')]
+    def __str__(self): return f"{self.user} — {self.hint}"
+
 class UserProgress(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='progress', verbose_name="Пользователь")
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, verbose_name="Урок")
@@ -109,4 +157,43 @@ class Challenge(models.Model):
     
     class Meta:
         verbose_name = "Челлендж"; verbose_name_plural = "Челленджи"; ordering = ['-created_at']
-    def __str__(self): return f"Вызов от {self.sender} к {self.receiver} по уроку '{self.lesson.title}'"
\ No newline at end of file
+    def __str__(self): return f"Вызов от {self.sender} к {self.receiver} по уроку '{self.lesson.title}'"
+
+class LessonSearchDocument(models.Model):
+    """Плоский текст урока (заголовок, теория, вопросы заданий) для полнотекстового поиска. Заполняется courses.search."""
+    lesson = models.OneToOneField(Lesson, on_delete=models.CASCADE, primary_key=True, related_name='search_document', verbose_name="Урок")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+', verbose_name="Курс")
+    title = models.CharField(max_length=200, verbose_name="Заголовок")
+    content = models.TextField(blank=True, verbose_name="Текст")
+    updated_at = models.DateTimeField(auto_now=True)
+    class Meta:
+        verbose_name = "Поисковый документ урока"; verbose_name_plural = "Поисковые документы уроков"
+    def __str__(self): return self.title
+
+class ActivityEvent(models.Model):
+    """Журнал учебной активности (только добавление). Источник для дневных сводок DailyActivity."""
+    class Kind(models.TextChoices):
+        LESSON_COMPLETED = 'LESSON_COMPLETED', 'Урок пройден'
+        LESSON_REPEATED = 'LESSON_REPEATED', 'Урок повторён'
+        HINT_PENALTY = 'HINT_PENALTY', 'Штраф за подсказку'
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='activity_events', verbose_name="Пользователь")
+    lesson = models.ForeignKey(Lesson, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Урок")
+    kind = models.CharField(max_length=20, choices=Kind.choices, verbose_name="Тип события")
+    xp = models.IntegerField(default=0, verbose_name="Изменение XP")  # штраф за подсказку — отрицательный
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Время")
+    class Meta:
+        verbose_name = "Событие активности"; verbose_name_plural = "События активности"; ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', '-created_at'], name='activity_user_created_idx')]
+    def __str__(self): return f"{self.get_kind_display()}: {self.user_id} ({self.created_at:%Y-%m-%d})"
+
+class DailyActivity(models.Model):
+    """Дневная сводка активности пользователя, обновляется инкрементально вместе с ActivityEvent."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_activity', verbose_name="Пользователь")
+    date = models.DateField(verbose_name="Дата")
+    lessons_completed = models.PositiveIntegerField(default=0, verbose_name="Уроков пройдено")
+    xp_earned = models.PositiveIntegerField(default=0, verbose_name="Получено XP")
+    class Meta:
+        verbose_name = "Активность за день"; verbose_name_plural = "Активность по дням"; ordering = ['date']
+        unique_together = ('user', 'date')
+    def __str__(self): return f"{self.user_id} {self.date}: {self.lessons_completed}"
@@ -0,0 +1,68 @@
+import base64
+from django.core.cache import cache
+from .models import UserProgress
+
+# Карты не правятся на месте: сохранение и удаление UserProgress удаляют ключ (courses.signals),
+# следующее чтение пересобирает карту одним запросом. Кэш по умолчанию локален для процесса,
+# поэтому TTL короткий — это предел отставания карты в остальных процессах.
+PROGRESS_CACHE_TIMEOUT = 60
+
+def progress_cache_key(user_id): return f'progress-bitmap:{user_id}'
+
+# Битовая карта прохождения курса: бит i означает, что урок с id = base + i пройден.
+# В кэше хранится {course_id: (base, bits)}, где bits — обычный int Python.
+
+def _build_bitmaps(user_id):
+    bitmaps = {}
+    rows = UserProgress.objects.filter(user_id=user_id).values_list('lesson__skill__course_id', 'lesson_id')
+    lessons_by_course = {}
+    for course_id, lesson_id in rows:
+        lessons_by_course.setdefault(course_id, []).append(lesson_id)
+    for course_id, lesson_ids in lessons_by_course.items():
+        base = min(lesson_ids)
+        bits = 0
+        for lesson_id in lesson_ids:
+            bits |= 1 << (lesson_id - base)
+        bitmaps[course_id] = (base, bits)
+    return bitmaps
+
+def get_progress_bitmaps(user_id):
+    """Битовые карты пройденных уроков пользователя по курсам (из кэша, при промахе — одним запросом)."""
+    key = progress_cache_key(user_id)
+    bitmaps = cache.get(key)
+    if bitmaps is None:
+        bitmaps = _build_bitmaps(user_id)
+        cache.set(key, bitmaps, PROGRESS_CACHE_TIMEOUT)
+    return bitmaps
+
+def invalidate_progress(user_id):
+    cache.delete(progress_cache_key(user_id))
+
+def completed_lesson_ids(bitmaps, course_id=None):
+    """Раскрывает карты в список id уроков (для всех курсов или одного)."""
+    items = bitmaps.items() if course_id is None else [(course_id, bitmaps.get(course_id, (0, 0)))]
+    lesson_ids = []
+    for _, (base, bits) in items:
+        offset = 0
+        while bits:
+            if bits & 1:
+                lesson_ids.append(base + offset)
+            bits >>= 1
+            offset += 1
+    return lesson_ids
+
+def encode_bitmaps(bitmaps):
+    """
+    Компактное представление для клиента: {course_id: {base, bits, count}}, где bits — base64
+    от little-endian байтов карты. Урок id пройден, если бит (id - base) установлен:
+    (bytes[(id - base) >> 3] >> ((id - base) & 7)) & 1.
+    """
+    encoded = {}
+    for course_id, (base, bits) in bitmaps.items():
+        raw = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+        encoded[str(course_id)] = {
+            'base': base,
+            'bits': base64.b64encode(raw).decode('ascii'),
+            'count': bin(bits).count('1'),
+        }
+    return encoded
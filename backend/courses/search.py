@@ -0,0 +1,197 @@
+import json
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, TextField, Value, Q
+from django.db.models.functions import Substr
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+from .models import Lesson, Task, LessonSearchDocument
+
+DEFAULT_CONTENT_SEARCH = {
+    'MIN_QUERY_LENGTH': 2,
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 50,
+    'PG_CONFIG': 'russian',  # конфигурация to_tsvector в PostgreSQL
+}
+
+def get_search_config():
+    return {**DEFAULT_CONTENT_SEARCH, **getattr(settings, 'CONTENT_SEARCH', {})}
+
+DOCUMENT_TABLE = LessonSearchDocument._meta.db_table
+SQLITE_FTS_TABLE = f'{DOCUMENT_TABLE}_fts'
+
+# --- Извлечение текста ---
+
+def extract_theory_text(theory_content):
+    """Текст блоков теории: content у text/code, caption у image. Понимает и JSON, сохранённый строкой."""
+    if isinstance(theory_content, str):
+        try:
+            theory_content = json.loads(theory_content)
+        except ValueError:
+            return strip_tags(theory_content)
+    if not isinstance(theory_content, list):
+        return ''
+    parts = []
+    for block in theory_content:
+        if not isinstance(block, dict):
+            continue
+        for key in ('content', 'caption'):
+            value = block.get(key)
+            if isinstance(value, str) and value.strip():
+                parts.append(strip_tags(value))
+    return '\n'.join(parts)
+
+def build_document_text(theory_content, questions):
+    parts = [extract_theory_text(theory_content)]
+    parts.extend(strip_tags(q) for q in questions if q)
+    return '\n'.join(p for p in parts if p)
+
+# --- Обновление документов ---
+
+def reindex_lessons(lesson_ids):
+    """Пересобирает документы для указанных уроков; удалённые уроки убирает из индекса."""
+    lesson_ids = set(lesson_ids)
+    if not lesson_ids:
+        return
+    lessons = Lesson.objects.filter(id__in=lesson_ids).select_related('skill').only(
+        'id', 'title', 'theory_content', 'skill__course_id'
+    )
+    questions = {}
+    for lesson_id, question in Task.objects.filter(lesson_id__in=lesson_ids).values_list('lesson_id', 'question'):
+        questions.setdefault(lesson_id, []).append(question)
+
+    existing = set(LessonSearchDocument.objects.filter(lesson_id__in=lesson_ids).values_list('lesson_id', flat=True))
+    to_create, to_update = [], []
+    for lesson in lessons:
+        document = LessonSearchDocument(
+            lesson_id=lesson.id,
+            course_id=lesson.skill.course_id,
+            title=lesson.title,
+            content=build_document_text(lesson.theory_content, questions.get(lesson.id, [])),
+        )
+        (to_update if lesson.id in existing else to_create).append(document)
+    # save() по одной записи, чтобы отработали триггеры FTS и auto_now; уроков в одном вызове немного
+    for document in to_create:
+        document.save(force_insert=True)
+    for document in to_update:
+        document.save(force_update=True)
+    missing = lesson_ids - {lesson.id for lesson in lessons}
+    if missing:
+        LessonSearchDocument.objects.filter(lesson_id__in=missing).delete()
+
+def rebuild_index(batch_size=500):
+    """Полная пересборка индекса (после загрузки фикстур или массового импорта)."""
+    LessonSearchDocument.objects.all().delete()
+    lesson_ids = list(Lesson.objects.values_list('id', flat=True))
+    for start in range(0, len(lesson_ids), batch_size):
+        reindex_lessons(lesson_ids[start:start + batch_size])
+    return len(lesson_ids)
+
+# --- Полнотекстовый индекс ---
+
+SQLITE_FTS_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        title, content, content='{DOCUMENT_TABLE}', content_rowid='lesson_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, content) VALUES (new.lesson_id, new.title, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, content) VALUES ('delete', old.lesson_id, old.title, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF title, content ON {DOCUMENT_TABLE} BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, content) VALUES ('delete', old.lesson_id, old.title, old.content);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, content) VALUES (new.lesson_id, new.title, new.content);
+    END""",
+]
+
+def _postgres_sql():
+    config = get_search_config()['PG_CONFIG']
+    return [
+        f"""ALTER TABLE {DOCUMENT_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('{config}', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('{config}', coalesce(content, '')), 'B')
+            ) STORED""",
+        f"CREATE INDEX IF NOT EXISTS {DOCUMENT_TABLE}_search_idx ON {DOCUMENT_TABLE} USING gin (search_vector)",
+    ]
+
+def ensure_search_index(conn=None):
+    """Идемпотентно создаёт FTS5-таблицу с триггерами (SQLite) или tsvector-колонку с GIN-индексом (PostgreSQL)."""
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            for sql in _postgres_sql():
+                cursor.execute(sql)
+        elif conn.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f'{SQLITE_FTS_TABLE}_a%'],
+            )
+            triggers_missing = cursor.fetchone()[0] < 3
+            for sql in SQLITE_FTS_SQL:
+                cursor.execute(sql)
+            if triggers_missing:
+                cursor.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+def drop_search_index(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {DOCUMENT_TABLE}_search_idx")
+            cursor.execute(f"ALTER TABLE {DOCUMENT_TABLE} DROP COLUMN IF EXISTS search_vector")
+        elif conn.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
+
+# --- Поиск ---
+
+def _query_terms(query):
+    return re.findall(r'\w+', query.lower())
+
+def search_lessons(queryset, query):
+    """
+    Ранжированный поиск по документам уроков. Возвращает queryset LessonSearchDocument
+    с аннотациями rank (больше — релевантнее) и snippet (фрагмент с <mark>…</mark>).
+    """
+    terms = _query_terms(query)
+    if not terms:
+        return queryset.none()
+    vendor = connection.vendor
+
+    if vendor == 'sqlite':
+        table = SQLITE_FTS_TABLE
+        # Каждое слово — префиксный запрос, слова объединяются по AND
+        match = ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+        where = f"FROM {table} WHERE {table} MATCH %s AND rowid = {DOCUMENT_TABLE}.lesson_id"
+        return queryset.filter(
+            lesson_id__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match])
+        ).annotate(
+            rank=RawSQL(f"SELECT -bm25({table}, 10.0, 1.0) {where}", [match], output_field=FloatField()),
+            snippet=RawSQL(
+                f"SELECT snippet({table}, 1, '<mark>', '</mark>', '…', 16) {where}", [match], output_field=TextField()
+            ),
+        ).order_by('-rank', 'lesson_id')
+
+    if vendor == 'postgresql':
+        config = get_search_config()['PG_CONFIG']
+        tsquery = f"to_tsquery('{config}', %s)"
+        match = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.alias(
+            matched=RawSQL(f'search_vector @@ {tsquery}', [match], output_field=BooleanField())
+        ).filter(matched=True).annotate(
+            rank=RawSQL(f'ts_rank(search_vector, {tsquery})', [match], output_field=FloatField()),
+            snippet=RawSQL(
+                f"ts_headline('{config}', content, {tsquery}, 'StartSel=<mark>, StopSel=</mark>, MaxWords=20, MinWords=8')",
+                [match], output_field=TextField(),
+            ),
+        ).order_by('-rank', 'lesson_id')
+
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(content__icontains=term))
+    return queryset.annotate(
+        rank=Value(0.0, output_field=FloatField()), snippet=Substr('content', 1, 200)
+    ).order_by('lesson_id')
@@ -1,5 +1,8 @@
 from rest_framework import serializers
-from .models import Course, Skill, Lesson, Task, Hint, Badge, UserBadge, Challenge
+from django.utils.html import escape
+from .services import build_course_outline
+from .answers import answer_keys, get_answer_cache_config
+from .models import Course, Skill, Lesson, Task, Hint, Badge, UserBadge, Challenge, LessonSearchDocument
 
 class BadgeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -13,12 +16,15 @@ class UserBadgeSerializer(serializers.ModelSerializer):
         fields = ['badge', 'awarded_at']
 
 class HintSerializer(serializers.ModelSerializer):
+    """Подсказка в контенте урока без текста: текст открывается только через RequestHintView (courses.hints)."""
     class Meta:
         model = Hint
-        fields = ['id', 'text', 'xp_penalty', 'order']
+        fields = ['id', 'xp_penalty', 'order']
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskBodySerializer(serializers.ModelSerializer):
+    """Задание в теле урока. Правильный ответ не отдаётся — проверка идёт на сервере (CheckAnswerView)."""
     hints = HintSerializer(many=True, read_only=True)
+    typing_text = serializers.SerializerMethodField()
     class Meta:
         model = Task
         fields = [
@@ -26,12 +32,16 @@ class TaskSerializer(serializers.ModelSerializer):
             'task_type', 
             'question', 
             'options', 
-            'correct_answer', 
             'code_template', 
             'time_limit', 
+            'typing_text',
             'hints'
         ]
 
+    def get_typing_text(self, obj):
+        # В «Печати на скорость» эталон — это сам текст задания, его нужно показать
+        return obj.correct_answer if obj.task_type == 'speed_typing' else None
+
 class SimpleCourseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
@@ -43,21 +53,25 @@ class SimpleLessonSerializer(serializers.ModelSerializer):
         model = Lesson
         fields = ['id', 'title', 'course']
 
-class LessonSerializer(serializers.ModelSerializer):
-    tasks = TaskSerializer(many=True, read_only=True)
+class LessonBodySerializer(serializers.ModelSerializer):
+    """Тело урока: теория и задания (courses.views.LessonDetailView и полное дерево курса)."""
+    tasks = TaskBodySerializer(many=True, read_only=True)
     class Meta: 
         model = Lesson
         fields = ['id', 'title', 'theory_content', 'xp_reward', 'tasks']
 
 class SkillSerializer(serializers.ModelSerializer):
-    lessons = LessonSerializer(many=True, read_only=True)
+    lessons = LessonBodySerializer(many=True, read_only=True)
     children = serializers.SerializerMethodField()
     class Meta:
         model = Skill
         fields = ['id', 'title', 'children', 'lessons']
     
     def get_children(self, obj):
-        return SkillSerializer(obj.children.all(), many=True, context=self.context).data
+        # CourseDetailSerializer передаёт готовую раскладку по родителям (один запрос на всё дерево)
+        children = self.context.get('skill_children')
+        children = children.get(obj.id, []) if children is not None else obj.children.all()
+        return SkillSerializer(children, many=True, context=self.context).data
 
 class CourseListSerializer(serializers.ModelSerializer):
     class Meta:
@@ -71,12 +85,60 @@ class CourseDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'image_url', 'skills']
     
     def get_skills(self, obj):
-        root_skills = obj.skills.filter(parent__isnull=True)
-        return SkillSerializer(root_skills, many=True, context=self.context).data
+        # Навыки в порядке обхода дерева (tree_path): дети каждого узла идут в порядке order.
+        # Пути пусты у загруженных через loaddata (raw-сохранение минует сигнал) — тогда решает order
+        skills = obj.skills.order_by('tree_path', 'order', 'id').prefetch_related('lessons__tasks__hints')
+        children, roots = {}, []
+        for skill in skills:
+            (children.setdefault(skill.parent_id, []) if skill.parent_id else roots).append(skill)
+        return SkillSerializer(roots, many=True, context={**self.context, 'skill_children': children}).data
+
+class CourseOutlineSerializer(serializers.ModelSerializer):
+    """Оглавление курса: навыки и уроки (id, title, xp_reward, is_completed) без теории и заданий."""
+    skills = serializers.SerializerMethodField()
+    class Meta:
+        model = Course
+        fields = ['id', 'title', 'description', 'image_url', 'skills']
+
+    def get_skills(self, obj):
+        request = self.context.get('request')
+        return build_course_outline(obj, request.user if request else None)
+
+class LessonSearchResultSerializer(serializers.ModelSerializer):
+    lesson_id = serializers.IntegerField(read_only=True)
+    course = SimpleCourseSerializer(read_only=True)
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.SerializerMethodField()
+    class Meta:
+        model = LessonSearchDocument
+        fields = ['lesson_id', 'title', 'course', 'rank', 'snippet']
+
+    def get_snippet(self, obj):
+        # Текст урока экранируется, разметка подсветки совпадений остаётся
+        return escape(obj.snippet or '').replace('&lt;mark&gt;', '<mark>').replace('&lt;/mark&gt;', '</mark>')
 
 class CompleteLessonSerializer(serializers.Serializer):
     lesson_id = serializers.IntegerField()
 
+class TaskAnswerSerializer(serializers.Serializer):
+    task_id = serializers.IntegerField()
+    answer = serializers.CharField(allow_blank=True, trim_whitespace=False)
+
+class CheckAnswersSerializer(serializers.Serializer):
+    """Пакетная проверка ответов; lesson_id ограничивает задания одним уроком."""
+    lesson_id = serializers.IntegerField(required=False)
+    answers = TaskAnswerSerializer(many=True, allow_empty=False)
+
+    def validate_answers(self, value):
+        config = get_answer_cache_config()
+        if len(value) > config['MAX_BATCH']:
+            raise serializers.ValidationError(f"Не больше {config['MAX_BATCH']} ответов за запрос.")
+        keys = answer_keys.get_many([item['task_id'] for item in value])
+        code_answers = sum(1 for item in value if item['task_id'] in keys and keys[item['task_id']].task_type == 'code')
+        if code_answers > config['MAX_CODE_BATCH']:
+            raise serializers.ValidationError(f"Не больше {config['MAX_CODE_BATCH']} ответов на кодовые задания за запрос.")
+        return value
+
 class LessonCompletionResponseSerializer(serializers.Serializer):
     message = serializers.CharField()
     xp_earned = serializers.IntegerField()
@@ -1,4 +1,24 @@
-from .models import Badge, UserBadge, UserProgress
+import copy
+from django.core.cache import cache
+from django.utils import timezone
+from .models import Badge, UserBadge, UserProgress, Course, Skill, Lesson
+from .progress import get_progress_bitmaps, completed_lesson_ids
+
+COURSE_CONTENT_CACHE_TIMEOUT = 60 * 60
+
+# Ключи содержат версию курса (Course.updated_at) из базы: после правки контента все процессы
+# читают новую версию и строят новые ключи, старые записи просто доживают свой TTL.
+# Поэтому сброс не зависит от того, в каком процессе сработал сигнал.
+def _version(updated_at): return updated_at.strftime('%Y%m%d%H%M%S%f')
+def course_outline_cache_key(course_id, updated_at): return f'course-outline:{course_id}:{_version(updated_at)}'
+def lesson_detail_cache_key(lesson_id, updated_at): return f'lesson-detail:{lesson_id}:{_version(updated_at)}'
+def course_detail_cache_key(course_id, updated_at): return f'course-detail:{course_id}:{_version(updated_at)}'
+
+def touch_courses(*course_ids):
+    """Сдвигает версию содержимого курсов: закэшированные оглавления и тела уроков перестают находиться."""
+    course_ids = {course_id for course_id in course_ids if course_id}
+    if course_ids:
+        Course.objects.filter(id__in=course_ids).update(updated_at=timezone.now())
 
 def check_and_award_badges(user):
     newly_awarded_badges = []
@@ -22,4 +42,46 @@ def check_and_award_badges(user):
             badge = Badge.objects.filter(code=badge_code).first()
             if badge: UserBadge.objects.create(user=user, badge=badge); newly_awarded_badges.append(badge)
     
-    return newly_awarded_badges
\ No newline at end of file
+    return newly_awarded_badges
+
+def get_course_outline_structure(course):
+    """
+    Дерево навыков курса с краткими данными уроков (id, title, xp_reward) без теории и заданий.
+    Строится двумя запросами и кэшируется по версии курса (Course.updated_at).
+    """
+    course_id = course.id
+    key = course_outline_cache_key(course_id, course.updated_at)
+    structure = cache.get(key)
+    if structure is not None:
+        return structure
+
+    lessons_by_skill = {}
+    for lesson in Lesson.objects.filter(skill__course_id=course_id).order_by('order', 'id')\
+            .values('id', 'title', 'xp_reward', 'skill_id'):
+        skill_id = lesson.pop('skill_id')
+        lessons_by_skill.setdefault(skill_id, []).append(lesson)
+
+    nodes, roots = {}, []
+    skills = list(Skill.objects.filter(course_id=course_id).order_by('order', 'id').values('id', 'title', 'parent_id'))
+    for skill in skills:
+        nodes[skill['id']] = {'id': skill['id'], 'title': skill['title'], 'children': [], 'lessons': lessons_by_skill.get(skill['id'], [])}
+    for skill in skills:
+        parent = nodes.get(skill['parent_id'])
+        (parent['children'] if parent else roots).append(nodes[skill['id']])
+
+    cache.set(key, roots, COURSE_CONTENT_CACHE_TIMEOUT)
+    return roots
+
+def build_course_outline(course, user=None):
+    """Оглавление курса с флагом is_completed у каждого урока для пользователя."""
+    outline = copy.deepcopy(get_course_outline_structure(course))
+    completed_ids = set()
+    if user is not None and user.is_authenticated:
+        completed_ids = set(completed_lesson_ids(get_progress_bitmaps(user.id), course.id))
+    stack = list(outline)
+    while stack:
+        node = stack.pop()
+        for lesson in node['lessons']:
+            lesson['is_completed'] = lesson['id'] in completed_ids
+        stack.extend(node['children'])
+    return outline
@@ -0,0 +1,119 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from .models import Skill, Lesson, Task, Hint, UserProgress, LessonSearchDocument
+from .search import reindex_lessons
+from .progress import invalidate_progress
+from .answers import invalidate_answer_keys
+from .hints import invalidate_task_hints
+from .skill_tree import sync_skill_tree
+from .services import touch_courses
+
+# --- Дерево навыков: замыкание и пути (courses.skill_tree) ---
+# loaddata (raw) пропускается: родитель может загрузиться позже — дерево пересобирает rebuild_skill_tree.
+
+@receiver(pre_save, sender=Skill, dispatch_uid='skill_tree_before_save')
+def remember_skill_position(sender, instance, raw=False, **kwargs):
+    instance._tree_previous = None if raw or instance._state.adding else \
+        Skill.objects.filter(pk=instance.pk).values('parent_id', 'order', 'tree_path').first()
+
+@receiver(post_save, sender=Skill, dispatch_uid='skill_tree_saved')
+def update_skill_tree(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    sync_skill_tree(instance, None if created else getattr(instance, '_tree_previous', None))
+
+# --- Поисковый индекс контента (courses.search) ---
+# Переиндексация откладывается до коммита: при каскадном удалении урока задания
+# удаляются раньше него, и немедленная пересборка воскресила бы документ удаляемого урока.
+
+@receiver(post_save, sender=Lesson, dispatch_uid='search_lesson_saved')
+def reindex_saved_lesson(sender, instance, raw=False, **kwargs):
+    if raw:  # loaddata: индекс пересобирается командой rebuild_content_index
+        return
+    transaction.on_commit(lambda: reindex_lessons([instance.id]))
+
+@receiver(post_save, sender=Task, dispatch_uid='search_task_saved')
+@receiver(post_delete, sender=Task, dispatch_uid='search_task_deleted')
+def reindex_task_lesson(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    lesson_id = instance.lesson_id
+    transaction.on_commit(lambda: reindex_lessons([lesson_id]))
+
+@receiver(post_save, sender=Skill, dispatch_uid='search_skill_saved')
+def move_skill_documents(sender, instance, raw=False, **kwargs):
+    # Навык мог переехать в другой курс — у документов его уроков меняется course_id
+    if raw:
+        return
+    LessonSearchDocument.objects.filter(lesson__skill=instance).exclude(course_id=instance.course_id)\
+        .update(course_id=instance.course_id)
+
+
+# --- Версия содержимого курса для кэша оглавлений и тел уроков (courses.services) ---
+# Course.updated_at сдвигается сам при сохранении курса (auto_now); правки навыков, уроков,
+# заданий и подсказок сдвигают его здесь. Навык, урок или задание могли переехать в другой
+# курс (урок) — перед сохранением запоминаем, где они были, и сдвигаем версию обоих курсов.
+
+@receiver(pre_save, sender=Skill, dispatch_uid='cache_skill_before_save')
+def remember_skill_course(sender, instance, **kwargs):
+    instance._cache_previous = None if instance._state.adding else \
+        Skill.objects.filter(pk=instance.pk).values_list('course_id', flat=True).first()
+
+@receiver(post_save, sender=Skill, dispatch_uid='cache_skill_saved')
+@receiver(post_delete, sender=Skill, dispatch_uid='cache_skill_deleted')
+def touch_skill_course(sender, instance, **kwargs):
+    touch_courses(getattr(instance, '_cache_previous', None), instance.course_id)
+
+@receiver(pre_save, sender=Lesson, dispatch_uid='cache_lesson_before_save')
+def remember_lesson_course(sender, instance, **kwargs):
+    instance._cache_previous = None if instance._state.adding else \
+        Lesson.objects.filter(pk=instance.pk).values_list('skill__course_id', flat=True).first()
+
+@receiver(post_save, sender=Lesson, dispatch_uid='cache_lesson_saved')
+@receiver(post_delete, sender=Lesson, dispatch_uid='cache_lesson_deleted')
+def touch_lesson_course(sender, instance, **kwargs):
+    course_id = Skill.objects.filter(id=instance.skill_id).values_list('course_id', flat=True).first()
+    touch_courses(getattr(instance, '_cache_previous', None), course_id)
+
+@receiver(pre_save, sender=Task, dispatch_uid='cache_task_before_save')
+def remember_task_course(sender, instance, **kwargs):
+    instance._cache_previous = None if instance._state.adding else \
+        Task.objects.filter(pk=instance.pk).values_list('lesson__skill__course_id', flat=True).first()
+
+@receiver(post_save, sender=Task, dispatch_uid='cache_task_saved')
+@receiver(post_delete, sender=Task, dispatch_uid='cache_task_deleted')
+def touch_task_course(sender, instance, **kwargs):
+    course_id = Lesson.objects.filter(id=instance.lesson_id).values_list('skill__course_id', flat=True).first()
+    touch_courses(getattr(instance, '_cache_previous', None), course_id)
+
+@receiver(post_save, sender=Hint, dispatch_uid='cache_hint_saved')
+@receiver(post_delete, sender=Hint, dispatch_uid='cache_hint_deleted')
+def touch_hint_course(sender, instance, **kwargs):
+    touch_courses(Task.objects.filter(id=instance.task_id).values_list('lesson__skill__course_id', flat=True).first())
+
+# --- Битовые карты прогресса (courses.progress) ---
+
+@receiver(post_save, sender=UserProgress, dispatch_uid='progress_saved')
+@receiver(post_delete, sender=UserProgress, dispatch_uid='progress_deleted')
+def invalidate_user_progress(sender, instance, **kwargs):
+    # Карта сбрасывается после коммита: пересборка до него не увидела бы новую строку
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_progress(user_id))
+
+# --- Кэш ключей ответов (courses.answers) ---
+
+@receiver(post_save, sender=Task, dispatch_uid='answer_key_saved')
+@receiver(post_delete, sender=Task, dispatch_uid='answer_key_deleted')
+def invalidate_task_answer_key(sender, instance, **kwargs):
+    # После коммита: иначе параллельный запрос успел бы закэшировать ещё старый ответ
+    task_id = instance.id
+    transaction.on_commit(lambda: invalidate_answer_keys(task_id))
+
+# --- Списки подсказок заданий (courses.hints) ---
+
+@receiver(post_save, sender=Hint, dispatch_uid='task_hints_saved')
+@receiver(post_delete, sender=Hint, dispatch_uid='task_hints_deleted')
+def invalidate_hint_list(sender, instance, **kwargs):
+    task_id = instance.task_id
+    transaction.on_commit(lambda: invalidate_task_hints(task_id))
@@ -0,0 +1,130 @@
+"""
+Дерево навыков: таблица замыкания (SkillClosure) и материализованный путь (Skill.tree_path).
+
+Оба поддерживаются сигналами Skill: создание добавляет строки замыкания от предков родителя,
+перенос в другую ветку перевешивает строки всего поддерева, смена родителя или порядка
+переписывает префикс tree_path у поддерева одним UPDATE. Удаление обрабатывает CASCADE.
+Импорт контента (bulk_create без сигналов) и loaddata пересобирают дерево rebuild_skill_tree.
+
+Запросы по дереву — одиночные индексные:
+    потомки X:         Skill.objects.filter(ancestor_links__ancestor=X)
+    уроки поддерева X: Lesson.objects.filter(skill__ancestor_links__ancestor=X)
+    обход курса:       Skill.objects.filter(course=C).order_by('tree_path')
+"""
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+from .models import Skill, SkillClosure, Lesson
+from .progress import get_progress_bitmaps, completed_lesson_ids
+
+def path_segment(order, pk):
+    return f'{order:010d}.{pk:010d}'
+
+def join_path(parent_path, order, pk):
+    segment = path_segment(order, pk)
+    return f'{parent_path}/{segment}' if parent_path else segment
+
+def sync_skill_tree(skill, previous=None):
+    """
+    Приводит замыкание и пути в соответствие с сохранённым навыком.
+    previous — {'parent_id', 'order', 'tree_path'} до сохранения, None для нового навыка.
+    """
+    parent_path = ''
+    if skill.parent_id:
+        parent_path = Skill.objects.filter(pk=skill.parent_id).values_list('tree_path', flat=True).first() or ''
+    new_path = join_path(parent_path, skill.order, skill.pk)
+    parent_links = list(SkillClosure.objects.filter(descendant_id=skill.parent_id).values_list('ancestor_id', 'depth')) \
+        if skill.parent_id else []
+
+    if previous is None:
+        SkillClosure.objects.bulk_create(
+            [SkillClosure(ancestor_id=skill.pk, descendant_id=skill.pk, depth=0)]
+            + [SkillClosure(ancestor_id=ancestor_id, descendant_id=skill.pk, depth=depth + 1) for ancestor_id, depth in parent_links]
+        )
+        Skill.objects.filter(pk=skill.pk).update(tree_path=new_path)
+        skill.tree_path = new_path
+        return
+
+    if previous['parent_id'] == skill.parent_id and previous['tree_path'] == new_path:
+        if skill.tree_path != new_path:
+            # save() записал устаревший путь из экземпляра, загруженного до переноса предка
+            Skill.objects.filter(pk=skill.pk).update(tree_path=new_path)
+            skill.tree_path = new_path
+        return
+    subtree = list(SkillClosure.objects.filter(ancestor_id=skill.pk).values_list('descendant_id', 'depth'))
+    subtree_ids = [descendant_id for descendant_id, _ in subtree]
+    if previous['parent_id'] != skill.parent_id:
+        # Рвём связи поддерева со старыми предками и строим с новыми: предки нового родителя × поддерево
+        SkillClosure.objects.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+        SkillClosure.objects.bulk_create([
+            SkillClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=ancestor_depth + depth + 1)
+            for ancestor_id, ancestor_depth in parent_links for descendant_id, depth in subtree
+        ])
+    old_path = previous['tree_path']
+    if not old_path:
+        rebuild_skill_tree([skill.course_id])  # путь не был построен (данные до миграции) — пересобрать курс
+        return
+    # Префиксы потомков заменяются по пути из базы до сохранения; свою строку save() уже переписал значением экземпляра
+    Skill.objects.filter(pk__in=subtree_ids).exclude(pk=skill.pk)\
+        .update(tree_path=Concat(Value(new_path), Substr('tree_path', len(old_path) + 1)))
+    Skill.objects.filter(pk=skill.pk).update(tree_path=new_path)
+    skill.tree_path = new_path
+
+def compute_skill_tree(rows):
+    """
+    rows — {id: (parent_id, order)}. Возвращает ({id: tree_path}, [(предок, потомок, глубина)]).
+    Родитель вне rows и циклы обрезаются: такой навык считается корнем.
+    """
+    paths, links = {}, []
+    for pk in rows:
+        # Поднимаемся до узла с известным путём (или корня), затем достраиваем пути сверху вниз
+        chain, node = [], pk
+        while node not in paths:
+            chain.append(node)
+            parent_id = rows[node][0]
+            if parent_id not in rows or parent_id in chain:
+                break
+            node = parent_id
+        for node in reversed(chain):
+            parent_id, order = rows[node]
+            paths[node] = join_path(paths.get(parent_id, '') if parent_id in rows else '', order, node)
+    for pk in rows:
+        ancestor, depth, seen = pk, 0, set()
+        while ancestor in rows and ancestor not in seen:
+            links.append((ancestor, pk, depth))
+            seen.add(ancestor)
+            ancestor, depth = rows[ancestor][0], depth + 1
+    return paths, links
+
+def rebuild_skill_tree(course_ids=None):
+    """Пересобирает замыкание и пути навыков указанных курсов (None — всех) по полю parent."""
+    skills = Skill.objects.all()
+    if course_ids is not None:
+        skills = skills.filter(course_id__in=course_ids)
+    rows = {pk: (parent_id, order) for pk, parent_id, order in skills.values_list('id', 'parent_id', 'order')}
+    paths, links = compute_skill_tree(rows)
+    with transaction.atomic():
+        SkillClosure.objects.filter(descendant__in=skills).delete()
+        SkillClosure.objects.bulk_create([SkillClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+                                          for ancestor_id, descendant_id, depth in links], batch_size=1000)
+        Skill.objects.bulk_update([Skill(pk=pk, tree_path=path) for pk, path in paths.items()], ['tree_path'], batch_size=1000)
+
+def skill_subtree_lessons(skill_id):
+    """Уроки навыка и всех его подразделов — один запрос по замыканию."""
+    return Lesson.objects.filter(skill__ancestor_links__ancestor_id=skill_id)
+
+def skill_progress(user, skill):
+    """Прогресс пользователя по поддереву навыка: уроки и XP — один запрос, пройденные — из битовой карты."""
+    completed = set(completed_lesson_ids(get_progress_bitmaps(user.id), skill.course_id))
+    lessons = list(skill_subtree_lessons(skill.pk).values_list('id', 'xp_reward'))
+    done = [xp for lesson_id, xp in lessons if lesson_id in completed]
+    return {
+        'skill_id': skill.pk,
+        'title': skill.title,
+        'depth': skill.depth,
+        'total_lessons': len(lessons),
+        'completed_lessons': len(done),
+        'percentage': round(len(done) / len(lessons) * 100) if lessons else 0,
+        'xp_total': sum(xp for _, xp in lessons),
+        'xp_earned': sum(done),
+    }
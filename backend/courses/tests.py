@@ -1,3 +1,144 @@
-from django.test import TestCase
+import shutil
+import subprocess
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.test import SimpleTestCase, override_settings
+
+from .ast_check import canonical_form
+from .answers import execute_and_compare_code
+from .grader import run_test_cases, execute_scope
+
+
+class CanonicalFormTests(SimpleTestCase):
+    def assertSame(self, first, second):
+        self.assertIsNotNone(canonical_form(first))
+        self.assertEqual(canonical_form(first), canonical_form(second))
+
+    def assertDifferent(self, first, second):
+        self.assertNotEqual(canonical_form(first), canonical_form(second))
+
+    def test_formatting_literals_and_docstrings(self):
+        self.assertSame('def f(a):\n    """Сумма."""\n    return (a + 1_000)', "def f(a): return a+1000")
+        self.assertSame("x = 'a'", 'x = "a"')
+
+    def test_locals_renamed(self):
+        self.assertSame(
+            'def f(n):\n    s = 0\n    for i in range(n):\n        s += i\n    return s',
+            'def f(n):\n    total = 0\n    for k in range(n):\n        total += k\n    return total',
+        )
+
+    def test_parameters_and_module_names_kept(self):
+        self.assertDifferent('def f(a): return a', 'def f(b): return b')
+        self.assertDifferent('x = 1', 'y = 1')
+
+    def test_lambda_parameter_shadows_local(self):
+        reference = 'def f(a):\n    x = 10\n    g = lambda x: x\n    return g(a)'
+        self.assertDifferent(reference, 'def f(a):\n    z = 10\n    g = lambda x: z\n    return g(a)')
+        self.assertSame(reference, 'def f(a):\n    y = 10\n    g = lambda x: x\n    return g(a)')
+
+    def test_nested_function_parameter_shadows_local(self):
+        self.assertDifferent(
+            'def f(a):\n    x = 1\n    def g(x):\n        return x\n    return g(a)',
+            'def f(a):\n    x = 1\n    def g(y):\n        return x\n    return g(a)',
+        )
+
+    def test_nested_function_local_shadows_outer(self):
+        self.assertDifferent(
+            'def f(a):\n    x = 1\n    def g():\n        x = 2\n        return x\n    return g() + x',
+            'def f(a):\n    x = 1\n    def g():\n        y = 2\n        return x\n    return g() + x',
+        )
+
+    def test_comprehension_scope(self):
+        self.assertSame('def f(n): return [i * i for i in range(n)]', 'def f(n): return [k * k for k in range(n)]')
+        self.assertDifferent(
+            'def f(n):\n    i = 2\n    return [i for i in range(n)]',
+            'def f(n):\n    i = 2\n    return [i for j in range(n)]',
+        )
+
+    def test_class_body_not_visible_to_methods(self):
+        self.assertSame(
+            'def f():\n    x = 1\n    class C:\n        x = 2\n        def m(self):\n            return x\n    return C().m()',
+            'def f():\n    y = 1\n    class C:\n        x = 2\n        def m(self):\n            return y\n    return C().m()',
+        )
+
+    def test_global_disables_renaming(self):
+        self.assertDifferent('def f():\n    global x\n    x = 1', 'def f():\n    global y\n    y = 1')
+        self.assertDifferent('def f():\n    global x\n    x = 1\n    y = 2', 'def f():\n    global x\n    x = 1\n    z = 2')
+
+    def test_syntax_error(self):
+        self.assertIsNone(canonical_form('def f(:'))
+
+
+ESCAPE = """def solve(a, b):
+    for cls in ().__class__.__base__.__subclasses__():
+        if cls.__name__ == 'BuiltinImporter':
+            posix = cls.load_module('posix')
+            break
+    %s
+"""
+
+
+@skipUnless(shutil.which('unshare'), 'нужен unshare')
+class GraderTests(SimpleTestCase):
+    spec = {'function': 'solve', 'cases': [{'args': [1, 2], 'expected': 3}, {'kwargs': {'a': 2, 'b': 2}, 'expected': 4}]}
+
+    def test_passed(self):
+        report = run_test_cases('def solve(a, b): return a + b', self.spec)
+        self.assertTrue(report['passed'])
+        self.assertEqual([case['index'] for case in report['cases']], [0, 1])
+
+    def test_stops_on_first_failure(self):
+        report = run_test_cases('def solve(a, b): return a - b', self.spec)
+        self.assertFalse(report['passed'])
+        self.assertEqual(len(report['cases']), 1)
+
+    def test_timeout(self):
+        with override_settings(CODE_GRADER={'TIMEOUT': 1}):
+            report = run_test_cases('def solve(a, b):\n    while True: pass', self.spec)
+        self.assertFalse(report['passed'])
+
+    def test_error_trimmed_to_one_line(self):
+        report = run_test_cases('def solve(a, b):\n    raise ValueError("x" * 1000 + "\\nsecond")', self.spec)
+        error = report['cases'][0]['error']
+        self.assertTrue(error.startswith('ValueError: x'))
+        self.assertLessEqual(len(error), 200)
+        self.assertNotIn('second', error)
+
+    def test_expected_values_not_sent_to_worker(self):
+        spec = {'function': 'solve', 'cases': [{'args': [1, 2], 'expected': 'секрет'}]}
+        completed = subprocess.CompletedProcess([], 0, stdout='{"cases": []}', stderr='')
+        with mock.patch('courses.grader.subprocess.run', return_value=completed) as run:
+            run_test_cases('def solve(a, b): return a', spec)
+        self.assertNotIn('секрет', run.call_args.kwargs['input'])
+
+    def test_jail_hides_filesystem(self):
+        spec = {'function': 'solve', 'cases': [{'args': [1, 2], 'expected': []}]}
+        self.assertTrue(run_test_cases(ESCAPE % "return posix.listdir('/')", spec)['passed'])
+        report = run_test_cases(ESCAPE % "return posix.open(%r, 0)" % __file__, spec)
+        self.assertIn('FileNotFoundError', report['cases'][0]['error'])
+
+    def test_forged_report_does_not_pass(self):
+        forged = 'posix.write(1, b\'{"cases": [{"result": "0"}, {"result": "0"}]}\'); posix._exit(0)'
+        self.assertFalse(run_test_cases(ESCAPE % forged, self.spec)['passed'])
+
+    def test_fork_forbidden(self):
+        spec = {'function': 'solve', 'cases': [{'args': [1, 2], 'expected': 0}]}
+        report = run_test_cases(ESCAPE % 'return posix.fork()', spec)
+        self.assertFalse(report['passed'])
+        self.assertIn('BlockingIOError', report['cases'][0]['error'])
+
+    def test_scope_mode(self):
+        self.assertEqual(execute_scope('x = [1, 2]\ny = {3}'), ({'x': [1, 2], 'y': {'__set__': ['3']}}, None))
+        scope, error = execute_scope('def f(): pass')
+        self.assertIsNone(scope)
+        self.assertIn('несравнимо', error)
+
+    def test_scope_mode_timeout(self):
+        with override_settings(CODE_GRADER={'TIMEOUT': 1}):
+            self.assertEqual(execute_scope('while True: pass'), (None, 'Превышено время выполнения.'))
+
+    def test_compare_without_test_cases(self):
+        self.assertTrue(execute_and_compare_code('a = 1\nb = a + 1', 'a = 1\nb = 2'))
+        self.assertFalse(execute_and_compare_code('a = 1\nb = 3', 'a = 1\nb = 2'))
+        with override_settings(CODE_GRADER={'TIMEOUT': 1}):
+            self.assertFalse(execute_and_compare_code('while True: pass', 'a = 1', correct_scope={'a': 1}))
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CourseViewSet, CompleteLessonView, CheckAnswerView, RequestHintView, ChallengeViewSet
+from .views import CourseViewSet, CompleteLessonView, CheckAnswerView, CheckAnswersView, CodeVerdictStatsView, RequestHintView, ChallengeViewSet, ContentSearchView, LessonDetailView, SkillProgressView
 
 router = DefaultRouter()
 router.register(r'courses', CourseViewSet, basename='course')
@@ -8,7 +8,12 @@ router.register(r'challenges', ChallengeViewSet, basename='challenge')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('lessons/<int:pk>/', LessonDetailView.as_view(), name='lesson-detail'),
     path('lessons/complete/', CompleteLessonView.as_view(), name='complete-lesson'),
+    path('skills/<int:pk>/progress/', SkillProgressView.as_view(), name='skill-progress'),
     path('tasks/check_answer/', CheckAnswerView.as_view(), name='check-answer'),
+    path('tasks/check_answers/', CheckAnswersView.as_view(), name='check-answers'),
+    path('tasks/verdict_stats/', CodeVerdictStatsView.as_view(), name='code-verdict-stats'),
     path('tasks/request_hint/', RequestHintView.as_view(), name='request-hint'),
+    path('search/', ContentSearchView.as_view(), name='content-search'),
 ]
\ No newline at end of file
@@ -1,13 +1,13 @@
 import re
-from rest_framework import viewsets, permissions, status
+from rest_framework import viewsets, permissions, status, generics
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.views import APIView
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
-from datetime import timedelta
 from django.db.models import Q
-from .models import Course, Lesson, UserProgress, Task, Hint, Challenge
+from .models import Course, Skill, Lesson, UserProgress, Task, Hint, Challenge, LessonSearchDocument, ActivityEvent
 from users.models import User
 from .serializers import (
     CourseListSerializer, 
@@ -16,25 +16,23 @@ from .serializers import (
     LessonCompletionResponseSerializer, 
     ChallengeSerializer, 
     CreateChallengeSerializer,
-    SubmitChallengeResultSerializer
+    SubmitChallengeResultSerializer,
+    CheckAnswersSerializer,
+    LessonSearchResultSerializer,
+    CourseOutlineSerializer,
+    LessonBodySerializer
 )
-from .services import check_and_award_badges
-
-def normalize_text(text: str):
-    return str(text).strip().lower()
-
-def execute_and_compare_code(user_code: str, correct_code_example: str):
-    try:
-        processed_user_code = user_code.encode().decode('unicode_escape')
-        processed_correct_code = correct_code_example.encode().decode('unicode_escape')
-        user_scope, correct_scope = {}, {}
-        safe_builtins = {"True": True, "False": False, "int": int, "str": str, "print": print, "list": list, "dict": dict}
-        exec(processed_user_code, {"__builtins__": safe_builtins}, user_scope)
-        exec(processed_correct_code, {"__builtins__": safe_builtins}, correct_scope)
-        return user_scope == correct_scope
-    except Exception as e:
-        print(f"Ошибка при выполнении кода: {e}")
-        return False
+from django.core.cache import cache
+from .services import check_and_award_badges, lesson_detail_cache_key, course_detail_cache_key, COURSE_CONTENT_CACHE_TIMEOUT
+from config.compression import encode_payload, payload_response, wants_json
+from .search import search_lessons, get_search_config
+from .activity import record_lesson_activity
+from .answers import answer_keys, check_answers, verdict_cache_stats, get_answer_cache_config
+from .hints import reveal_next_hint
+from .skill_tree import skill_progress
+from users.streaks import register_activity
+from users.dashboard import invalidate_dashboard
+from config.throttling import AnswerCheckThrottle, HintThrottle, ChallengeCreateThrottle
 
 class CourseViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
@@ -45,8 +43,81 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
             return CourseListSerializer
         if self.action == 'retrieve':
             return CourseDetailSerializer
+        if self.action == 'outline':
+            return CourseOutlineSerializer
         return CourseListSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        # Полное дерево курса одинаково для всех пользователей: кэшируем уже закодированные и сжатые байты
+        if not wants_json(request):
+            return super().retrieve(request, *args, **kwargs)
+        course = self.get_object()
+        key = course_detail_cache_key(course.id, course.updated_at)
+        variants = cache.get(key)
+        if variants is None:
+            variants = encode_payload(self.get_serializer(course).data)
+            cache.set(key, variants, COURSE_CONTENT_CACHE_TIMEOUT)
+        return payload_response(request, variants)
+
+    @action(detail=True, methods=['get'])
+    def outline(self, request, pk=None):
+        """Лёгкая версия retrieve: структура курса и флаги прохождения, тела уроков грузятся через lessons/<id>/."""
+        return Response(self.get_serializer(self.get_object()).data)
+
+class LessonDetailView(APIView):
+    """Теория и задания одного урока опубликованного курса. Тело урока кэшируется отдельно от курса, по его версии."""
+    permission_classes = [permissions.IsAuthenticated]
+    def get(self, request, pk, *args, **kwargs):
+        # Версия курса приходит тем же запросом, что и проверка публикации
+        course_updated_at = Lesson.objects.filter(pk=pk, skill__course__is_published=True)\
+            .values_list('skill__course__updated_at', flat=True).first()
+        if course_updated_at is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if not wants_json(request):
+            return Response(self.get_lesson_data(pk))
+        key = lesson_detail_cache_key(pk, course_updated_at)
+        variants = cache.get(key)
+        if variants is None:
+            variants = encode_payload(self.get_lesson_data(pk))
+            cache.set(key, variants, COURSE_CONTENT_CACHE_TIMEOUT)
+        return payload_response(request, variants)
+
+    def get_lesson_data(self, pk):
+        lesson = Lesson.objects.prefetch_related('tasks__hints').get(pk=pk)
+        return LessonBodySerializer(lesson).data
+
+class SkillProgressView(APIView):
+    """Прогресс пользователя по навыку вместе со всеми его подразделами (courses.skill_tree)."""
+    permission_classes = [permissions.IsAuthenticated]
+    def get(self, request, pk, *args, **kwargs):
+        skill = get_object_or_404(Skill.objects.only('id', 'title', 'course_id', 'tree_path'), pk=pk, course__is_published=True)
+        return Response(skill_progress(request.user, skill))
+
+class ContentSearchPagination(PageNumberPagination):
+    page_size = get_search_config()['PAGE_SIZE']
+    page_size_query_param = 'page_size'
+    max_page_size = get_search_config()['MAX_PAGE_SIZE']
+
+class ContentSearchView(generics.ListAPIView):
+    """
+    Полнотекстовый поиск по урокам опубликованных курсов: заголовки, теория и вопросы заданий.
+    Параметры: q — запрос, course — необязательный id курса.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = LessonSearchResultSerializer
+    pagination_class = ContentSearchPagination
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        if len(query) < get_search_config()['MIN_QUERY_LENGTH']:
+            return LessonSearchDocument.objects.none()
+        queryset = LessonSearchDocument.objects.filter(course__is_published=True)\
+            .select_related('course').defer('content', 'updated_at', 'course__description')
+        course_id = self.request.query_params.get('course')
+        if course_id and course_id.isdigit():
+            queryset = queryset.filter(course_id=course_id)
+        return search_lessons(queryset, query)
+
 class CompleteLessonView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     def post(self, request, *args, **kwargs):
@@ -55,30 +126,23 @@ class CompleteLessonView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         lesson_id = serializer.validated_data['lesson_id']
         user = request.user
-        lesson = get_object_or_404(Lesson, id=lesson_id)
+        lesson = get_object_or_404(Lesson.objects.select_related('skill'), id=lesson_id)
         progress, created = UserProgress.objects.get_or_create(user=user, lesson=lesson)
         xp_earned_this_time = 0
         new_badges = []
         if created:
             xp_earned_this_time = lesson.xp_reward
             user.xp += xp_earned_this_time
-            today = timezone.now().date()
-            if user.last_activity_date:
-                yesterday = today - timedelta(days=1)
-                if user.last_activity_date == yesterday:
-                    user.streak += 1
-                elif user.last_activity_date != today:
-                    user.streak = 1
-            else:
-                user.streak = 1
-            user.last_activity_date = today
+            register_activity(user)
             user.save()
+            record_lesson_activity(user, lesson, ActivityEvent.Kind.LESSON_COMPLETED, xp_earned_this_time)
             new_badges = check_and_award_badges(user)
             message = f"Урок '{lesson.title}' успешно пройден!"
         else:
-            progress.completed_at = timezone.now()
-            progress.save()
+            # completed_at хранит первое прохождение; повторы идут в журнал активности
+            record_lesson_activity(user, lesson, ActivityEvent.Kind.LESSON_REPEATED)
             message = f"Вы повторили урок '{lesson.title}'. Так держать!"
+        invalidate_dashboard(user.id)  # последний курс и процент прохождения могли измениться
         response_data = {
             'message': message,
             'xp_earned': xp_earned_this_time,
@@ -88,44 +152,114 @@ class CompleteLessonView(APIView):
         serializer.is_valid(raise_exception=True)
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
+def _answer_verdict(key, is_correct, report=None):
+    verdict = {"is_correct": True} if is_correct else {"is_correct": False, "correct_answer": key.revealed_answer}
+    if report is not None:
+        # Проверка по набору тестов: результаты случаев (без ожидаемых значений) и ошибка решения
+        verdict["cases"] = report['cases']
+        if report.get('error'):
+            verdict["error"] = report['error']
+    return verdict
+
 class CheckAnswerView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [AnswerCheckThrottle]
     def post(self, request, *args, **kwargs):
         task_id = request.data.get('task_id')
         user_answer = request.data.get('answer')
         if not task_id or user_answer is None:
             return Response({"error": "task_id and answer are required."}, status=status.HTTP_400_BAD_REQUEST)
-        task = get_object_or_404(Task, id=task_id)
-        is_correct = False
-        if task.task_type == 'code':
-            is_correct = execute_and_compare_code(user_answer, task.correct_answer)
-        else:
-            if normalize_text(user_answer) == normalize_text(task.correct_answer):
-                is_correct = True
-        if is_correct:
-            return Response({"is_correct": True})
-        else:
-            return Response({"is_correct": False, "correct_answer": None if task.task_type in ['code', 'constructor'] else task.correct_answer})
+        # Ключ ответа берётся из кэша процесса (courses.answers), база — только при промахе
+        try:
+            key = answer_keys.get(int(task_id))
+        except (TypeError, ValueError):
+            key = None
+        if key is None:
+            raise NotFound()
+        return Response(_answer_verdict(key, *key.grade(user_answer)))
+
+class CheckAnswersView(APIView):
+    """Проверка всех ответов урока одним запросом; формат вердикта — как у CheckAnswerView."""
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [AnswerCheckThrottle]
+
+    def get_throttle_cost(self, request):
+        # Токен за каждый кодовый ответ (их в пакете не больше MAX_CODE_BATCH — проверяет сериализатор)
+        answers = request.data.get('answers') if isinstance(request.data, dict) else None
+        if not isinstance(answers, list):
+            return 1
+        task_ids = []
+        for item in answers[:get_answer_cache_config()['MAX_BATCH']]:
+            try:
+                task_ids.append(int(item['task_id']))  # как IntegerField сериализатора: "5" тоже id
+            except (TypeError, ValueError, KeyError):
+                continue
+        keys = answer_keys.get_many(task_ids)
+        cost = sum(1 for task_id in task_ids if task_id in keys and keys[task_id].task_type == 'code')
+        # Пакет сверх лимита сериализатор отклонит (400) без исполнения — он стоит как обычный запрос
+        return cost if cost <= get_answer_cache_config()['MAX_CODE_BATCH'] else 1
+
+    def post(self, request, *args, **kwargs):
+        serializer = CheckAnswersSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lesson_id = serializer.validated_data.get('lesson_id')
+        answers = [(item['task_id'], item['answer']) for item in serializer.validated_data['answers']]
+
+        results, correct = [], 0
+        for task_id, key, is_correct, report in check_answers(answers):
+            if key is None or (lesson_id is not None and key.lesson_id != lesson_id):
+                results.append({"task_id": task_id, "is_correct": False, "error": "Задание не найдено."})
+                continue
+            correct += int(is_correct)
+            results.append({"task_id": task_id, **_answer_verdict(key, is_correct, report)})
+        return Response({"results": results, "correct": correct, "total": len(results)})
+
+class CodeVerdictStatsView(APIView):
+    """Попадания в кэш вердиктов кода (для LocMemCache — счётчики процесса, обслужившего запрос)."""
+    permission_classes = [permissions.IsAdminUser]
+    def get(self, request, *args, **kwargs):
+        return Response(verdict_cache_stats())
 
 class RequestHintView(APIView):
+    """Следующая подсказка задания (courses.hints): штраф списывается один раз, открытые подсказки — бесплатно."""
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [HintThrottle]
     def post(self, request, *args, **kwargs):
         task_id = request.data.get('task_id')
         if not task_id:
             return Response({"error": "task_id is required."}, status=status.HTTP_400_BAD_REQUEST)
-        task = get_object_or_404(Task, id=task_id)
-        user = request.user
-        hint = task.hints.first() 
-        if hint:
-            user.xp = max(0, user.xp - hint.xp_penalty)
-            user.save()
-            return Response({"hint": {"text": hint.text}, "message": f"Вы использовали подсказку. Списано {hint.xp_penalty} XP."})
-        else:
+        try:
+            task_id = int(task_id)
+        except (TypeError, ValueError):
+            return Response({"error": "task_id must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        hints, revealed, hint, penalty = reveal_next_hint(request.user, task_id)
+        if hints is None:
+            raise NotFound()
+        if not hints:
             return Response({"message": "Для этого задания нет подсказок."}, status=status.HTTP_404_NOT_FOUND)
+        if hint is None:
+            message = "Все подсказки уже открыты."
+        elif penalty:
+            message = f"Вы использовали подсказку. Списано {penalty} XP."
+        else:
+            message = "Вы использовали подсказку."
+        data = {
+            "hint": {"text": (hint or revealed[-1])['text']},
+            "revealed": [{"id": item['id'], "text": item['text']} for item in revealed],
+            "remaining": len(hints) - len(revealed),
+            "xp_penalty": penalty,
+            "message": message,
+        }
+        return Response(data)
 
 class ChallengeViewSet(viewsets.GenericViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = ChallengeSerializer
+    def get_throttles(self):
+        if self.action == 'create':
+            return [ChallengeCreateThrottle()]
+        return super().get_throttles()
+
     def get_queryset(self):
         user = self.request.user
         return Challenge.objects.filter(Q(sender=user) | Q(receiver=user))
@@ -0,0 +1,116 @@
+"""
+Адаптивный режим сертификационного теста.
+
+Вопросы выдаются по одному. Первый — средней сложности, дальше лестница: верный ответ
+поднимает сложность на ступень, неверный — опускает (1..5). Следующий вопрос берётся
+из закэшированных корзин по сложности (testing.services.get_question_buckets) случайным
+индексом, без запросов к банку.
+
+Балл взвешен по сложности, иначе ученик, которому лестница выдаёт трудные вопросы, получал бы
+тот же балл, что и отвечающий на лёгкие: верный ответ приносит очки, равные сложности вопроса,
+а 100% — это number_of_questions верных ответов средней сложности (START_DIFFICULTY), не больше
+100. Так балл сопоставим с обычным режимом, где все вопросы весят одинаково. Тест сдан, когда
+балл не ниже passing_score, то есть очков не меньше required_points; он заканчивается досрочно,
+как только исход определён: очки набраны или их уже не набрать оставшимися вопросами даже
+высшей сложности.
+
+Состояние попытки хранится в UserTestAttempt.session_data:
+    {"mode": "adaptive", "questions": [id, ...], "answers": {"id": "ответ"}, "verdicts": {"id": true},
+     "correct": 3, "points": 11, "difficulty": 4, "current": id}
+"""
+import math
+import random
+from django.utils import timezone
+from .services import get_question_buckets, is_answer_correct, DIFFICULTY_LEVELS
+
+START_DIFFICULTY = 3
+RANDOM_PICK_ATTEMPTS = 8
+
+def _pick_from_bucket(bucket, served):
+    # Обычно корзина намного больше числа выданных вопросов, и случайный индекс попадает сразу
+    for _ in range(RANDOM_PICK_ATTEMPTS):
+        question_id = bucket[random.randrange(len(bucket))]
+        if question_id not in served:
+            return question_id
+    remaining = [question_id for question_id in bucket if question_id not in served]
+    return random.choice(remaining) if remaining else None
+
+def pick_question(course_id, difficulty, served):
+    """id вопроса нужной сложности, а если её корзина исчерпана — ближайшей. None, если банк исчерпан."""
+    buckets = get_question_buckets(course_id)
+    served = set(served)
+    for level in sorted(DIFFICULTY_LEVELS, key=lambda level: (abs(level - difficulty), -level)):
+        bucket = buckets.get(level)
+        if bucket:
+            question_id = _pick_from_bucket(bucket, served)
+            if question_id is not None:
+                return question_id, level
+    return None, difficulty
+
+def start_session(test):
+    """Начальное состояние попытки; None, если на ступенях 1..5 банка курса меньше вопросов, чем в тесте."""
+    buckets = get_question_buckets(test.course_id)
+    # Вопросы со сложностью вне DIFFICULTY_LEVELS (записанные в обход валидаторов) лестница не выдаёт
+    if sum(len(buckets.get(level, ())) for level in DIFFICULTY_LEVELS) < test.number_of_questions:
+        return None
+    question_id, difficulty = pick_question(test.course_id, START_DIFFICULTY, ())
+    return {'mode': 'adaptive', 'questions': [question_id], 'answers': {}, 'verdicts': {}, 'correct': 0, 'points': 0,
+            'difficulty': difficulty, 'current': question_id}
+
+def full_points(test):
+    """Очки, соответствующие 100%: все вопросы теста верно, средней сложности."""
+    return test.number_of_questions * START_DIFFICULTY
+
+def required_points(test):
+    return math.ceil(full_points(test) * test.passing_score / 100)
+
+def session_points(session):
+    # Попытки, начатые до взвешивания, хранят только число верных ответов
+    return session.get('points', session['correct'] * START_DIFFICULTY)
+
+def is_decided(test, answered, points):
+    required = required_points(test)
+    return points >= required or points + (test.number_of_questions - answered) * DIFFICULTY_LEVELS[-1] < required
+
+def finish_attempt(attempt):
+    """
+    Итог адаптивной попытки. Балл взвешен по сложности, а не по числу верных ответов:
+        score = min(100, round(очки / (number_of_questions * 3) * 100)),
+    где очки — сумма сложностей (1..5) верно отвеченных вопросов, а 3 — START_DIFFICULTY.
+    Тест сдан, если очки >= ceil(number_of_questions * 3 * passing_score / 100). Например, при
+    10 вопросах и passing_score=70 нужно 21 очко: хватит 7 верных ответов средней сложности
+    или 5 трудных (5 * 5 = 25), а одними лёгкими (10 * 1 = 10) не сдать.
+    Автору теста: passing_score задаёт долю от «все вопросы верно при средней сложности».
+    """
+    points, test = session_points(attempt.session_data), attempt.test
+    attempt.score = min(100, round(points / full_points(test) * 100)) if test.number_of_questions else 0
+    attempt.is_passed = points >= required_points(test)
+    attempt.end_time = timezone.now()
+
+def submit_answer(attempt, question, answer):
+    """
+    Засчитывает ответ на текущий вопрос и выбирает следующий (или завершает попытку).
+    Меняет attempt в памяти, сохраняет вызывающий код. Возвращает (id следующего вопроса, верен ли ответ).
+    """
+    session = attempt.session_data
+    test = attempt.test
+    correct = is_answer_correct(question, answer)
+    session['points'] = session_points(session)
+    session['answers'][str(question.id)] = answer
+    session.setdefault('verdicts', {})[str(question.id)] = correct
+    if correct:
+        session['correct'] += 1
+        session['points'] += question.difficulty
+    answered = len(session['answers'])
+
+    next_id = None
+    if answered < test.number_of_questions and not is_decided(test, answered, session['points']):
+        step = 1 if correct else -1
+        target = min(max(session['difficulty'] + step, DIFFICULTY_LEVELS[0]), DIFFICULTY_LEVELS[-1])
+        next_id, session['difficulty'] = pick_question(test.course_id, target, session['questions'])
+    session['current'] = next_id
+    if next_id is None:
+        finish_attempt(attempt)
+    else:
+        session['questions'].append(next_id)
+    return next_id, correct
@@ -1,16 +1,64 @@
 from django.contrib import admin
-from .models import QuestionBank, CertificationTest, UserTestAttempt
+from django.db.models import F, FloatField, ExpressionWrapper
+from django.db.models.functions import NullIf
+from config.paginators import EstimatedCountPaginator
+from .models import QuestionBank, CertificationTest, UserTestAttempt, QuestionStats, TestScoreStats
 
 @admin.register(QuestionBank)
 class QuestionBankAdmin(admin.ModelAdmin):
     list_display = ('question', 'course', 'task_type', 'difficulty')
-    list_filter = ('course', 'task_type', 'difficulty')
+    list_filter = ('course', 'task_type', 'difficulty'); search_fields = ('question',)
+    list_select_related = ('course',); autocomplete_fields = ('course',)
+    paginator = EstimatedCountPaginator; show_full_result_count = False
 
 @admin.register(CertificationTest)
 class CertificationTestAdmin(admin.ModelAdmin):
-    list_display = ('title', 'course', 'number_of_questions', 'passing_score')
+    list_display = ('title', 'course', 'number_of_questions', 'passing_score'); search_fields = ('title',)
+    list_select_related = ('course',); autocomplete_fields = ('course',)
 
 @admin.register(UserTestAttempt)
 class UserTestAttemptAdmin(admin.ModelAdmin):
     list_display = ('user', 'test', 'score', 'is_passed', 'start_time')
-    list_filter = ('test', 'is_passed')
\ No newline at end of file
+    list_filter = ('test', 'is_passed'); search_fields = ('user__username', 'user__email')
+    list_select_related = ('user', 'test'); autocomplete_fields = ('user', 'test')
+    paginator = EstimatedCountPaginator; show_full_result_count = False
+
+# --- Отчёты по попыткам: только чтение агрегатов (testing.analytics) ---
+
+class ReadOnlyReportAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request): return False
+    def has_change_permission(self, request, obj=None): return False
+    def has_delete_permission(self, request, obj=None): return False
+
+@admin.register(QuestionStats)
+class QuestionStatsAdmin(ReadOnlyReportAdmin):
+    list_display = ('question', 'course', 'difficulty', 'times_answered', 'times_correct', 'success_rate_display')
+    list_filter = ('question__course', 'question__difficulty'); search_fields = ('question__question',)
+    list_select_related = ('question__course',)
+    paginator = EstimatedCountPaginator; show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Без super(): базовая реализация сортирует по ordering до того, как появится аннотация rate
+        return self.model._default_manager.annotate(rate=ExpressionWrapper(
+            F('times_correct') * 100.0 / NullIf(F('times_answered'), 0), output_field=FloatField()))\
+            .order_by(*self.get_ordering(request))
+
+    def get_ordering(self, request):
+        # Сначала самые трудные (или сломанные) вопросы
+        return ('rate', '-times_answered')
+
+    @admin.display(description="Курс")
+    def course(self, obj): return obj.question.course
+
+    @admin.display(description="Сложность", ordering='question__difficulty')
+    def difficulty(self, obj): return obj.question.difficulty
+
+    @admin.display(description="Верных ответов, %", ordering='rate')
+    def success_rate_display(self, obj): return obj.success_rate
+
+@admin.register(TestScoreStats)
+class TestScoreStatsAdmin(ReadOnlyReportAdmin):
+    list_display = ('test', 'score_range', 'attempts', 'passed'); list_filter = ('test',); list_select_related = ('test',)
+
+    @admin.display(description="Баллы", ordering='bucket')
+    def score_range(self, obj): return "100%" if obj.bucket >= 10 else f"{obj.bucket * 10}–{obj.bucket * 10 + 9}%"
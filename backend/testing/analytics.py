@@ -0,0 +1,134 @@
+"""
+Аналитика попыток тестов.
+
+AttemptAnswer — нормализованная запись каждого ответа (вместо разбора session_data).
+QuestionStats и TestScoreStats — агрегаты, которые обновляются инкрементально при проверке
+(record_answers, record_result) и пересобираются командой rebuild_attempt_analytics.
+Отчёты в админке читают только агрегаты.
+"""
+from collections import Counter
+from itertools import islice
+from django.db import transaction
+from django.db.models import F, Count, Q
+from django.utils import timezone
+from .models import QuestionBank, UserTestAttempt, AttemptAnswer, QuestionStats, TestScoreStats
+from .services import is_answer_correct
+
+def score_bucket(score):
+    return min((score or 0) // 10, 10)
+
+def record_answers(attempt, graded, when=None):
+    """graded — [(question_id, ответ, верно ли)]. Пишет ответы и увеличивает счётчики вопросов."""
+    if not graded:
+        return
+    when = when or timezone.now()
+    with transaction.atomic():
+        AttemptAnswer.objects.bulk_create([
+            AttemptAnswer(attempt=attempt, question_id=question_id, answer=answer, is_correct=correct, answered_at=when)
+            for question_id, answer, correct in graded
+        ])
+        # Сначала гарантируем строки сводки, затем атомарные инкременты — без гонок при параллельных попытках
+        QuestionStats.objects.bulk_create([QuestionStats(question_id=question_id) for question_id, _, _ in graded], ignore_conflicts=True)
+        correct_ids = [question_id for question_id, _, correct in graded if correct]
+        wrong_ids = [question_id for question_id, _, correct in graded if not correct]
+        if correct_ids:
+            QuestionStats.objects.filter(question_id__in=correct_ids)\
+                .update(times_answered=F('times_answered') + 1, times_correct=F('times_correct') + 1)
+        if wrong_ids:
+            QuestionStats.objects.filter(question_id__in=wrong_ids).update(times_answered=F('times_answered') + 1)
+
+def bump_score_stats(counts):
+    """counts — {(test_id, корзина): (попыток, сдано)}."""
+    with transaction.atomic():
+        TestScoreStats.objects.bulk_create([TestScoreStats(test_id=test_id, bucket=bucket) for test_id, bucket in counts],
+                                           ignore_conflicts=True)
+        for (test_id, bucket), (attempts, passed) in counts.items():
+            TestScoreStats.objects.filter(test_id=test_id, bucket=bucket)\
+                .update(attempts=F('attempts') + attempts, passed=F('passed') + passed)
+
+def record_result(attempt):
+    """Учитывает завершённую попытку в распределении баллов теста."""
+    bump_score_stats({(attempt.test_id, score_bucket(attempt.score)): (1, int(attempt.is_passed))})
+
+def graded_from_session(attempt, questions, previous=None):
+    """
+    Ответы попытки из session_data (для пересборки); questions — {id: QuestionBank}.
+    Вердикт берётся сохранённый при проверке (session_data["verdicts"]), для старых попыток —
+    из прежних AttemptAnswer (previous — {question_id: верно ли}), иначе проверяется заново без
+    исполнения кода. Кодовые ответы без сохранённого вердикта пропускаются.
+    """
+    session = attempt.session_data or {}
+    if session.get('mode') == 'adaptive':
+        answers = {int(question_id): answer for question_id, answer in session.get('answers', {}).items()}
+        question_ids = list(answers)
+    else:
+        answers = {int(question_id): answer for question_id, answer in session.get('user_answers', {}).items()}
+        question_ids = session.get('questions', [])
+    verdicts = {**(previous or {}), **{int(question_id): correct for question_id, correct in session.get('verdicts', {}).items()}}
+    graded = []
+    for question_id in question_ids:
+        if question_id not in questions:
+            continue
+        correct = verdicts.get(question_id)
+        if correct is None:
+            correct = is_answer_correct(questions[question_id], answers.get(question_id), execute=False)
+        if correct is not None:
+            graded.append((question_id, answers.get(question_id), correct))
+    return graded
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def rebuild_attempt_analytics(batch_size=500):
+    """
+    Пересобирает ответы завершённых попыток и агрегаты (попытки читаются пачками через iterator()).
+    Код не исполняется: вердикты берутся из session_data и прежних AttemptAnswer (graded_from_session).
+    """
+    attempts = UserTestAttempt.objects.filter(end_time__isnull=False).order_by('id')\
+        .only('id', 'test_id', 'score', 'is_passed', 'end_time', 'session_data')
+    stats = Counter()
+    with transaction.atomic():
+        QuestionStats.objects.all().delete()
+        TestScoreStats.objects.all().delete()
+
+        scores = Counter()
+        for batch in _batches(attempts.iterator(chunk_size=batch_size), batch_size):
+            question_ids = set()
+            for attempt in batch:
+                session = attempt.session_data or {}
+                question_ids.update(session.get('questions', []))
+                question_ids.update(int(question_id) for question_id in session.get('answers', {}))
+            questions = QuestionBank.objects.only('id', 'task_type', 'correct_answer', 'test_cases').in_bulk(question_ids)
+            # Прежние ответы пачки — источник вердиктов для попыток, проверенных до сохранения verdicts
+            stored = AttemptAnswer.objects.filter(attempt__in=batch)
+            previous = {}
+            for attempt_id, question_id, correct in stored.values_list('attempt_id', 'question_id', 'is_correct'):
+                previous.setdefault(attempt_id, {})[question_id] = correct
+            stored.delete()
+            rows = []
+            for attempt in batch:
+                graded = graded_from_session(attempt, questions, previous.get(attempt.id))
+                rows += [AttemptAnswer(attempt_id=attempt.id, question_id=question_id, answer=answer, is_correct=correct,
+                                       answered_at=attempt.end_time)
+                         for question_id, answer, correct in graded]
+                key = (attempt.test_id, score_bucket(attempt.score))
+                scores[key + ('attempts',)] += 1
+                scores[key + ('passed',)] += int(attempt.is_passed)
+            AttemptAnswer.objects.bulk_create(rows, batch_size=1000)
+            stats['attempts'] += len(batch)
+            stats['answers'] += len(rows)
+
+        # Ответы незавершённых адаптивных попыток не трогаются и входят в сводку, как при записи
+        per_question = AttemptAnswer.objects.values('question_id')\
+            .annotate(answered=Count('id'), correct=Count('id', filter=Q(is_correct=True))).order_by()
+        QuestionStats.objects.bulk_create([
+            QuestionStats(question_id=row['question_id'], times_answered=row['answered'], times_correct=row['correct'])
+            for row in per_question.iterator()
+        ], batch_size=1000)
+        TestScoreStats.objects.bulk_create([
+            TestScoreStats(test_id=test_id, bucket=bucket, attempts=count, passed=scores[(test_id, bucket, 'passed')])
+            for (test_id, bucket, kind), count in scores.items() if kind == 'attempts'
+        ], batch_size=1000)
+    return stats
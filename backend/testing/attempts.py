@@ -0,0 +1,47 @@
+"""
+Старт попыток сертификационных тестов.
+
+Повторный старт возвращает уже открытую попытку (без новой выборки вопросов и новой записи
+в базе); гонку двух одновременных стартов разрешает уникальный частичный индекс открытых
+попыток (attempt_one_open_per_test). Новая попытка возможна не раньше, чем через
+CertificationTest.cooldown_minutes после окончания предыдущей.
+"""
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import UserTestAttempt
+from .expiry import attempt_deadline, is_expired, close_expired_attempt
+
+def get_open_attempt(user, test):
+    """Открытая попытка пользователя по тесту; просроченная при этом закрывается, и возвращается None."""
+    with transaction.atomic():
+        attempt = UserTestAttempt.objects.select_for_update().filter(user=user, test=test, end_time__isnull=True).first()
+        if attempt is not None and is_expired(attempt):
+            close_expired_attempt(attempt)
+            return None
+    return attempt
+
+def cooldown_until(user, test, now=None):
+    """Момент, с которого можно начать новую попытку, или None, если можно уже сейчас."""
+    if not test.cooldown_minutes:
+        return None
+    last_end = UserTestAttempt.objects.filter(user=user, test=test, end_time__isnull=False)\
+        .order_by('-end_time').values_list('end_time', flat=True).first()
+    if last_end is None:
+        return None
+    until = last_end + timedelta(minutes=test.cooldown_minutes)
+    return until if until > (now or timezone.now()) else None
+
+def create_attempt(user, test, session_data):
+    """
+    (попытка, создана ли). Если параллельный запрос успел создать попытку раньше — возвращается она.
+    (None, False), если та попытка уже успела закрыться: создавать новую в обход паузы нельзя,
+    вызывающий код отвечает 409, и повторный запрос пройдёт обычные проверки.
+    """
+    try:
+        with transaction.atomic():
+            attempt = UserTestAttempt.objects.create(user=user, test=test, session_data=session_data,
+                                                     expires_at=attempt_deadline(test))
+        return attempt, True
+    except IntegrityError:
+        return UserTestAttempt.objects.filter(user=user, test=test, end_time__isnull=True).first(), False
@@ -0,0 +1,76 @@
+"""
+Сроки попыток сертификационных тестов.
+
+Срок попытки (expires_at) задаётся при старте по CertificationTest.duration_minutes.
+Ответы после срока (с небольшим запасом на сеть) не принимаются: попытка закрывается
+с тем, что было засчитано к этому моменту. Брошенные попытки закрывает команда
+expire_test_attempts — пачками, одним UPDATE на пачку, по частичному индексу открытых попыток.
+"""
+from collections import Counter
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F, Value, IntegerField, OuterRef, Subquery
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, Coalesce, Least, Round
+from django.utils import timezone
+from .models import CertificationTest, UserTestAttempt
+from .analytics import score_bucket, bump_score_stats
+from . import adaptive
+
+SUBMIT_GRACE_PERIOD = timedelta(seconds=30)
+
+def attempt_deadline(test, start=None):
+    if not test.duration_minutes:
+        return None
+    return (start or timezone.now()) + timedelta(minutes=test.duration_minutes)
+
+def is_expired(attempt, now=None):
+    return attempt.expires_at is not None and (now or timezone.now()) > attempt.expires_at + SUBMIT_GRACE_PERIOD
+
+def close_expired_attempt(attempt):
+    """
+    Закрывает просроченную попытку (attempt заблокирован вызывающим кодом): адаптивная
+    получает балл по засчитанным ответам, у обычной ответы не успели прийти — 0.
+    """
+    if attempt.session_data.get('mode') == 'adaptive':
+        adaptive.finish_attempt(attempt)
+    else:
+        attempt.score = 0
+        attempt.is_passed = False
+    attempt.end_time = attempt.expires_at
+    attempt.save(update_fields=['score', 'is_passed', 'end_time'])
+    bump_score_stats({(attempt.test_id, score_bucket(attempt.score)): (1, 0)})
+
+def expire_attempts(batch_size=1000, now=None):
+    """
+    Закрывает все просроченные открытые попытки, возвращает их число.
+    Открытая адаптивная попытка ещё не набрала проходной балл (иначе она закрылась бы сразу),
+    поэтому is_passed всегда False, а балл считается в SQL из session_data.points так же,
+    как в adaptive.finish_attempt (у обычной попытки очков нет — балл 0).
+    """
+    now = now or timezone.now()
+    cutoff = now - SUBMIT_GRACE_PERIOD
+    total_questions = CertificationTest.objects.filter(id=OuterRef('test_id')).values('number_of_questions')[:1]
+    correct = Cast(KeyTextTransform('correct', 'session_data'), IntegerField())
+    points = Coalesce(Cast(KeyTextTransform('points', 'session_data'), IntegerField()),
+                      correct * adaptive.START_DIFFICULTY, Value(0))
+    score = Least(Coalesce(Cast(Round(points * 100.0 / (Subquery(total_questions) * adaptive.START_DIFFICULTY)),
+                                IntegerField()), Value(0)), Value(100))
+    expired = 0
+    while True:
+        with transaction.atomic():
+            # Блокировка строк: сдача попытки ждёт, пока пачка не закроется (и наоборот)
+            ids = list(UserTestAttempt.objects.select_for_update(skip_locked=True)
+                       .filter(end_time__isnull=True, expires_at__lt=cutoff)
+                       .order_by('expires_at').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            UserTestAttempt.objects.filter(id__in=ids, end_time__isnull=True)\
+                .update(end_time=F('expires_at'), is_passed=False, score=score)
+            counts = Counter(
+                (test_id, score_bucket(score_value))
+                for test_id, score_value in UserTestAttempt.objects.filter(id__in=ids).values_list('test_id', 'score')
+            )
+            bump_score_stats({key: (count, 0) for key, count in counts.items()})
+        expired += len(ids)
+    return expired
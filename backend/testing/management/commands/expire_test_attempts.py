@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from testing.expiry import expire_attempts
+
+
+class Command(BaseCommand):
+    help = (
+        "Закрывает просроченные попытки сертификационных тестов (по expires_at). "
+        "Рассчитана на запуск по расписанию, например раз в несколько минут."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = expire_attempts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Закрыто просроченных попыток: {count}"))
@@ -0,0 +1,22 @@
+import sys
+from django.core.management.base import BaseCommand
+from testing.question_io import export_questions, open_question_file, detect_format
+
+
+class Command(BaseCommand):
+    help = "Выгружает банк вопросов в CSV или JSON Lines (формат — testing/question_io.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help="Файл *.csv или *.jsonl (можно *.gz); по умолчанию — stdout в JSON Lines")
+        parser.add_argument('--course', type=int, action='append', dest='courses', help="id курса (можно несколько раз)")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="По умолчанию — по расширению файла")
+
+    def handle(self, *args, **options):
+        path = options['output']
+        fmt = options['format'] or (detect_format(path) if path else 'jsonl')
+        if not path:
+            export_questions(sys.stdout, fmt, course_ids=options['courses'])
+            return
+        with open_question_file(path, 'wt') as out:
+            count = export_questions(out, fmt, course_ids=options['courses'])
+        self.stdout.write(self.style.SUCCESS(f"Выгружено вопросов: {count} -> {path}"))
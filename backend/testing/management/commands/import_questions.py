@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from testing.question_io import import_questions, open_question_file, read_rows, detect_format
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует вопросы в банк из CSV или JSON Lines (формат — testing/question_io.py). "
+        "Некорректные строки и дубликаты пропускаются, ошибки выводятся по строкам."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Файл *.csv, *.jsonl (можно *.gz)")
+        parser.add_argument('--course', type=int, help="id курса для строк без колонки course")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="По умолчанию — по расширению файла")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Проверить файл и откатить изменения")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+        with open_question_file(options['path']) as lines:
+            stats, errors = import_questions(read_rows(lines, fmt), default_course_id=options['course'],
+                                             batch_size=options['batch_size'], dry_run=options['dry_run'])
+        for line_no, message in errors:
+            self.stderr.write(f"строка {line_no}: {message}")
+        summary = f"добавлено: {stats['created']}, дубликатов: {stats['duplicates']}, с ошибками: {stats['invalid']}"
+        prefix = "Проверка завершена" if options['dry_run'] else "Импорт завершён"
+        style = self.style.WARNING if stats['invalid'] else self.style.SUCCESS
+        self.stdout.write(style(f"{prefix} ({summary})"))
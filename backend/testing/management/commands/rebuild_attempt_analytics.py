@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from testing.analytics import rebuild_attempt_analytics
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересобирает ответы попыток (AttemptAnswer) и агрегаты по вопросам и баллам "
+        "из session_data завершённых попыток по сохранённым вердиктам, без исполнения кода."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Сколько попыток читать за раз")
+
+    def handle(self, *args, **options):
+        stats = rebuild_attempt_analytics(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Попыток: {stats['attempts']}, ответов: {stats['answers']}"))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:52
+
+from django.db import migrations, models
+
+
+def backfill_question_hash(apps, schema_editor):
+    from testing.models import question_hash
+    QuestionBank = apps.get_model('testing', 'QuestionBank')
+    batch = []
+    for question in QuestionBank.objects.only('id', 'question').iterator(chunk_size=2000):
+        question.question_hash = question_hash(question.question)
+        batch.append(question)
+        if len(batch) >= 2000:
+            QuestionBank.objects.bulk_update(batch, ['question_hash'])
+            batch = []
+    QuestionBank.objects.bulk_update(batch, ['question_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_activity_log'),
+        ('testing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionbank',
+            name='question_hash',
+            field=models.CharField(default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_question_hash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='questionbank',
+            index=models.Index(fields=['course', 'question_hash'], name='question_course_hash_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing', '0002_questionbank_question_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificationtest',
+            name='is_adaptive',
+            field=models.BooleanField(default=False, verbose_name='Адаптивный режим'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing', '0003_certificationtest_is_adaptive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='testing.questionbank')),
+                ('times_answered', models.PositiveIntegerField(default=0)),
+                ('times_correct', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Статистика вопроса',
+                'verbose_name_plural': 'Статистика вопросов',
+            },
+        ),
+        migrations.CreateModel(
+            name='AttemptAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer', models.TextField(blank=True, null=True)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('answered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='testing.usertestattempt')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempt_answers', to='testing.questionbank')),
+            ],
+            options={
+                'verbose_name': 'Ответ в попытке',
+                'verbose_name_plural': 'Ответы в попытках',
+                'unique_together': {('attempt', 'question')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TestScoreStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('passed', models.PositiveIntegerField(default=0)),
+                ('test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_stats', to='testing.certificationtest')),
+            ],
+            options={
+                'verbose_name': 'Распределение баллов',
+                'verbose_name_plural': 'Распределение баллов',
+                'ordering': ['test', 'bucket'],
+                'unique_together': {('test', 'bucket')},
+            },
+        ),
+    ]
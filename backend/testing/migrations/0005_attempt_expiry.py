@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:58
+
+from django.conf import settings
+from django.db import migrations, models
+from datetime import timedelta
+
+
+def set_open_attempt_deadlines(apps, schema_editor):
+    # Уже открытые попытки получают срок по длительности своего теста
+    CertificationTest = apps.get_model('testing', 'CertificationTest')
+    UserTestAttempt = apps.get_model('testing', 'UserTestAttempt')
+    for test_id, minutes in CertificationTest.objects.filter(duration_minutes__isnull=False).values_list('id', 'duration_minutes'):
+        UserTestAttempt.objects.filter(test_id=test_id, end_time__isnull=True)\
+            .update(expires_at=models.F('start_time') + timedelta(minutes=minutes))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing', '0004_attempt_analytics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificationtest',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(blank=True, default=60, help_text='Время на попытку; пусто — без ограничения', null=True),
+        ),
+        migrations.AddField(
+            model_name='usertestattempt',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(set_open_attempt_deadlines, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='usertestattempt',
+            index=models.Index(condition=models.Q(('end_time__isnull', True)), fields=['expires_at'], name='attempt_open_expires_idx'),
+        ),
+    ]
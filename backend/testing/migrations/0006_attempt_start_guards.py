@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+from django.utils import timezone
+
+
+def close_duplicate_open_attempts(apps, schema_editor):
+    # Перед уникальным ограничением: у пары (пользователь, тест) остаётся открытой только последняя попытка
+    UserTestAttempt = apps.get_model('testing', 'UserTestAttempt')
+    open_attempts = UserTestAttempt.objects.filter(end_time__isnull=True)
+    latest_ids = open_attempts.values('user_id', 'test_id').annotate(latest=Max('id')).values_list('latest', flat=True)
+    open_attempts.exclude(id__in=list(latest_ids)).update(end_time=timezone.now(), score=0, is_passed=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing', '0005_attempt_expiry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificationtest',
+            name='cooldown_minutes',
+            field=models.PositiveIntegerField(default=10, help_text='Пауза между окончанием попытки и началом следующей'),
+        ),
+        migrations.AddIndex(
+            model_name='usertestattempt',
+            index=models.Index(fields=['user', 'test', '-end_time'], name='attempt_user_test_end_idx'),
+        ),
+        migrations.RunPython(close_duplicate_open_attempts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='usertestattempt',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_time__isnull', True)), fields=('user', 'test'), name='attempt_one_open_per_test'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:03
+
+import courses.grader
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing', '0006_attempt_start_guards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionbank',
+            name='test_cases',
+            field=models.JSONField(blank=True, null=True, validators=[courses.grader.validate_test_cases]),
+        ),
+    ]
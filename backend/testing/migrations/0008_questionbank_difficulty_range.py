@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:44
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def clamp_difficulty(apps, schema_editor):
+    # Вопросы вне 1..5 адаптивный режим не выдавал; приводим их к ближайшей ступени
+    QuestionBank = apps.get_model('testing', 'QuestionBank')
+    QuestionBank.objects.filter(difficulty__lt=1).update(difficulty=1)
+    QuestionBank.objects.filter(difficulty__gt=5).update(difficulty=5)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testing', '0007_questionbank_test_cases'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='questionbank',
+            name='difficulty',
+            field=models.PositiveIntegerField(default=1, help_text='Сложность от 1 (легкий) до 5 (сложный)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.RunPython(clamp_difficulty, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,19 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+from django.core.validators import MinValueValidator, MaxValueValidator
+import hashlib
+import re
+import unicodedata
 from courses.models import Course # Импортируем курс, к которому будет привязан тест
+from courses.grader import validate_test_cases
+
+def normalize_question(text):
+    """Нормализация текста вопроса для сравнения: NFKC, регистр, схлопывание пробелов."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', str(text)).casefold()).strip()
+
+def question_hash(text):
+    return hashlib.sha256(normalize_question(text).encode('utf-8')).hexdigest()
 
 class QuestionBank(models.Model):
     """Банк вопросов для тестов."""
@@ -18,13 +31,21 @@ class QuestionBank(models.Model):
     options = models.JSONField(null=True, blank=True)
     correct_answer = models.TextField()
     code_template = models.TextField(blank=True, null=True)
-    difficulty = models.PositiveIntegerField(default=1, help_text="Сложность от 1 (легкий) до 5 (сложный)")
+    # Набор тестов для кодовых вопросов (формат — courses.grader)
+    test_cases = models.JSONField(null=True, blank=True, validators=[validate_test_cases])
+    # Вне 1..5 вопрос не попал бы ни на одну ступень адаптивного режима (testing.adaptive)
+    difficulty = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1), MaxValueValidator(5)],
+                                             help_text="Сложность от 1 (легкий) до 5 (сложный)")
+    # sha256 нормализованного текста вопроса — для поиска дубликатов при импорте (testing.question_io).
+    # Заполняется сигналом pre_save (в том числе при loaddata); update()/bulk_update его не пересчитывают
+    question_hash = models.CharField(max_length=64, editable=False, default='')
 
     def __str__(self):
         return f"{self.course.title}: {self.question[:50]}..."
-    
+
     class Meta:
         verbose_name = "Вопрос из банка"; verbose_name_plural = "Банк вопросов"
+        indexes = [models.Index(fields=['course', 'question_hash'], name='question_course_hash_idx')]
 
 class CertificationTest(models.Model):
     """Описывает сам сертификационный тест."""
@@ -33,6 +54,10 @@ class CertificationTest(models.Model):
     description = models.TextField()
     number_of_questions = models.PositiveIntegerField(default=100)
     passing_score = models.PositiveIntegerField(default=80, help_text="Проходной балл в процентах")
+    # Адаптивный режим: вопросы выдаются по одному, сложность подстраивается под ответы (testing.adaptive)
+    is_adaptive = models.BooleanField(default=False, verbose_name="Адаптивный режим")
+    duration_minutes = models.PositiveIntegerField(null=True, blank=True, default=60, help_text="Время на попытку; пусто — без ограничения")
+    cooldown_minutes = models.PositiveIntegerField(default=10, help_text="Пауза между окончанием попытки и началом следующей")
 
     def __str__(self):
         return self.title
@@ -46,6 +71,8 @@ class UserTestAttempt(models.Model):
     test = models.ForeignKey(CertificationTest, on_delete=models.CASCADE)
     start_time = models.DateTimeField(auto_now_add=True)
     end_time = models.DateTimeField(null=True, blank=True)
+    # Крайний срок сдачи (start_time + duration_minutes); просроченные попытки закрывает expire_test_attempts
+    expires_at = models.DateTimeField(null=True, blank=True)
     score = models.PositiveIntegerField(null=True, blank=True, help_text="Итоговый балл в процентах")
     is_passed = models.BooleanField(default=False)
     # Здесь мы будем хранить JSON со всеми вопросами, которые были в этой попытке, и ответами пользователя
@@ -55,4 +82,55 @@ class UserTestAttempt(models.Model):
         return f"Попытка {self.user} теста '{self.test.title}'"
         
     class Meta:
-        verbose_name = "Попытка теста"; verbose_name_plural = "Попытки тестов"
\ No newline at end of file
+        verbose_name = "Попытка теста"; verbose_name_plural = "Попытки тестов"
+        # Частичный индекс только по открытым попыткам: он остаётся маленьким, сколько бы попыток ни накопилось
+        indexes = [
+            models.Index(fields=['expires_at'], condition=models.Q(end_time__isnull=True), name='attempt_open_expires_idx'),
+            models.Index(fields=['user', 'test', '-end_time'], name='attempt_user_test_end_idx'),
+        ]
+        # Не больше одной открытой попытки на пользователя и тест — повторный старт возвращает её
+        constraints = [models.UniqueConstraint(fields=['user', 'test'], condition=models.Q(end_time__isnull=True), name='attempt_one_open_per_test')]
+class AttemptAnswer(models.Model):
+    """Ответ на один вопрос попытки. Пишется при проверке (testing.analytics), источник статистики по вопросам."""
+    attempt = models.ForeignKey(UserTestAttempt, on_delete=models.CASCADE, related_name="answers")
+    question = models.ForeignKey(QuestionBank, on_delete=models.CASCADE, related_name="attempt_answers")
+    answer = models.TextField(null=True, blank=True)
+    is_correct = models.BooleanField(default=False)
+    answered_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Ответ на вопрос {self.question_id} в попытке {self.attempt_id}"
+
+    class Meta:
+        verbose_name = "Ответ в попытке"; verbose_name_plural = "Ответы в попытках"
+        unique_together = ('attempt', 'question')
+
+class QuestionStats(models.Model):
+    """Сводка ответов на вопрос, обновляется инкрементально вместе с AttemptAnswer."""
+    question = models.OneToOneField(QuestionBank, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    times_answered = models.PositiveIntegerField(default=0)
+    times_correct = models.PositiveIntegerField(default=0)
+
+    @property
+    def success_rate(self):
+        return round(self.times_correct / self.times_answered * 100) if self.times_answered else None
+
+    def __str__(self):
+        return f"Вопрос {self.question_id}: {self.times_correct}/{self.times_answered}"
+
+    class Meta:
+        verbose_name = "Статистика вопроса"; verbose_name_plural = "Статистика вопросов"
+
+class TestScoreStats(models.Model):
+    """Распределение баллов завершённых попыток теста по корзинам в 10% (корзина 10 — ровно 100%)."""
+    test = models.ForeignKey(CertificationTest, on_delete=models.CASCADE, related_name="score_stats")
+    bucket = models.PositiveSmallIntegerField()
+    attempts = models.PositiveIntegerField(default=0)
+    passed = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.test_id}: {self.bucket * 10}% — {self.attempts}"
+
+    class Meta:
+        verbose_name = "Распределение баллов"; verbose_name_plural = "Распределение баллов"; ordering = ['test', 'bucket']
+        unique_together = ('test', 'bucket')
@@ -0,0 +1,220 @@
+"""
+Потоковый импорт и экспорт банка вопросов (CSV или JSON Lines).
+
+Колонки / ключи: course, task_type, question, options, correct_answer, code_template, difficulty, test_cases.
+В CSV options и test_cases — JSON-строки (пустая ячейка = null). course можно не указывать, если при
+импорте задан курс по умолчанию. Дубликаты (тот же курс и тот же нормализованный текст
+вопроса — см. normalize_question) пропускаются как в базе, так и внутри файла.
+"""
+import csv
+import gzip
+import json
+from collections import Counter
+from django.db import transaction
+from django.core.exceptions import ValidationError
+from courses.grader import validate_test_cases
+from courses.models import Course
+from .models import QuestionBank, question_hash
+from .services import invalidate_question_buckets
+
+FIELDS = ['course', 'task_type', 'question', 'options', 'correct_answer', 'code_template', 'difficulty', 'test_cases']
+JSON_FIELDS = ('options', 'test_cases')
+TASK_TYPES = {code for code, _ in QuestionBank.TASK_TYPES}
+MAX_REPORTED_ERRORS = 1000
+
+def open_question_file(path, mode='rt'):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode, encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+def detect_format(path):
+    name = str(path).removesuffix('.gz')
+    return 'csv' if name.endswith('.csv') else 'jsonl'
+
+# --- Чтение ---
+
+def read_rows(lines, fmt):
+    """Генератор (номер строки, dict). В CSV JSON-колонки декодируются; ошибки разбора отдаются как строка."""
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            row = {key: (value if value != '' else None) for key, value in row.items() if key}
+            invalid = []
+            for field in JSON_FIELDS:
+                if row.get(field) is not None:
+                    try:
+                        row[field] = json.loads(row[field])
+                    except ValueError:
+                        invalid.append(f"{field}: некорректный JSON")
+            yield reader.line_num, ('; '.join(invalid) if invalid else row)
+        return
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as exc:
+            yield line_no, f"некорректный JSON: {exc}"
+
+# --- Проверка ---
+
+def validate_question(row):
+    """Возвращает список ошибок для одного вопроса (пустой, если вопрос корректен)."""
+    errors = []
+    task_type = row.get('task_type')
+    if task_type not in TASK_TYPES:
+        errors.append(f"task_type: ожидается одно из {', '.join(sorted(TASK_TYPES))}")
+    if not str(row.get('question') or '').strip():
+        errors.append("question: пустой вопрос")
+    answer = row.get('correct_answer')
+    if answer is None or not str(answer).strip():
+        errors.append("correct_answer: пустой ответ")
+    options = row.get('options')
+    if task_type == 'multiple_choice':
+        if not isinstance(options, dict) or len(options) < 2 or not all(isinstance(v, str) for v in options.values()):
+            errors.append("options: для multiple_choice нужен объект {ключ: вариант} минимум из двух вариантов")
+        elif answer is not None and str(answer) not in options:
+            errors.append("correct_answer: должен совпадать с одним из ключей options")
+    elif task_type == 'true_false':
+        if str(answer).strip().lower() not in ('true', 'false'):
+            errors.append("correct_answer: для true_false допустимо True или False")
+    elif options is not None and not isinstance(options, (dict, list)):
+        errors.append("options: ожидается объект, список или null")
+    try:
+        validate_test_cases(row.get('test_cases'))
+    except ValidationError as exc:
+        errors.append(f"test_cases: {' '.join(exc.messages)}")
+    difficulty = row.get('difficulty', 1)
+    try:
+        difficulty = int(difficulty if difficulty is not None else 1)
+        if not 1 <= difficulty <= 5:
+            raise ValueError
+    except (TypeError, ValueError):
+        errors.append("difficulty: целое от 1 до 5")
+    return errors
+
+# --- Импорт ---
+
+def backfill_question_hashes(course_id, batch_size=1000):
+    """
+    Досчитывает пустые хэши вопросов курса (строки, изменённые update()/bulk_update в обход pre_save)
+    и возвращает множество досчитанных хэшей.
+    """
+    stale = [QuestionBank(pk=pk, question_hash=question_hash(question)) for pk, question in
+             QuestionBank.objects.filter(course_id=course_id, question_hash='').values_list('id', 'question')]
+    QuestionBank.objects.bulk_update(stale, ['question_hash'], batch_size=batch_size)
+    return {question.question_hash for question in stale}
+
+def import_questions(rows, default_course_id=None, batch_size=1000, dry_run=False):
+    """
+    Импортирует вопросы пачками bulk_create. Некорректные строки пропускаются и попадают в отчёт,
+    дубликаты пропускаются. Возвращает (stats, errors), errors — список (номер строки, сообщение).
+    При dry_run всё выполняется, но транзакция откатывается.
+    """
+    stats, errors = Counter(), []
+    known_courses = {}
+    seen = {}  # course_id -> множество хэшей, уже существующих в базе или принятых из файла
+    batch = []
+
+    def report(line_no, message):
+        stats['invalid'] += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append((line_no, message))
+
+    def course_exists(course_id):
+        if course_id not in known_courses:
+            known_courses[course_id] = Course.objects.filter(id=course_id).exists()
+        return known_courses[course_id]
+
+    def flush():
+        if not batch:
+            return
+        # Хэши из базы подгружаются только для тех, что встретились в пачке
+        by_course = {}
+        for question in batch:
+            by_course.setdefault(question.course_id, set()).add(question.question_hash)
+        for course_id, hashes in by_course.items():
+            if course_id not in seen:
+                seen[course_id] = backfill_question_hashes(course_id)
+            existing = QuestionBank.objects.filter(course_id=course_id, question_hash__in=hashes)\
+                .values_list('question_hash', flat=True)
+            seen[course_id].update(existing)
+        fresh = []
+        for question in batch:
+            hashes = seen.setdefault(question.course_id, set())
+            if question.question_hash in hashes:
+                stats['duplicates'] += 1
+                continue
+            hashes.add(question.question_hash)
+            fresh.append(question)
+        QuestionBank.objects.bulk_create(fresh, batch_size=batch_size)
+        stats['created'] += len(fresh)
+        batch.clear()
+
+    with transaction.atomic():
+        for line_no, row in rows:
+            if isinstance(row, str):
+                report(line_no, row)
+                continue
+            if not isinstance(row, dict):
+                report(line_no, "ожидается объект")
+                continue
+            course_id = row.get('course') or default_course_id
+            try:
+                course_id = int(course_id)
+            except (TypeError, ValueError):
+                report(line_no, "course: не указан id курса")
+                continue
+            if not course_exists(course_id):
+                report(line_no, f"course: курс {course_id} не найден")
+                continue
+            problems = validate_question(row)
+            if problems:
+                report(line_no, '; '.join(problems))
+                continue
+            # bulk_create не посылает pre_save, поэтому хэш считается здесь
+            batch.append(QuestionBank(
+                course_id=course_id,
+                task_type=row['task_type'],
+                question=str(row['question']).strip(),
+                options=row.get('options'),
+                test_cases=row.get('test_cases'),
+                correct_answer=str(row['correct_answer']).strip(),
+                code_template=row.get('code_template'),
+                difficulty=int(row.get('difficulty') or 1),
+                question_hash=question_hash(row['question']),
+            ))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        if dry_run:
+            transaction.set_rollback(True)
+            return stats, errors
+    # bulk_create не посылает сигналы — корзины сложности сбрасываются здесь
+    invalidate_question_buckets(*seen)
+    return stats, errors
+
+# --- Экспорт ---
+
+def export_questions(out, fmt, course_ids=None, chunk_size=2000):
+    """Пишет вопросы в out построчно; выборка идёт через iterator() и не держит банк в памяти."""
+    queryset = QuestionBank.objects.order_by('id').values_list(*[('course_id' if f == 'course' else f) for f in FIELDS])
+    if course_ids:
+        queryset = queryset.filter(course_id__in=course_ids)
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(FIELDS)
+        json_indexes = [FIELDS.index(field) for field in JSON_FIELDS]
+        for row in queryset.iterator(chunk_size=chunk_size):
+            row = list(row)
+            for index in json_indexes:
+                row[index] = json.dumps(row[index], ensure_ascii=False) if row[index] is not None else ''
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in queryset.iterator(chunk_size=chunk_size):
+            out.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n')
+            count += 1
+    return count
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import QuestionBank, CertificationTest, UserTestAttempt
+from .services import required_correct_answers
 
 class CertificationTestSerializer(serializers.ModelSerializer):
     """Сериализатор для метаданных теста."""
@@ -9,22 +10,22 @@ class CertificationTestSerializer(serializers.ModelSerializer):
         model = CertificationTest
         fields = [
             'id', 'title', 'description', 'number_of_questions', 
-            'passing_score', 'required_correct_answers'
+            'passing_score', 'required_correct_answers', 'is_adaptive', 'duration_minutes', 'cooldown_minutes'
         ]
         
     def get_required_correct_answers(self, obj):
-        import math
-        return math.ceil(obj.number_of_questions * (obj.passing_score / 100))
+        return required_correct_answers(obj)
 
 class TestQuestionSerializer(serializers.ModelSerializer):
     """Сериализатор для отправки вопросов на фронтенд (без правильных ответов)."""
     class Meta:
         model = QuestionBank
-        exclude = ('correct_answer', 'course', 'difficulty')
+        exclude = ('correct_answer', 'course', 'difficulty', 'question_hash', 'test_cases')
 
 class StartTestResponseSerializer(serializers.Serializer):
     """Ответ при начале теста."""
     attempt_id = serializers.IntegerField()
+    expires_at = serializers.DateTimeField(allow_null=True)
     questions = TestQuestionSerializer(many=True)
 
 class SubmitTestAnswerSerializer(serializers.Serializer):
@@ -41,4 +42,19 @@ class TestResultSerializer(serializers.ModelSerializer):
     """Сериализатор для отображения результата."""
     class Meta:
         model = UserTestAttempt
-        fields = ('id', 'score', 'is_passed', 'end_time')
\ No newline at end of file
+        fields = ('id', 'score', 'is_passed', 'end_time')
+
+class AdaptiveAnswerRequestSerializer(serializers.Serializer):
+    """Ответ на текущий вопрос адаптивного теста."""
+    question_id = serializers.IntegerField()
+    answer = serializers.CharField(allow_blank=True, allow_null=True)
+
+class AdaptiveStepSerializer(serializers.Serializer):
+    """Шаг адаптивного теста: следующий вопрос или итог, если попытка завершена."""
+    attempt_id = serializers.IntegerField()
+    answered = serializers.IntegerField()
+    total = serializers.IntegerField()
+    expires_at = serializers.DateTimeField(allow_null=True)
+    finished = serializers.BooleanField()
+    question = TestQuestionSerializer(allow_null=True)
+    result = TestResultSerializer(allow_null=True)
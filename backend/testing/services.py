@@ -0,0 +1,51 @@
+import math
+import random
+from django.core.cache import cache
+from courses.grader import run_test_cases
+from courses.ast_check import canonical_form
+from .models import QuestionBank
+
+QUESTION_BUCKETS_CACHE_TIMEOUT = 60 * 60
+DIFFICULTY_LEVELS = range(1, 6)
+
+def question_buckets_cache_key(course_id): return f'question-buckets:{course_id}'
+
+def get_question_buckets(course_id):
+    """
+    id вопросов банка курса, разложенные по сложности: {сложность: [id, ...]}.
+    Кэшируется; сбрасывается сигналами QuestionBank и импортом (testing.question_io).
+    """
+    key = question_buckets_cache_key(course_id)
+    buckets = cache.get(key)
+    if buckets is None:
+        buckets = {level: [] for level in DIFFICULTY_LEVELS}
+        for question_id, difficulty in QuestionBank.objects.filter(course_id=course_id).order_by('id').values_list('id', 'difficulty'):
+            buckets.setdefault(difficulty, []).append(question_id)
+        cache.set(key, buckets, QUESTION_BUCKETS_CACHE_TIMEOUT)
+    return buckets
+
+def invalidate_question_buckets(*course_ids):
+    cache.delete_many([question_buckets_cache_key(course_id) for course_id in course_ids])
+
+def sample_question_ids(course_id, count):
+    """Случайная выборка count id из банка курса (без загрузки самих вопросов); None, если вопросов мало."""
+    all_ids = [question_id for bucket in get_question_buckets(course_id).values() for question_id in bucket]
+    if len(all_ids) < count:
+        return None
+    return random.sample(all_ids, count)
+
+def required_correct_answers(test):
+    return math.ceil(test.number_of_questions * (test.passing_score / 100))
+
+def is_answer_correct(question, user_answer, execute=True):
+    """Верен ли ответ. execute=False — без запуска харнесса: для кода с тестами None, если AST не совпал."""
+    if not user_answer:
+        return False
+    if question.task_type in ('code', 'constructor'):
+        # Совпадение с эталоном по AST засчитывается без запуска харнесса
+        canonical = canonical_form(question.correct_answer)
+        if canonical is not None and canonical_form(user_answer) == canonical:
+            return True
+    if question.task_type == 'code' and question.test_cases:
+        return run_test_cases(user_answer, question.test_cases)['passed'] if execute else None
+    return str(user_answer).strip().lower() == str(question.correct_answer).strip().lower()
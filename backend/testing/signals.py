@@ -0,0 +1,15 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import QuestionBank, question_hash
+from .services import invalidate_question_buckets
+
+# Хэш считается и при raw-сохранении (loaddata), иначе загруженные фикстуры не находятся как дубликаты
+@receiver(pre_save, sender=QuestionBank, dispatch_uid='question_hash_fill')
+def fill_question_hash(sender, instance, **kwargs):
+    instance.question_hash = question_hash(instance.question)
+
+# Корзины id по сложности (testing.services) зависят от состава банка и сложности вопросов
+@receiver(post_save, sender=QuestionBank, dispatch_uid='question_buckets_saved')
+@receiver(post_delete, sender=QuestionBank, dispatch_uid='question_buckets_deleted')
+def invalidate_course_question_buckets(sender, instance, **kwargs):
+    invalidate_question_buckets(instance.course_id)
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import TestSessionView, TestDetailView
+from .views import TestSessionView, TestDetailView, AdaptiveTestView, AdaptiveAnswerView
 
 urlpatterns = [
     path('details/<int:course_id>/', TestDetailView.as_view(), name='test-details'),
     path('session/', TestSessionView.as_view(), name='test-session'),
+    path('adaptive/', AdaptiveTestView.as_view(), name='test-adaptive'),
+    path('adaptive/<int:attempt_id>/answer/', AdaptiveAnswerView.as_view(), name='test-adaptive-answer'),
 ]
\ No newline at end of file
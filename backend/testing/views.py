@@ -1,15 +1,23 @@
-import random
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions, generics # <-- ИСПРАВЛЕНИЕ ЗДЕСЬ
+import math
+from django.db import transaction
 from django.utils import timezone
 from .models import CertificationTest, QuestionBank, UserTestAttempt
 from .serializers import (
     StartTestResponseSerializer, 
     SubmitTestRequestSerializer,
     TestResultSerializer,
-    CertificationTestSerializer # <-- Теперь этот импорт будет работать
+    CertificationTestSerializer, # <-- Теперь этот импорт будет работать
+    AdaptiveAnswerRequestSerializer,
+    AdaptiveStepSerializer,
 )
+from .services import sample_question_ids, is_answer_correct
+from .analytics import record_answers, record_result
+from .expiry import is_expired, close_expired_attempt
+from .attempts import get_open_attempt, cooldown_until, create_attempt
+from . import adaptive
 
 class TestDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -26,27 +34,36 @@ class TestSessionView(APIView):
             test = CertificationTest.objects.get(course_id=course_id)
         except CertificationTest.DoesNotExist:
             return Response({"error": "Тест для этого курса не найден."}, status=status.HTTP_404_NOT_FOUND)
+        if test.is_adaptive:
+            return Response({"error": "Этот тест проходится в адаптивном режиме."}, status=status.HTTP_400_BAD_REQUEST)
 
-        all_questions = list(QuestionBank.objects.filter(course=test.course))
-        
-        if len(all_questions) < test.number_of_questions:
-             return Response({"error": "В банке недостаточно вопросов для этого теста."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        selected_questions = random.sample(all_questions, test.number_of_questions)
-        
-        question_ids = [q.id for q in selected_questions]
-        
-        attempt = UserTestAttempt.objects.create(
-            user=request.user,
-            test=test,
-            session_data={'questions': question_ids}
-        )
-        
+        # Повторный старт (например, обновление страницы) возвращает открытую попытку с теми же вопросами
+        attempt, created = get_open_attempt(request.user, test), False
+        if attempt is None:
+            retry_at = cooldown_until(request.user, test)
+            if retry_at:
+                return _cooldown_response(retry_at)
+
+            # Выборка делается по закэшированным id, из банка загружаются только выбранные вопросы
+            question_ids = sample_question_ids(test.course_id, test.number_of_questions)
+            
+            if question_ids is None:
+                 return Response({"error": "В банке недостаточно вопросов для этого теста."}, status=status.HTTP_400_BAD_REQUEST)
+            
+            attempt, created = create_attempt(request.user, test, {'questions': question_ids})
+            if attempt is None:
+                return _attempt_conflict_response()
+        if attempt.session_data.get('mode') == 'adaptive':
+            return Response({"error": "Уже есть незавершённая попытка в адаптивном режиме."}, status=status.HTTP_409_CONFLICT)
+
+        question_ids = attempt.session_data.get('questions', [])
+        questions_by_id = QuestionBank.objects.in_bulk(question_ids)
         serializer = StartTestResponseSerializer({
             'attempt_id': attempt.id,
-            'questions': selected_questions
+            'expires_at': attempt.expires_at,
+            'questions': [questions_by_id[question_id] for question_id in question_ids if question_id in questions_by_id]
         })
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
     def put(self, request, *args, **kwargs):
         serializer = SubmitTestRequestSerializer(data=request.data)
@@ -55,30 +72,135 @@ class TestSessionView(APIView):
         attempt_id = serializer.validated_data['attempt_id']
         user_answers = {item['question_id']: item['answer'] for item in serializer.validated_data['answers']}
         
-        try:
-            attempt = UserTestAttempt.objects.get(id=attempt_id, user=request.user)
-        except UserTestAttempt.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        with transaction.atomic():
+            try:
+                attempt = UserTestAttempt.objects.select_for_update().select_related('test').get(id=attempt_id, user=request.user)
+            except UserTestAttempt.DoesNotExist:
+                return Response(status=status.HTTP_404_NOT_FOUND)
 
-        if attempt.end_time:
-            return Response({"error": "Эта попытка уже завершена."}, status=status.HTTP_400_BAD_REQUEST)
+            if attempt.end_time:
+                return Response({"error": "Эта попытка уже завершена."}, status=status.HTTP_400_BAD_REQUEST)
+            if attempt.session_data.get('mode') == 'adaptive':
+                return Response({"error": "Ответы адаптивного теста отправляются по одному."}, status=status.HTTP_400_BAD_REQUEST)
+            if is_expired(attempt):
+                close_expired_attempt(attempt)
+                return _expired_response(attempt)
+                
+            question_ids = attempt.session_data.get('questions', [])
+            questions = QuestionBank.objects.filter(id__in=question_ids)
             
-        question_ids = attempt.session_data.get('questions', [])
-        questions = QuestionBank.objects.filter(id__in=question_ids)
-        
-        correct_answers_count = 0
-        for question in questions:
-            user_answer = user_answers.get(question.id)
-            if user_answer and str(user_answer).strip().lower() == str(question.correct_answer).strip().lower():
-                correct_answers_count += 1
-        
-        score = round((correct_answers_count / len(questions)) * 100) if questions else 0
-        
-        attempt.score = score
-        attempt.is_passed = score >= attempt.test.passing_score
-        attempt.end_time = timezone.now()
-        attempt.session_data['user_answers'] = user_answers
-        attempt.save()
+            graded = [(question.id, user_answers.get(question.id), is_answer_correct(question, user_answers.get(question.id)))
+                      for question in questions]
+            correct_answers_count = sum(1 for _, _, correct in graded if correct)
+            
+            score = round((correct_answers_count / len(graded)) * 100) if graded else 0
+            
+            attempt.score = score
+            attempt.is_passed = score >= attempt.test.passing_score
+            attempt.end_time = timezone.now()
+            attempt.session_data['user_answers'] = user_answers
+            # Вердикты проверки сохраняются: пересборка аналитики не исполняет код повторно
+            attempt.session_data['verdicts'] = {str(question_id): correct for question_id, _, correct in graded}
+            attempt.save()
+            record_answers(attempt, graded, attempt.end_time)
+            record_result(attempt)
         
         result_serializer = TestResultSerializer(attempt)
-        return Response(result_serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(result_serializer.data, status=status.HTTP_200_OK)
+
+
+def _attempt_conflict_response():
+    return Response({"error": "Параллельный запрос успел начать и закрыть попытку. Повторите запрос."},
+                    status=status.HTTP_409_CONFLICT)
+
+def _cooldown_response(retry_at):
+    seconds = max(math.ceil((retry_at - timezone.now()).total_seconds()), 1)
+    return Response({"error": "Новую попытку можно начать позже.", "retry_at": retry_at},
+                    status=status.HTTP_429_TOO_MANY_REQUESTS, headers={'Retry-After': str(seconds)})
+
+def _expired_response(attempt):
+    return Response({"error": "Время на тест истекло.", "result": TestResultSerializer(attempt).data},
+                    status=status.HTTP_400_BAD_REQUEST)
+
+def _adaptive_step(attempt, question=None):
+    session = attempt.session_data
+    finished = attempt.end_time is not None
+    return AdaptiveStepSerializer({
+        'attempt_id': attempt.id,
+        'answered': len(session['answers']),
+        'total': attempt.test.number_of_questions,
+        'expires_at': attempt.expires_at,
+        'finished': finished,
+        'question': None if finished else question,
+        'result': attempt if finished else None,
+    }).data
+
+class AdaptiveTestView(APIView):
+    """Старт адаптивной попытки: возвращает первый вопрос (логика — testing.adaptive)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        course_id = request.data.get('course_id')
+        try:
+            test = CertificationTest.objects.get(course_id=course_id, is_adaptive=True)
+        except (CertificationTest.DoesNotExist, ValueError, TypeError):
+            return Response({"error": "Адаптивный тест для этого курса не найден."}, status=status.HTTP_404_NOT_FOUND)
+
+        attempt, created = get_open_attempt(request.user, test), False
+        if attempt is None:
+            retry_at = cooldown_until(request.user, test)
+            if retry_at:
+                return _cooldown_response(retry_at)
+            session = adaptive.start_session(test)
+            if session is None:
+                return Response({"error": "В банке недостаточно вопросов для этого теста."}, status=status.HTTP_400_BAD_REQUEST)
+            attempt, created = create_attempt(request.user, test, session)
+            if attempt is None:
+                return _attempt_conflict_response()
+        if attempt.session_data.get('mode') != 'adaptive':
+            return Response({"error": "Уже есть незавершённая попытка в обычном режиме."}, status=status.HTTP_409_CONFLICT)
+        question = QuestionBank.objects.filter(id=attempt.session_data['current']).first()
+        return Response(_adaptive_step(attempt, question), status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+class AdaptiveAnswerView(APIView):
+    """Ответ на текущий вопрос адаптивной попытки; в ответе — следующий вопрос или итог."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, attempt_id, *args, **kwargs):
+        serializer = AdaptiveAnswerRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            try:
+                attempt = UserTestAttempt.objects.select_for_update().select_related('test')\
+                    .get(id=attempt_id, user=request.user, session_data__mode='adaptive')
+            except UserTestAttempt.DoesNotExist:
+                return Response(status=status.HTTP_404_NOT_FOUND)
+            if attempt.end_time:
+                return Response({"error": "Эта попытка уже завершена."}, status=status.HTTP_400_BAD_REQUEST)
+            if is_expired(attempt):
+                close_expired_attempt(attempt)
+                return _expired_response(attempt)
+
+            session = attempt.session_data
+            if serializer.validated_data['question_id'] != session['current']:
+                return Response({"error": "Ответ не на текущий вопрос."}, status=status.HTTP_409_CONFLICT)
+            question = QuestionBank.objects.filter(id=session['current']).first()
+            if question is None:
+                # Вопрос удалили из банка во время попытки — выдаём замену той же сложности
+                next_id, session['difficulty'] = adaptive.pick_question(attempt.test.course_id, session['difficulty'], session['questions'])
+                session['current'] = next_id
+                if next_id is None:
+                    adaptive.finish_attempt(attempt)
+                else:
+                    session['questions'].append(next_id)
+            else:
+                answer = serializer.validated_data['answer']
+                next_id, correct = adaptive.submit_answer(attempt, question, answer)
+                record_answers(attempt, [(question.id, answer, correct)])
+            attempt.save()
+            if attempt.end_time:
+                record_result(attempt)
+
+        next_question = QuestionBank.objects.filter(id=next_id).first() if next_id else None
+        return Response(_adaptive_step(attempt, next_question), status=status.HTTP_200_OK)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Friendship # Добавили Friendship
+from config.paginators import EstimatedCountPaginator
+from .models import User, Friendship, PeriodScore # Добавили Friendship
 
 class CustomUserAdmin(UserAdmin):
     list_display = ('email', 'username', 'xp', 'streak', 'is_staff')
@@ -13,6 +14,7 @@ class CustomUserAdmin(UserAdmin):
         ('Important dates', {'fields': ('last_login', 'date_joined')}),
     )
     readonly_fields = ('last_login', 'date_joined')
+    paginator = EstimatedCountPaginator; show_full_result_count = False
 
 admin.site.register(User, CustomUserAdmin)
 
@@ -20,4 +22,13 @@ admin.site.register(User, CustomUserAdmin)
 @admin.register(Friendship)
 class FriendshipAdmin(admin.ModelAdmin):
     list_display = ('from_user', 'to_user', 'status', 'created_at')
-    list_filter = ('status',)
\ No newline at end of file
+    list_filter = ('status',)
+    search_fields = ('from_user__username', 'to_user__username')
+    list_select_related = ('from_user', 'to_user'); autocomplete_fields = ('from_user', 'to_user')
+    paginator = EstimatedCountPaginator; show_full_result_count = False
+
+@admin.register(PeriodScore)
+class PeriodScoreAdmin(admin.ModelAdmin):
+    list_display = ('user', 'period', 'period_start', 'xp'); list_filter = ('period', 'period_start')
+    search_fields = ('user__username', 'user__email'); list_select_related = ('user',); raw_id_fields = ('user',)
+    paginator = EstimatedCountPaginator; show_full_result_count = False
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from .search import ensure_search_index
+
+        def restore_search_index(sender, using, **kwargs):
+            # SQLite теряет триггеры FTS при пересоздании таблицы users_user в миграциях
+            from django.db import connections
+            ensure_search_index(connections[using])
+
+        post_migrate.connect(restore_search_index, sender=self, dispatch_uid='users_restore_search_index')
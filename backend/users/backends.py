@@ -1,25 +1,53 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Lower
+from .ratelimit import LoginAttemptLimiter, get_client_ip
 
 UserModel = get_user_model()
 
 class UsernameOrEmailBackend(ModelBackend):
+    """
+    Вход по email или username одним запросом (без учёта регистра).
+    Заменяет стандартный ModelBackend: при промахе хэширует пароль впустую,
+    чтобы время ответа не выдавало существование аккаунта, а после серии
+    неудачных попыток отказывает, не доходя до проверки пароля.
+    """
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            user = UserModel.objects.get(email=username)
-            if user.check_password(password):
-                return user
-        except UserModel.DoesNotExist:
-            try:
-                user = UserModel.objects.get(username=username)
-                if user.check_password(password):
-                    return user
-            except UserModel.DoesNotExist:
-                return None
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        limiter = LoginAttemptLimiter()
+        ip = get_client_ip(request)
+        if limiter.is_blocked(username, ip):
+            # PermissionDenied останавливает перебор остальных бэкендов
+            raise PermissionDenied
+
+        # Сравнение через Lower(...) совпадает с функциональными индексами модели User;
+        # email уникален, поэтому при совпадении и по email, и по username побеждает email
+        login = username.lower()
+        user = (
+            UserModel.objects
+            .alias(email_lower=Lower('email'), username_lower=Lower('username'))
+            .filter(Q(email_lower=login) | Q(username_lower=login))
+            .alias(by_email=Case(When(email_lower=login, then=Value(0)), default=Value(1)))
+            .order_by('by_email', 'pk')
+            .first()
+        )
+
+        if user is None:
+            UserModel().set_password(password)
+        elif user.check_password(password) and self.user_can_authenticate(user):
+            limiter.reset(username, ip)
+            return user
+        limiter.register_failure(username, ip)
         return None
 
     def get_user(self, user_id):
         try:
             return UserModel.objects.get(pk=user_id)
         except UserModel.DoesNotExist:
-            return None
\ No newline at end of file
+            return None
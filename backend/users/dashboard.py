@@ -0,0 +1,74 @@
+"""
+Сводка главного дашборда: последний курс с процентом прохождения, топ-3 по XP, место пользователя.
+
+Разделы независимы и выполняются одновременно: каждый — в отдельном потоке пула со своим
+соединением с базой (sync_to_async(thread_sensitive=False)). Асинхронные методы ORM (afirst,
+acount) здесь не помогли бы: они выполняются в одном общем потоке и шли бы друг за другом.
+Соединения потоков пула закрываются по тем же правилам, что и в конце запроса
+(close_old_connections, CONN_MAX_AGE). Готовая сводка кэшируется на пользователя
+на DASHBOARD['CACHE_TIMEOUT'] секунд; прохождение урока сбрасывает кэш.
+"""
+import asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from courses.models import Lesson, UserProgress, ActivityEvent
+from .models import User
+from .serializers import UserSerializer
+
+DEFAULT_DASHBOARD = {
+    'CACHE_TIMEOUT': 30,
+}
+
+def get_dashboard_config():
+    return {**DEFAULT_DASHBOARD, **getattr(settings, 'DASHBOARD', {})}
+
+def dashboard_cache_key(user_id): return f'dashboard:{user_id}'
+
+def invalidate_dashboard(user_id):
+    cache.delete(dashboard_cache_key(user_id))
+
+def last_course_section(user):
+    """Последний изучаемый курс (по журналу активности) с процентом пройденных уроков."""
+    course = ActivityEvent.objects.filter(user=user, lesson__isnull=False).order_by('-created_at')\
+        .values('lesson__skill__course_id', 'lesson__skill__course__title', 'lesson__skill__course__image_url').first()
+    if course is None:
+        return None
+    course_id = course['lesson__skill__course_id']
+    total_lessons = Lesson.objects.filter(skill__course_id=course_id).count()
+    completed_lessons = UserProgress.objects.filter(user=user, lesson__skill__course_id=course_id).count()
+    return {
+        'id': course_id,
+        'title': course['lesson__skill__course__title'],
+        'image_url': course['lesson__skill__course__image_url'],
+        'percentage': round((completed_lessons / total_lessons) * 100) if total_lessons > 0 else 0,
+    }
+
+def leaderboard_section(request):
+    return UserSerializer(User.objects.order_by('-xp')[:3], many=True, context={'request': request}).data
+
+def rank_section(user):
+    # Место = число пользователей с большим XP + 1
+    return User.objects.filter(xp__gt=user.xp).count() + 1
+
+def _in_worker(func):
+    def run(*args):
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+async def abuild_dashboard(request, user):
+    key = dashboard_cache_key(user.pk)
+    data = await cache.aget(key)
+    if data is None:
+        last_course, leaderboard, rank = await asyncio.gather(
+            _in_worker(last_course_section)(user),
+            _in_worker(leaderboard_section)(request),
+            _in_worker(rank_section)(user),
+        )
+        data = {'last_course': last_course, 'leaderboard_top': leaderboard, 'user_rank': rank}
+        await cache.aset(key, data, get_dashboard_config()['CACHE_TIMEOUT'])
+    return data
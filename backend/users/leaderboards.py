@@ -0,0 +1,159 @@
+"""
+Таблицы лидеров за неделю и месяц и таблица лидеров среди друзей.
+
+Источник XP — журнал активности (courses.ActivityEvent): record_lesson_activity вместе с событием
+увеличивает строки PeriodScore текущей недели и месяца (границы — по UTC, общие для всех), штраф
+за подсказку (record_hint_penalty) так же уменьшает их, не опуская ниже нуля — как и общий XP.
+Прошедшие периоды остаются в таблице, пока их не удалит rebuild_leaderboard_scores --keep.
+
+Топ-N периода кэшируется списком [(user_id, xp)] и обновляется на месте при каждом начислении,
+без перечитывания таблицы; если штраф опустил участника заполненного топа, его место может
+занять кто-то снаружи, и топ перечитывается. Кэш локален для процесса, поэтому у него короткий
+TTL — это предел отставания топа в остальных процессах. Место пользователя — COUNT(xp > его xp) + 1 по индексу.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+from courses.models import ActivityEvent
+from .models import User, Friendship, PeriodScore
+
+DEFAULT_LEADERBOARDS = {
+    'TOP_SIZE': 100,
+    'CACHE_TIMEOUT': 60,
+    'KEEP_PERIODS': 12,     # сколько прошедших периодов хранить
+}
+PERIODS = tuple(PeriodScore.Period.values)
+
+def get_leaderboard_config():
+    return {**DEFAULT_LEADERBOARDS, **getattr(settings, 'LEADERBOARDS', {})}
+
+def period_start(period, when=None):
+    day = timezone.localtime(when or timezone.now(), dt_timezone.utc).date()
+    if period == PeriodScore.Period.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+def shift_period(period, start, count):
+    """Начало периода, отстоящего от start на count периодов (count < 0 — в прошлое)."""
+    if period == PeriodScore.Period.WEEK:
+        return start + timedelta(weeks=count)
+    months = start.year * 12 + start.month - 1 + count
+    return start.replace(year=months // 12, month=months % 12 + 1)
+
+def top_cache_key(period, start): return f'leaderboard:{period}:{start.isoformat()}'
+
+# --- Начисление ---
+
+def _bump_score(user_id, period, start, xp):
+    scores = PeriodScore.objects.filter(period=period, period_start=start, user_id=user_id)
+    if xp < 0:
+        scores.update(xp=Greatest(F('xp') + xp, Value(0)))  # без строки за период списывать нечего
+        return
+    if scores.update(xp=F('xp') + xp):
+        return
+    try:
+        with transaction.atomic():
+            PeriodScore.objects.create(period=period, period_start=start, user_id=user_id, xp=xp)
+    except IntegrityError:
+        scores.update(xp=F('xp') + xp)  # параллельный запрос успел создать строку
+
+def record_xp(user_id, xp, when=None):
+    """Начисляет (xp < 0 — списывает) XP в текущие неделю и месяц; кэшированные топы обновляются после коммита."""
+    if not xp:
+        return
+    when = when or timezone.now()
+    for period in PERIODS:
+        start = period_start(period, when)
+        _bump_score(user_id, period, start, xp)
+        transaction.on_commit(lambda period=period, start=start: _refresh_cached_top(period, start, user_id))
+
+def _refresh_cached_top(period, start, user_id):
+    key = top_cache_key(period, start)
+    top = cache.get(key)
+    if top is None:
+        return
+    xp = PeriodScore.objects.filter(period=period, period_start=start, user_id=user_id).values_list('xp', flat=True).first()
+    if xp is None:
+        return
+    size = get_leaderboard_config()['TOP_SIZE']
+    previous = next((entry[1] for entry in top if entry[0] == user_id), None)
+    if previous is not None and xp < previous and len(top) >= size:
+        cache.delete(key)  # после штрафа участника может обогнать кто-то за пределами топа
+        return
+    others = [entry for entry in top if entry[0] != user_id]
+    # Незаполненный топ содержит всех с XP > 0; в заполненный попадает только обогнавший последнее место
+    if xp > 0 and (len(others) < size or xp > others[-1][1]):
+        others.append((user_id, xp))
+        others.sort(key=lambda entry: (-entry[1], entry[0]))
+    elif previous is None:
+        return
+    cache.set(key, others[:size], get_leaderboard_config()['CACHE_TIMEOUT'])
+
+# --- Чтение ---
+
+def get_period_top(period, start):
+    """[(user_id, xp)] первых TOP_SIZE мест периода."""
+    key = top_cache_key(period, start)
+    top = cache.get(key)
+    if top is None:
+        config = get_leaderboard_config()
+        top = list(PeriodScore.objects.filter(period=period, period_start=start, xp__gt=0)
+                   .order_by('-xp', 'user_id').values_list('user_id', 'xp')[:config['TOP_SIZE']])
+        cache.set(key, top, config['CACHE_TIMEOUT'])
+    return top
+
+def get_period_rank(user, period, start):
+    """(место, xp) пользователя за период; без очков — место после всех набравших XP."""
+    scores = PeriodScore.objects.filter(period=period, period_start=start)
+    xp = scores.filter(user=user).values_list('xp', flat=True).first() or 0
+    return scores.filter(xp__gt=xp).count() + 1, xp
+
+def friends_leaderboard(user, period=None):
+    """
+    Пользователь и его друзья (принятые заявки в обе стороны), упорядоченные по XP —
+    общему или за текущий период. Один запрос; каждому объекту добавляется score.
+    """
+    friend_ids = Friendship.objects.filter(status=Friendship.Status.ACCEPTED)\
+        .filter(Q(from_user=user) | Q(to_user=user))
+    members = User.objects.filter(
+        Q(pk=user.pk) | Q(pk__in=friend_ids.filter(from_user=user).values('to_user_id'))
+        | Q(pk__in=friend_ids.filter(to_user=user).values('from_user_id'))
+    ).only('id', 'username', 'avatar', 'xp')
+    if period is None:
+        score = F('xp')
+    else:
+        period_xp = PeriodScore.objects.filter(period=period, period_start=period_start(period), user_id=OuterRef('pk'))
+        score = Coalesce(Subquery(period_xp.values('xp')[:1]), Value(0))
+    return members.annotate(score=score).order_by('-score', 'id')
+
+# --- Пересчёт ---
+
+def rebuild_period_scores(periods_back=0, keep=None):
+    """
+    Пересчитывает очки текущего и periods_back прошедших периодов из журнала ActivityEvent;
+    keep — удалить строки периодов старше keep прошедших.
+    """
+    with transaction.atomic():
+        for period in PERIODS:
+            current = period_start(period)
+            oldest = shift_period(period, current, -periods_back)
+            since = datetime.combine(oldest, time.min, tzinfo=dt_timezone.utc)
+            PeriodScore.objects.filter(period=period, period_start__gte=oldest).delete()
+            totals = {}
+            rows = ActivityEvent.objects.filter(created_at__gte=since).exclude(xp=0)\
+                .annotate(day=TruncDate('created_at', tzinfo=dt_timezone.utc)).values('user_id', 'day')\
+                .annotate(xp=Sum('xp')).order_by()
+            for row in rows.iterator():
+                key = (row['user_id'], period_start(period, datetime.combine(row['day'], time.min, tzinfo=dt_timezone.utc)))
+                totals[key] = totals.get(key, 0) + row['xp']
+            PeriodScore.objects.bulk_create([
+                PeriodScore(user_id=user_id, period=period, period_start=start, xp=xp)
+                for (user_id, start), xp in totals.items() if xp > 0
+            ], batch_size=1000)
+            if keep is not None:
+                PeriodScore.objects.filter(period=period, period_start__lt=shift_period(period, current, -keep)).delete()
+            cache.delete_many([top_cache_key(period, shift_period(period, current, -offset)) for offset in range(periods_back + 1)])
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from users.leaderboards import rebuild_period_scores, get_leaderboard_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает очки недельных и месячных таблиц лидеров (PeriodScore) из журнала ActivityEvent "
+        "и удаляет устаревшие периоды. Запускать после развёртывания и периодически (cron) для очистки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--periods-back', type=int, default=0, help="Сколько прошедших периодов пересчитать вместе с текущим")
+        parser.add_argument('--keep', type=int, default=None, help="Сколько прошедших периодов хранить (по умолчанию LEADERBOARDS['KEEP_PERIODS'])")
+
+    def handle(self, *args, **options):
+        keep = options['keep'] if options['keep'] is not None else get_leaderboard_config()['KEEP_PERIODS']
+        rebuild_period_scores(periods_back=options['periods_back'], keep=keep)
+        self.stdout.write(self.style.SUCCESS("Очки таблиц лидеров пересчитаны."))
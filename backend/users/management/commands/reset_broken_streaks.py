@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from users.streaks import reset_broken_streaks
+
+
+class Command(BaseCommand):
+    help = (
+        "Обнуляет серии пользователей, пропустивших день по своему часовому поясу. "
+        "Полночь в разных поясах наступает в разное время, поэтому запускать ежечасно (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        total = reset_broken_streaks(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Сброшено серий: {total}"))
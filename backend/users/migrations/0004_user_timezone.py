@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:50
+
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0003_user_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='timezone',
+            field=models.CharField(default='UTC', max_length=63, validators=[users.models.validate_timezone], verbose_name='Часовой пояс'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('streak__gt', 0)), fields=['timezone', 'last_activity_date'], name='user_active_streak_idx'),
+        ),
+    ]
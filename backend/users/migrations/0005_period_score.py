@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-19 12:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_timezone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Неделя'), ('month', 'Месяц')], max_length=5, verbose_name='Период')),
+                ('period_start', models.DateField(verbose_name='Начало периода')),
+                ('xp', models.PositiveIntegerField(default=0, verbose_name='XP за период')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='period_scores', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Очки за период',
+                'verbose_name_plural': 'Очки за периоды',
+                'indexes': [models.Index(fields=['period', 'period_start', '-xp'], name='period_score_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('period', 'period_start', 'user'), name='period_score_uniq')],
+            },
+        ),
+    ]
@@ -2,6 +2,14 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from django.conf import settings # Добавим импорт settings
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.core.exceptions import ValidationError
+from zoneinfo import available_timezones
+
+def validate_timezone(value):
+    if value not in available_timezones():
+        raise ValidationError(f"Неизвестный часовой пояс: {value}")
 
 class User(AbstractUser):
     email = models.EmailField(unique=True)
@@ -9,10 +17,20 @@ class User(AbstractUser):
     xp = models.PositiveIntegerField(default=0)
     streak = models.PositiveIntegerField(default=0)
     last_activity_date = models.DateField(null=True, blank=True, verbose_name="Дата последней активности")
+    timezone = models.CharField(max_length=63, default='UTC', validators=[validate_timezone], verbose_name="Часовой пояс")
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    class Meta(AbstractUser.Meta):
+        # Индексы под вход по email/username без учёта регистра (см. UsernameOrEmailBackend)
+        indexes = [
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            # Ночной сброс серий просматривает только пользователей с активной серией
+            models.Index(fields=['timezone', 'last_activity_date'], condition=Q(streak__gt=0), name='user_active_streak_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -51,4 +69,25 @@ class Friendship(models.Model):
         verbose_name_plural = "Дружбы"
     
     def __str__(self):
-        return f"Запрос от {self.from_user} к {self.to_user} ({self.status})"
\ No newline at end of file
+        return f"Запрос от {self.from_user} к {self.to_user} ({self.status})"
+class PeriodScore(models.Model):
+    """XP пользователя за неделю/месяц (UTC) — строки периодических таблиц лидеров (users.leaderboards)."""
+
+    class Period(models.TextChoices):
+        WEEK = 'week', 'Неделя'
+        MONTH = 'month', 'Месяц'
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='period_scores', verbose_name="Пользователь")
+    period = models.CharField(max_length=5, choices=Period.choices, verbose_name="Период")
+    period_start = models.DateField(verbose_name="Начало периода")
+    xp = models.PositiveIntegerField(default=0, verbose_name="XP за период")
+
+    class Meta:
+        verbose_name = "Очки за период"
+        verbose_name_plural = "Очки за периоды"
+        constraints = [models.UniqueConstraint(fields=['period', 'period_start', 'user'], name='period_score_uniq')]
+        # Топ периода и место пользователя (COUNT по xp > N) читаются по этому индексу
+        indexes = [models.Index(fields=['period', 'period_start', '-xp'], name='period_score_rank_idx')]
+
+    def __str__(self):
+        return f"{self.user_id} {self.period} {self.period_start}: {self.xp}"
@@ -0,0 +1,72 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_LOGIN_RATE_LIMIT = {
+    # Отдельный алиас: в общем кэше перебор по множеству логинов вытеснял бы собственные счётчики
+    'CACHE': 'login-attempts',
+    'MAX_ATTEMPTS': 10,  # неудачных попыток на окно
+    'WINDOW': 300,       # длина окна в секундах
+    # Сколько обратных прокси стоит перед приложением. 0 — X-Forwarded-For не читается вовсе:
+    # иначе клиент подставил бы туда любой адрес и обошёл счётчик по IP
+    'TRUSTED_PROXIES': 0,
+}
+
+def get_login_rate_limit_config():
+    return {**DEFAULT_LOGIN_RATE_LIMIT, **getattr(settings, 'LOGIN_RATE_LIMIT', {})}
+
+class LoginAttemptLimiter:
+    """
+    Ограничитель неудачных попыток входа (фиксированное окно в локальном кэше).
+    Счётчики ведутся отдельно по логину и по IP, чтобы перебор паролей
+    к одному аккаунту и массовый перебор с одного адреса отсекались
+    до дорогого хэширования пароля (PBKDF2). Неудачная попытка заводит до двух
+    ключей на WINDOW секунд — под это и считается MAX_ENTRIES кэша.
+    """
+    key_prefix = 'login-attempts'
+
+    def __init__(self):
+        config = get_login_rate_limit_config()
+        self.cache = caches[config['CACHE']]
+        self.max_attempts = config['MAX_ATTEMPTS']
+        self.window = config['WINDOW']
+
+    def _keys(self, identifier, ip):
+        keys = []
+        if identifier:
+            digest = hashlib.sha256(str(identifier).strip().lower().encode()).hexdigest()
+            keys.append(f'{self.key_prefix}:id:{digest}')
+        if ip:
+            keys.append(f'{self.key_prefix}:ip:{ip}')
+        return keys
+
+    def is_blocked(self, identifier, ip):
+        counters = self.cache.get_many(self._keys(identifier, ip))
+        return any(count >= self.max_attempts for count in counters.values())
+
+    def register_failure(self, identifier, ip):
+        for key in self._keys(identifier, ip):
+            # add() заводит счётчик вместе с TTL окна, incr() его не продлевает
+            if not self.cache.add(key, 1, self.window):
+                try:
+                    self.cache.incr(key)
+                except ValueError:
+                    self.cache.set(key, 1, self.window)
+
+    def reset(self, identifier, ip):
+        self.cache.delete_many(self._keys(identifier, ip))
+
+def get_client_ip(request):
+    """
+    IP клиента. За TRUSTED_PROXIES прокси адрес клиента — N-й справа в X-Forwarded-For
+    (его дописал первый доверенный прокси); левее — то, что прислал сам клиент, и этому не верим.
+    """
+    if request is None:
+        return None
+    trusted = get_login_rate_limit_config()['TRUSTED_PROXIES']
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if trusted and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        if len(addresses) >= trusted:
+            return addresses[-trusted]
+    return request.META.get('REMOTE_ADDR')
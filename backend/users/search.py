@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+
+DEFAULT_USER_SEARCH = {
+    'MIN_QUERY_LENGTH': 3,  # меньше трёх символов триграммный индекс не помогает
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 50,
+}
+
+def get_search_config():
+    return {**DEFAULT_USER_SEARCH, **getattr(settings, 'USER_SEARCH', {})}
+
+# --- Индексы ---
+
+SQLITE_FTS_TABLE = 'users_user_fts'
+
+SQLITE_FTS_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        username, email, content='users_user', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON users_user BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON users_user BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, username, email) VALUES ('delete', old.id, old.username, old.email);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF username, email ON users_user BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, username, email) VALUES ('delete', old.id, old.username, old.email);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+]
+
+POSTGRES_TRGM_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS users_user_username_trgm_idx ON users_user USING gin (lower(username) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS users_user_email_trgm_idx ON users_user USING gin (lower(email) gin_trgm_ops)",
+]
+
+def ensure_search_index(conn=None):
+    """
+    Создаёт поисковый индекс пользователей, если его ещё нет.
+    SQLite при пересоздании таблицы в миграциях теряет триггеры,
+    поэтому функция идемпотентна и вызывается также после каждого migrate.
+    """
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            for sql in POSTGRES_TRGM_SQL:
+                cursor.execute(sql)
+        elif conn.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f'{SQLITE_FTS_TABLE}_a%'],
+            )
+            triggers_missing = cursor.fetchone()[0] < 3
+            for sql in SQLITE_FTS_SQL:
+                cursor.execute(sql)
+            if triggers_missing:
+                cursor.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+def drop_search_index(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            cursor.execute("DROP INDEX IF EXISTS users_user_username_trgm_idx")
+            cursor.execute("DROP INDEX IF EXISTS users_user_email_trgm_idx")
+        elif conn.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
+
+# --- Поиск ---
+
+def _match_rank(query):
+    """Точное совпадение username выше префиксного, префиксное выше вхождения."""
+    return Case(
+        When(username_lower=query, then=Value(0)),
+        When(username_lower__startswith=query, then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+
+def _fts_phrase(query):
+    return '"' + query.replace('"', '""') + '"'
+
+def search_users(queryset, query):
+    """
+    Возвращает queryset пользователей, подходящих под запрос, упорядоченный по релевантности.
+    PostgreSQL: LIKE по lower(username/email) через GIN-индексы pg_trgm + similarity.
+    SQLite: FTS5-таблица с триграммным токенизатором + bm25.
+    Иначе: префиксный поиск по функциональному индексу Lower(username).
+    """
+    query = query.strip().lower()
+    queryset = queryset.alias(username_lower=Lower('username'), email_lower=Lower('email'))
+    vendor = connection.vendor
+
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+        return queryset.filter(
+            Q(username_lower__contains=query) | Q(email_lower__contains=query)
+        ).annotate(
+            match_rank=_match_rank(query),
+            similarity=TrigramSimilarity(Lower('username'), query),
+        ).order_by('match_rank', '-similarity', 'id')
+
+    if vendor == 'sqlite':
+        table = SQLITE_FTS_TABLE
+        phrase = _fts_phrase(query)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [phrase])
+        ).annotate(
+            match_rank=_match_rank(query),
+            # bm25 в FTS5 отрицателен: чем меньше, тем релевантнее; username весит больше email
+            fts_rank=RawSQL(
+                f"SELECT bm25({table}, 10.0, 1.0) FROM {table} WHERE {table} MATCH %s AND rowid = users_user.id",
+                [phrase], output_field=FloatField(),
+            ),
+        ).order_by('match_rank', 'fts_rank', 'id')
+
+    return queryset.filter(
+        Q(username_lower__startswith=query) | Q(email_lower=query)
+    ).annotate(match_rank=_match_rank(query)).order_by('match_rank', 'username_lower', 'id')
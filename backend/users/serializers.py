@@ -2,8 +2,9 @@ from rest_framework import serializers
 from djoser.serializers import UserCreateSerializer as BaseUserCreateSerializer
 from djoser.serializers import UserSerializer as BaseUserSerializer
 from .models import User, Friendship
-from courses.models import UserProgress # Импортируем UserProgress
+from courses.progress import get_progress_bitmaps, completed_lesson_ids
 from courses.serializers import UserBadgeSerializer
+from .streaks import current_streak
 from django.db.models import Q
 
 class UserCreateSerializer(BaseUserCreateSerializer):
@@ -17,6 +18,9 @@ class FriendSerializer(serializers.ModelSerializer):
         model = User
         fields = ('id', 'username', 'avatar', 'xp', 'friendship_status')
     def get_friendship_status(self, obj):
+        # Списочные представления заранее считают статусы одним запросом (users.services.get_friendship_statuses)
+        statuses = self.context.get('friendship_statuses')
+        if statuses is not None and obj.id in statuses: return statuses[obj.id]
         request_user = self.context.get('request').user
         if not request_user or not request_user.is_authenticated or request_user == obj: return 'self'
         friendship = Friendship.objects.filter((Q(from_user=request_user, to_user=obj) | Q(from_user=obj, to_user=request_user))).first()
@@ -27,11 +31,21 @@ class FriendSerializer(serializers.ModelSerializer):
             else: return 'request_received'
         return 'not_friends'
 
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Строка периодической/дружеской таблицы лидеров: xp — очки таблицы (score), rank — место."""
+    rank = serializers.IntegerField(read_only=True)
+    xp = serializers.IntegerField(source='score', read_only=True)
+    class Meta:
+        model = User
+        fields = ('rank', 'id', 'username', 'avatar', 'xp')
+
 class UserProfileSerializer(serializers.ModelSerializer):
     user_badges = UserBadgeSerializer(many=True, read_only=True)
     friends_count = serializers.SerializerMethodField()
     friendship_status = serializers.SerializerMethodField()
     completed_lessons_ids = serializers.SerializerMethodField() # Новое поле
+    # Серия с учётом пропущенных дней: ночной сброс (reset_broken_streaks) мог ещё не отработать
+    streak = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -54,15 +68,22 @@ class UserProfileSerializer(serializers.ModelSerializer):
             else: return 'request_received'
         return 'not_friends'
 
+    def get_streak(self, obj):
+        return current_streak(obj)
+
     def get_completed_lessons_ids(self, obj):
-        return UserProgress.objects.filter(user=obj).values_list('lesson_id', flat=True)
+        # Из закэшированной битовой карты, без выборки всех строк UserProgress
+        return completed_lesson_ids(get_progress_bitmaps(obj.id))
 
 class UserSerializer(BaseUserSerializer):
     user_badges = UserBadgeSerializer(many=True, read_only=True)
     friends = serializers.SerializerMethodField()
+    streak = serializers.SerializerMethodField()
     class Meta(BaseUserSerializer.Meta):
         model = User
-        fields = ('id', 'email', 'username', 'avatar', 'xp', 'streak', 'last_activity_date', 'user_badges', 'friends')
+        fields = ('id', 'email', 'username', 'avatar', 'xp', 'streak', 'last_activity_date', 'timezone', 'user_badges', 'friends')
+    def get_streak(self, obj):
+        return current_streak(obj)
     def get_friends(self, obj):
         accepted_friendships = Friendship.objects.filter((Q(from_user=obj) | Q(to_user=obj)) & Q(status=Friendship.Status.ACCEPTED))
         friend_ids = [f.from_user.id if f.to_user.id == obj.id else f.to_user.id for f in accepted_friendships]
@@ -0,0 +1,24 @@
+from django.db.models import Q
+from .models import Friendship
+
+def get_friendship_statuses(request_user, users):
+    """
+    Статусы дружбы request_user со списком пользователей одним запросом.
+    Значения совпадают с FriendSerializer.get_friendship_status.
+    """
+    user_ids = [u.id for u in users]
+    statuses = {user_id: 'not_friends' for user_id in user_ids}
+    if request_user.id in statuses:
+        statuses[request_user.id] = 'self'
+    friendships = Friendship.objects.filter(
+        Q(from_user=request_user, to_user_id__in=user_ids) | Q(from_user_id__in=user_ids, to_user=request_user)
+    ).values_list('from_user_id', 'to_user_id', 'status')
+    for from_user_id, to_user_id, friendship_status in friendships:
+        other_id = to_user_id if from_user_id == request_user.id else from_user_id
+        if other_id == request_user.id:
+            continue
+        if friendship_status == Friendship.Status.ACCEPTED:
+            statuses[other_id] = 'friends'
+        elif friendship_status == Friendship.Status.PENDING:
+            statuses[other_id] = 'request_sent' if from_user_id == request_user.id else 'request_received'
+    return statuses
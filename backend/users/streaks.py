@@ -0,0 +1,65 @@
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.db.models import Q
+from django.utils import timezone
+from .models import User
+
+def safe_zone(tz_name):
+    try:
+        return ZoneInfo(tz_name or 'UTC')
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo('UTC')
+
+def get_user_timezone(user):
+    return safe_zone(user.timezone)
+
+def user_local_date(user, when=None):
+    """Календарная дата в часовом поясе пользователя (по ней считаются серии и дневная активность)."""
+    return timezone.localtime(when or timezone.now(), get_user_timezone(user)).date()
+
+def register_activity(user, when=None):
+    """
+    Обновляет серию дней (streak) и дату последней активности на экземпляре пользователя.
+    Сохранение — на вызывающей стороне. Возвращает True, если поля изменились.
+    """
+    today = user_local_date(user, when)
+    last = user.last_activity_date
+    if last == today:
+        return False
+    user.streak = user.streak + 1 if last == today - timedelta(days=1) else 1
+    user.last_activity_date = today
+    return True
+
+def current_streak(user, when=None):
+    """Серия с учётом пропущенных дней, даже если ночной сброс ещё не отработал."""
+    last = user.last_activity_date
+    if last is None or last < user_local_date(user, when) - timedelta(days=1):
+        return 0
+    return user.streak
+
+def reset_broken_streaks(batch_size=5000, now=None):
+    """
+    Обнуляет серии пользователей, пропустивших вчерашний (по их часовому поясу) день.
+    В любой момент локальные даты часовых поясов различаются не больше чем на три значения,
+    поэтому условие сводится к нескольким диапазонам по дате, а сброс идёт пачками UPDATE ... WHERE id IN (...).
+    Возвращает число обнулённых серий.
+    """
+    now = now or timezone.now()
+    cutoffs = {}
+    for tz_name in User.objects.filter(streak__gt=0).values_list('timezone', flat=True).distinct().order_by():
+        cutoff = timezone.localtime(now, safe_zone(tz_name)).date() - timedelta(days=1)
+        cutoffs.setdefault(cutoff, []).append(tz_name)
+    if not cutoffs:
+        return 0
+
+    condition = Q()
+    for cutoff, tz_names in cutoffs.items():
+        condition |= Q(timezone__in=tz_names) & (Q(last_activity_date__lt=cutoff) | Q(last_activity_date__isnull=True))
+
+    total = 0
+    broken = User.objects.filter(condition, streak__gt=0)
+    while True:
+        ids = list(broken.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return total
+        total += User.objects.filter(id__in=ids).update(streak=0)
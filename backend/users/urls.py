@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import LeaderboardView, FriendshipViewSet, UserSearchView, UserProfileView, UserStatsView, DashboardView # <-- Импорт
+from .views import LeaderboardView, FriendshipViewSet, UserSearchView, UserProfileView, UserStatsView, DashboardView, UserProgressBitmapView, PeriodLeaderboardView, FriendsLeaderboardView # <-- Импорт
 
 router = DefaultRouter()
 router.register(r'friendship', FriendshipViewSet, basename='friendship')
@@ -10,8 +10,11 @@ urlpatterns = [
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
     
     path('me/stats/', UserStatsView.as_view(), name='user-stats'),
+    path('me/progress/', UserProgressBitmapView.as_view(), name='user-progress'),
     path('<int:id>/', UserProfileView.as_view(), name='user-profile'),
     path('search/', UserSearchView.as_view(), name='user-search'),
     path('leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
+    path('leaderboard/friends/', FriendsLeaderboardView.as_view(), name='leaderboard-friends'),
+    path('leaderboard/<str:period>/', PeriodLeaderboardView.as_view(), name='leaderboard-period'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
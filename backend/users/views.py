@@ -6,22 +6,51 @@ from rest_framework.response import Response
 from django.db.models import Count, Sum, Q
 from .models import User, Friendship
 from courses.models import Course, UserProgress, Lesson
-from .serializers import UserSerializer, FriendshipSerializer, FriendSerializer, UserProfileSerializer
+from courses.activity import get_heatmap
+from .serializers import UserSerializer, FriendshipSerializer, FriendSerializer, UserProfileSerializer, LeaderboardEntrySerializer
 from django.shortcuts import get_object_or_404
-from rest_framework.filters import SearchFilter
-from datetime import date, timedelta
+from rest_framework.pagination import PageNumberPagination
+from .search import search_users, get_search_config
+from .services import get_friendship_statuses
+from courses.progress import get_progress_bitmaps, encode_bitmaps
+from config.throttling import FriendRequestThrottle
+from config.renderers import FastJSONRenderer
+from .dashboard import abuild_dashboard
+from .leaderboards import PERIODS, period_start, get_period_top, get_period_rank, friends_leaderboard
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated, NotFound
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+class UserSearchPagination(PageNumberPagination):
+    page_size = get_search_config()['PAGE_SIZE']
+    page_size_query_param = 'page_size'
+    max_page_size = get_search_config()['MAX_PAGE_SIZE']
 
 class UserSearchView(generics.ListAPIView):
     """
     Представление для поиска пользователей по имени (username) и почте (email).
+    Поиск идёт по индексу (pg_trgm / SQLite FTS5, см. users.search), результаты
+    ранжируются и отдаются постранично; слишком короткие запросы возвращают пустой список.
     """
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = FriendSerializer 
-    filter_backends = [SearchFilter]
-    search_fields = ['username', 'email']
+    pagination_class = UserSearchPagination
 
     def get_queryset(self):
-        return User.objects.exclude(id=self.request.user.id)
+        query = self.request.query_params.get('search', '').strip()
+        if len(query) < get_search_config()['MIN_QUERY_LENGTH']:
+            return User.objects.none()
+        queryset = User.objects.exclude(id=self.request.user.id).only('id', 'username', 'avatar', 'xp')
+        return search_users(queryset, query)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        context = self.get_serializer_context()
+        context['friendship_statuses'] = get_friendship_statuses(request.user, page)
+        serializer = self.get_serializer_class()(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
     
     def get_serializer_context(self):
         return {'request': self.request}
@@ -48,6 +77,55 @@ class LeaderboardView(generics.ListAPIView):
     def get_queryset(self):
         return User.objects.order_by('-xp')[:100]
 
+def _with_ranks(users):
+    """Проставляет места (одинаковые очки — одно место) пользователям, упорядоченным по score."""
+    previous, rank = None, 0
+    for position, user in enumerate(users, start=1):
+        if user.score != previous:
+            previous, rank = user.score, position
+        user.rank = rank
+    return users
+
+class PeriodLeaderboardView(APIView):
+    """Таблица лидеров текущей недели или месяца (users.leaderboards) и место пользователя в ней."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, period, *args, **kwargs):
+        if period not in PERIODS:
+            raise NotFound()
+        start = period_start(period)
+        top = get_period_top(period, start)
+        users = User.objects.only('id', 'username', 'avatar').in_bulk([user_id for user_id, _ in top])
+        entries = []
+        for user_id, xp in top:
+            user = users.get(user_id)
+            if user is not None:
+                user.score = xp
+                entries.append(user)
+        rank, xp = get_period_rank(request.user, period, start)
+        return Response({
+            'period': period,
+            'period_start': start,
+            'results': LeaderboardEntrySerializer(_with_ranks(entries), many=True, context={'request': request}).data,
+            'me': {'rank': rank, 'xp': xp},
+        })
+
+class FriendsLeaderboardView(APIView):
+    """Таблица лидеров среди друзей: ?period=week|month — за текущий период, иначе по общему XP."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        period = request.query_params.get('period') or None
+        if period is not None and period not in PERIODS:
+            return Response({'error': f"period must be one of: {', '.join(PERIODS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        entries = _with_ranks(list(friends_leaderboard(request.user, period)))
+        me = next(entry for entry in entries if entry.pk == request.user.pk)
+        return Response({
+            'period': period or 'all',
+            'results': LeaderboardEntrySerializer(entries, many=True, context={'request': request}).data,
+            'me': {'rank': me.rank, 'xp': me.score},
+        })
+
 class UserStatsView(APIView):
     """
     Представление для получения агрегированной статистики пользователя.
@@ -65,14 +143,8 @@ class UserStatsView(APIView):
         
         radar_data = [{'name': item['lesson__skill__course__title'], 'value': item['total_xp']} for item in radar_stats]
 
-        # 2. Статистика активности (Heatmap)
-        one_year_ago = date.today() - timedelta(days=365)
-        activity_stats = UserProgress.objects.filter(user=user, completed_at__date__gte=one_year_ago)\
-            .values('completed_at__date')\
-            .annotate(lessons_completed=Count('id'))\
-            .order_by('completed_at__date')
-
-        heatmap_data = [[item['completed_at__date'].strftime('%Y-%m-%d'), item['lessons_completed']] for item in activity_stats]
+        # 2. Статистика активности (Heatmap) — из дневных сводок, повторы уроков тоже учитываются
+        heatmap_data = get_heatmap(user)
 
         # 3. Прогресс по курсам (Progress Bar)
         started_course_ids = UserProgress.objects.filter(user=user)\
@@ -107,45 +179,47 @@ class UserStatsView(APIView):
             'courses_progress': progress_data
         })
 
-class DashboardView(APIView):
+class UserProgressBitmapView(APIView):
     """
-    Представление для получения сводной информации для главного дашборда.
+    Компактный прогресс текущего пользователя: битовая карта пройденных уроков по курсам
+    (см. courses.progress.encode_bitmaps). Клиент накладывает её на оглавление курса.
+    Необязательный параметр course ограничивает ответ одним курсом.
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        user = request.user
-        
-        # 1. Последний изучаемый курс
-        last_progress = UserProgress.objects.filter(user=user).order_by('-completed_at').first()
-        last_course_data = None
-        if last_progress:
-            course = last_progress.lesson.skill.course
-            total_lessons = Lesson.objects.filter(skill__course=course).count()
-            completed_lessons = UserProgress.objects.filter(user=user, lesson__skill__course=course).count()
-            percentage = round((completed_lessons / total_lessons) * 100) if total_lessons > 0 else 0
-            
-            last_course_data = {
-                'id': course.id,
-                'title': course.title,
-                'image_url': course.image_url,
-                'percentage': percentage
-            }
-            
-        # 2. Мини-таблица лидеров (топ-3)
-        top_3_users = User.objects.order_by('-xp')[:3]
-        leaderboard_data = UserSerializer(top_3_users, many=True, context={'request': request}).data
-        
-        # 3. Место текущего пользователя
-        # Находим всех пользователей с XP больше, чем у нашего, и прибавляем 1
-        higher_rank_count = User.objects.filter(xp__gt=user.xp).count()
-        user_rank = higher_rank_count + 1
+        bitmaps = get_progress_bitmaps(request.user.id)
+        course_id = request.query_params.get('course')
+        if course_id:
+            if not course_id.isdigit():
+                return Response({'error': 'course must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+            bitmaps = {int(course_id): bitmaps[int(course_id)]} if int(course_id) in bitmaps else {}
+        return Response({'courses': encode_bitmaps(bitmaps)})
 
-        return Response({
-            'last_course': last_course_data,
-            'leaderboard_top': leaderboard_data,
-            'user_rank': user_rank
-        })
+class DashboardView(View):
+    """
+    Сводная информация для главного дашборда (users.dashboard).
+    Асинхронное представление: разделы сводки запрашиваются параллельно. Вне DRF, поэтому
+    JWT проверяется здесь же, а ответ рендерится тем же FastJSONRenderer.
+    """
+    async def get(self, request, *args, **kwargs):
+        try:
+            auth = await sync_to_async(JWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as exc:
+            # simplejwt отдаёт detail словарём (detail, code, messages) — его не оборачиваем повторно
+            detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+            return self.json(detail, status.HTTP_401_UNAUTHORIZED)
+        if auth is None:
+            return self.json({'detail': NotAuthenticated.default_detail}, status.HTTP_401_UNAUTHORIZED)
+        user, _ = auth
+        return self.json(await abuild_dashboard(request, user))
+
+    @staticmethod
+    def json(data, status_code=status.HTTP_200_OK):
+        response = HttpResponse(FastJSONRenderer().render(data), content_type='application/json', status=status_code)
+        if status_code == status.HTTP_401_UNAUTHORIZED:
+            response['WWW-Authenticate'] = JWTAuthentication().authenticate_header(None)
+        return response
 
 class FriendshipViewSet(viewsets.GenericViewSet):
     """ViewSet для управления запросами в друзья."""
@@ -162,7 +236,7 @@ class FriendshipViewSet(viewsets.GenericViewSet):
             'outgoing': self.get_serializer(outgoing, many=True).data
         })
 
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], throttle_classes=[FriendRequestThrottle])
     def send_request(self, request):
         to_user_id = request.data.get('to_user_id')
         if not to_user_id:
@@ -29,7 +29,7 @@ const StatCard = ({ label, value, unit, colorClass = 'text-primary' }: { label:
 
 export const SpeedTypingTask = ({ task, onComplete }: SpeedTypingTaskProps) => {
     // Используем .trim() для удаления случайных пробелов/переносов в начале/конце из БД
-    const textToType = useMemo(() => (task.correct_answer || "Текст для этого задания не найден.").trim(), [task.correct_answer]);
+    const textToType = useMemo(() => (task.typing_text || "Текст для этого задания не найден.").trim(), [task.typing_text]);
 
     const [tokenizedText, setTokenizedText] = useState<TokenizedChar[]>([]);
     const [typedText, setTypedText] = useState('');
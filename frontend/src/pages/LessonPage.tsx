@@ -121,9 +121,8 @@ export const LessonPage = () => {
             const response = await checkAnswer(currentTask.id, selectedAnswer);
             setIsAnswerChecked(true);
             setIsAnswerCorrect(response.is_correct);
-            if (!response.is_correct) {
-                setCorrectAnswerFromAPI(response.correct_answer ?? null);
-            }
+            // Правильный ответ не приходит вместе с уроком: при верном ответе это выбранный вариант
+            setCorrectAnswerFromAPI(response.is_correct ? selectedAnswer : (response.correct_answer ?? null));
         } catch(e) { 
             console.error(e);
             alert("Ошибка при проверке ответа");
@@ -175,10 +174,10 @@ export const LessonPage = () => {
 
     const renderTaskInput = (task: Task) => {
         switch(task.task_type) {
-            case 'multiple_choice': return <MultipleChoiceTask task={task} selectedAnswer={selectedAnswer} isAnswerChecked={isAnswerChecked} correctAnswer={correctAnswerFromAPI || task.correct_answer} onSelectAnswer={setSelectedAnswer} />;
+            case 'multiple_choice': return <MultipleChoiceTask task={task} selectedAnswer={selectedAnswer} isAnswerChecked={isAnswerChecked} correctAnswer={correctAnswerFromAPI} onSelectAnswer={setSelectedAnswer} />;
             case 'text_input': return <TextInputTask isAnswerChecked={isAnswerChecked} onSelectAnswer={setSelectedAnswer} />;
             case 'code': return <CodeInputTask isAnswerChecked={isAnswerChecked} onSelectAnswer={setSelectedAnswer} initialValue={selectedAnswer || ''} />;
-            case 'true_false': return <TrueFalseTask task={task} selectedAnswer={selectedAnswer} isAnswerChecked={isAnswerChecked} correctAnswer={correctAnswerFromAPI || task.correct_answer} onSelectAnswer={setSelectedAnswer} />;
+            case 'true_false': return <TrueFalseTask task={task} selectedAnswer={selectedAnswer} isAnswerChecked={isAnswerChecked} correctAnswer={correctAnswerFromAPI} onSelectAnswer={setSelectedAnswer} />;
             case 'fill_in_blank': return <FillInBlankTask task={task} isAnswerChecked={isAnswerChecked} onSelectAnswer={setSelectedAnswer} />;
             case 'constructor': return <CodeConstructorTask task={task} isAnswerChecked={isAnswerChecked} onSelectAnswer={setSelectedAnswer} />;
             case 'speed_typing': return <SpeedTypingTask task={task} onComplete={(isSuccess) => { setIsAnswerChecked(true); setIsAnswerCorrect(isSuccess); }} />;
@@ -1,5 +1,5 @@
 import apiClient from "./axios";
-import type { Course, CourseDetail } from "../types/course";
+import type { Course, CourseDetail, CourseOutline, Lesson } from "../types/course";
 
 interface LessonCompletionResponse {
     message: string;
@@ -9,6 +9,9 @@ interface LessonCompletionResponse {
 
 interface HintResponse {
     hint: { text: string };
+    revealed: { id: number; text: string }[];
+    remaining: number;
+    xp_penalty: number;
     message: string;
 }
 
@@ -17,6 +20,12 @@ interface AnswerCheckResponse {
     correct_answer?: string;
 }
 
+interface BatchAnswerCheckResponse {
+    results: (AnswerCheckResponse & { task_id: number; error?: string })[];
+    correct: number;
+    total: number;
+}
+
 export const getCourses = async (): Promise<Course[]> => {
     const response = await apiClient.get<Course[]>('/courses/');
     return response.data;
@@ -27,6 +36,32 @@ export const getCourseById = async (id: string): Promise<CourseDetail> => {
     return response.data;
 };
 
+export const getCourseOutline = async (id: string): Promise<CourseOutline> => {
+    const response = await apiClient.get<CourseOutline>(`/courses/${id}/outline/`);
+    return response.data;
+};
+
+export const getLessonById = async (id: number): Promise<Lesson> => {
+    const response = await apiClient.get<Lesson>(`/lessons/${id}/`);
+    return response.data;
+};
+
+export interface SkillProgress {
+    skill_id: number;
+    title: string;
+    depth: number;
+    total_lessons: number;
+    completed_lessons: number;
+    percentage: number;
+    xp_total: number;
+    xp_earned: number;
+}
+
+export const getSkillProgress = async (skillId: number): Promise<SkillProgress> => {
+    const response = await apiClient.get<SkillProgress>(`/skills/${skillId}/progress/`);
+    return response.data;
+};
+
 export const completeLesson = async (lessonId: number): Promise<LessonCompletionResponse> => {
     const response = await apiClient.post<LessonCompletionResponse>('/lessons/complete/', { lesson_id: lessonId });
     return response.data;
@@ -41,3 +76,9 @@ export const checkAnswer = async (taskId: number, answer: string): Promise<Answe
     const response = await apiClient.post<AnswerCheckResponse>(`/tasks/check_answer/`, { task_id: taskId, answer: answer });
     return response.data;
 }
+
+// Проверка всех ответов урока одним запросом
+export const checkAnswers = async (lessonId: number, answers: { task_id: number; answer: string }[]): Promise<BatchAnswerCheckResponse> => {
+    const response = await apiClient.post<BatchAnswerCheckResponse>(`/tasks/check_answers/`, { lesson_id: lessonId, answers });
+    return response.data;
+}
@@ -10,11 +10,15 @@ export interface TestDetails {
     number_of_questions: number;
     passing_score: number;
     required_correct_answers: number;
+    is_adaptive: boolean;
+    duration_minutes: number | null;
+    cooldown_minutes: number;
 }
 
 // Ответ сервера при старте теста
 export interface StartTestResponse {
     attempt_id: number;
+    expires_at: string | null;
     questions: TestQuestion[];
 }
 
@@ -46,6 +50,28 @@ export const submitTest = async (attemptId: number, answers: UserAnswer[]): Prom
     });
     return response.data;
 };
+// Шаг адаптивного теста: следующий вопрос или итог
+export interface AdaptiveTestStep {
+    attempt_id: number;
+    answered: number;
+    total: number;
+    expires_at: string | null;
+    finished: boolean;
+    question: TestQuestion | null;
+    result: TestResult | null;
+}
+
+// Начать адаптивную попытку (вопросы приходят по одному)
+export const startAdaptiveTest = async (courseId: number): Promise<AdaptiveTestStep> => {
+    const response = await apiClient.post<AdaptiveTestStep>('/testing/adaptive/', { course_id: courseId });
+    return response.data;
+};
+
+// Ответить на текущий вопрос адаптивной попытки
+export const answerAdaptiveTest = async (attemptId: number, answer: UserAnswer): Promise<AdaptiveTestStep> => {
+    const response = await apiClient.post<AdaptiveTestStep>(`/testing/adaptive/${attemptId}/answer/`, answer);
+    return response.data;
+};
 export const getTestDetails = async (courseId: string): Promise<TestDetails> => {
     const response = await apiClient.get<TestDetails>(`/testing/details/${courseId}/`);
     return response.data;
@@ -64,11 +64,37 @@ export const getLeaderboard = async (): Promise<Friend[]> => {
     return response.data;
 };
 
-export const searchUsers = async (query: string): Promise<Friend[]> => {
-    const response = await apiClient.get<Friend[]>(`/users/search/?search=${query}`);
+export type LeaderboardPeriod = 'week' | 'month';
+
+export interface RankedLeaderboard {
+    period: LeaderboardPeriod | 'all';
+    period_start?: string;
+    results: { rank: number; id: number; username: string; avatar?: string; xp: number }[];
+    me: { rank: number; xp: number };
+}
+
+export const getPeriodLeaderboard = async (period: LeaderboardPeriod): Promise<RankedLeaderboard> => {
+    const response = await apiClient.get<RankedLeaderboard>(`/users/leaderboard/${period}/`);
     return response.data;
 };
 
+export const getFriendsLeaderboard = async (period?: LeaderboardPeriod): Promise<RankedLeaderboard> => {
+    const response = await apiClient.get<RankedLeaderboard>('/users/leaderboard/friends/', { params: period ? { period } : {} });
+    return response.data;
+};
+
+export interface PaginatedResponse<T> {
+    count: number;
+    next: string | null;
+    previous: string | null;
+    results: T[];
+}
+
+export const searchUsers = async (query: string): Promise<Friend[]> => {
+    const response = await apiClient.get<PaginatedResponse<Friend>>('/users/search/', { params: { search: query } });
+    return response.data.results;
+};
+
 export const sendFriendRequest = async (userId: number): Promise<Friendship> => {
     const response = await apiClient.post<Friendship>('/users/friendship/send_request/', { to_user_id: userId });
     return response.data;
@@ -110,4 +136,29 @@ export const getUserProfile = async (userId: number): Promise<UserProfile> => {
 export const getMyStats = async (): Promise<UserStats> => {
     const response = await apiClient.get<UserStats>('/users/me/stats/');
     return response.data;
-};
\ No newline at end of file
+};
+
+// Битовая карта пройденных уроков: урок id пройден, если установлен бит (id - base) в base64-байтах bits
+export interface CourseProgressBitmap {
+    base: number;
+    bits: string;
+    count: number;
+}
+
+export interface ProgressBitmapResponse {
+    courses: Record<string, CourseProgressBitmap>;
+}
+
+export const getMyProgress = async (courseId?: number): Promise<ProgressBitmapResponse> => {
+    const response = await apiClient.get<ProgressBitmapResponse>('/users/me/progress/', { params: courseId ? { course: courseId } : {} });
+    return response.data;
+};
+
+export const isLessonCompleted = (bitmap: CourseProgressBitmap | undefined, lessonId: number): boolean => {
+    if (!bitmap) return false;
+    const offset = lessonId - bitmap.base;
+    if (offset < 0) return false;
+    const raw = atob(bitmap.bits);
+    const byteIndex = offset >> 3;
+    return byteIndex < raw.length && ((raw.charCodeAt(byteIndex) >> (offset & 7)) & 1) === 1;
+};
@@ -1,8 +1,9 @@
 // --- Типы для заданий и подсказок ---
+// Текст подсказки приходит только из /tasks/request_hint/
 export interface Hint {
     id: number;
-    text: string;
     xp_penalty: number;
+    order: number;
 }
 export type MultipleChoiceOptions = Record<string, string>;
 export type ConstructorOptions = { options: string[] };
@@ -11,9 +12,9 @@ export interface Task {
     task_type: string;
     question: string;
     options: MultipleChoiceOptions | ConstructorOptions | null;
-    correct_answer: string;
     code_template?: string | null;
     time_limit?: number | null;
+    typing_text?: string | null; // только для speed_typing
     hints: Hint[];
 }
 
@@ -49,6 +50,22 @@ export interface Course {
 export interface CourseDetail extends Course {
     skills: Skill[];
 }
+// Оглавление курса без теории и заданий (GET /courses/<id>/outline/)
+export interface LessonOutline {
+    id: number;
+    title: string;
+    xp_reward: number;
+    is_completed: boolean;
+}
+export interface SkillOutline {
+    id: number;
+    title: string;
+    children: SkillOutline[];
+    lessons: LessonOutline[];
+}
+export interface CourseOutline extends Course {
+    skills: SkillOutline[];
+}
 
 // --- Типы для наград и геймификации ---
 export interface Badge {